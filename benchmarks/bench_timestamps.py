@@ -0,0 +1,86 @@
+"""
+Compare per-task timestamp work for ISO strings (store schema 1) and epoch
+seconds (schema 2): a creation-date filter, completion-day bucketing and lead time.
+
+    python benchmarks/bench_timestamps.py -n 1000000
+"""
+import argparse
+import time
+from datetime import datetime
+
+from tix.models import to_epoch
+from tix.storage.summary import completion_day, lead_time_seconds
+
+BASE = int(datetime(2024, 1, 1).timestamp())
+
+
+def make_items(n: int):
+    epoch_items = [
+        {"completed": True, "created_at": BASE + i * 37, "completed_at": BASE + i * 37 + 86400 + i % 5000}
+        for i in range(n)
+    ]
+    iso_items = [
+        {"completed": True,
+         "created_at": datetime.fromtimestamp(item["created_at"]).isoformat(),
+         "completed_at": datetime.fromtimestamp(item["completed_at"]).isoformat()}
+        for item in epoch_items
+    ]
+    return iso_items, epoch_items
+
+
+def run_iso(items, since: datetime):
+    days, matched = {}, 0
+    for item in items:
+        created = datetime.fromisoformat(item["created_at"])
+        completed = datetime.fromisoformat(item["completed_at"])
+        if created >= since:
+            matched += 1
+        day = completed.date().isoformat()
+        days[day] = days.get(day, 0) + 1
+        (completed - created).total_seconds()
+    return matched, len(days)
+
+
+def run_epoch(items, since: datetime):
+    since_ts = since.timestamp()
+    days, matched = {}, 0
+    for item in items:
+        if item["created_at"] >= since_ts:
+            matched += 1
+        day = completion_day(item)
+        days[day] = days.get(day, 0) + 1
+        lead_time_seconds(item)
+    return matched, len(days)
+
+
+def run_migration(items):
+    for item in items:
+        to_epoch(item["created_at"])
+        to_epoch(item["completed_at"])
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=1_000_000, help="number of completed tasks")
+    args = parser.parse_args()
+
+    iso_items, epoch_items = make_items(args.n)
+    since = datetime.fromtimestamp(BASE + args.n * 37 // 2)
+    print(f"{args.n:,} completed tasks")
+    iso, iso_result = timed("ISO strings (parse)", run_iso, iso_items, since)
+    epoch, epoch_result = timed("epoch seconds", run_epoch, epoch_items, since)
+    timed("one-time migration", run_migration, iso_items)
+    assert iso_result == epoch_result, (iso_result, epoch_result)
+    print(f"speedup: {iso / epoch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
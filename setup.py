@@ -47,6 +47,9 @@ setup(
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
         ],
+        "analytics": [
+            "numpy>=1.21",
+        ],
     },
     entry_points={
         "console_scripts": [
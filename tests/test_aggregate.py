@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+
+from tix.commands.aggregate import CompletionHistogram, LeadTimes, StatusCounts, aggregate, format_duration
+from tix.commands.report import write_json_report
+from tix.models import Task
+
+
+class Passes:
+    """Re-iterable task source that counts how often it is read"""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.count = 0
+
+    def __iter__(self):
+        self.count += 1
+        return iter(self.tasks)
+
+
+def make(i, completed_at=None, created_at="2025-01-01T00:00:00", tags=(), priority="medium"):
+    return Task(id=i, text=f"t{i}", priority=priority, completed=completed_at is not None,
+                created_at=created_at, completed_at=completed_at, tags=list(tags))
+
+
+def test_single_pass_feeds_every_accumulator():
+    tasks = [
+        make(1, "2025-01-06T12:00:00", tags=["a", "b"], priority="high"),
+        make(2, "2025-01-07T12:00:00", tags=["a"]),
+        make(3, tags=["b", "a"], priority="high"),
+        make(4),
+    ]
+    source = Passes(tasks)
+    result = aggregate(source, {
+        "status": StatusCounts(),
+        "days": CompletionHistogram("day"),
+        "weeks": CompletionHistogram("week"),
+    })
+    assert source.count == 1
+    assert result["status"] == {"total": 4, "active": 2, "completed": 2}
+    assert result["days"] == {"2025-01-06": 1, "2025-01-07": 1}
+    assert result["weeks"] == {"2025-W02": 2}
+
+
+def test_lead_time_sketch_is_close():
+    tasks = [make(i, f"2025-01-{1 + i:02d}T00:00:00") for i in range(1, 21)]
+    lead = aggregate(tasks, {"lead": LeadTimes()})["lead"]
+    assert lead["count"] == 20
+    # quantiles are returned as a sample value (the 10th and 19th of 20) within the 2% sketch accuracy
+    assert abs(lead["p50"] / 86400 - 10) <= 0.2
+    assert abs(lead["p99"] / 86400 - 19) <= 0.4
+    assert format_duration(lead["p50"]).endswith("d")
+
+
+def test_stream_report_equals_list_report():
+    tasks = [make(1, "2025-01-06T12:00:00"), make(2)]
+    from_list, from_stream = io.StringIO(), io.StringIO()
+    write_json_report(tasks, from_list)
+    # a one-shot iterator is enough: the summary and the sections come from a single pass
+    write_json_report(iter(tasks), from_stream)
+    a, b = json.loads(from_list.getvalue()), json.loads(from_stream.getvalue())
+    a.pop("generated"), b.pop("generated")
+    assert a == b
+    assert a["summary"] == {"total": 2, "active": 1, "completed": 1}
+
+
+@pytest.mark.parametrize("fmt", ["text", "markdown", "json"])
+def test_reports_read_tasks_once(fmt, monkeypatch):
+    from tix.commands import report
+
+    monkeypatch.setattr(report, "SPOOL_BYTES", 64)  # sections spill to disk
+    tasks = [make(i, "2025-01-06T12:00:00" if i % 2 else None, tags=["t"]) for i in range(1, 41)]
+    source = Passes(tasks)
+    from_stream, from_list = io.StringIO(), io.StringIO()
+    report.write_report(source, fmt, from_stream)
+    report.write_report(tasks, fmt, from_list)
+    assert source.count == 1
+
+    def body(text):
+        return [line for line in text.splitlines() if "enerated" not in line]
+    assert body(from_stream.getvalue()) == body(from_list.getvalue())
+    assert "t40" in from_stream.getvalue()
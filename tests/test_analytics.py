@@ -0,0 +1,88 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from tix.commands.analytics import analyze, read_jsonl
+
+NOW = datetime(2025, 3, 19, 12)  # a Wednesday
+DAY = 86400
+
+
+def ts(*args):
+    return int(datetime(*args).timestamp())
+
+
+@pytest.fixture
+def items():
+    return [
+        # completed in the current week after 1 and 3 days
+        {"id": 1, "priority": "high", "tags": ["work"], "created_at": ts(2025, 3, 16),
+         "completed": True, "completed_at": ts(2025, 3, 17)},
+        {"id": 2, "priority": "low", "tags": ["work", "home"], "created_at": ts(2025, 3, 15),
+         "completed": True, "completed_at": ts(2025, 3, 18)},
+        # completed last week after 5 days; legacy ISO timestamps are accepted
+        {"id": 3, "priority": "high", "tags": [], "created_at": "2025-03-05T00:00:00",
+         "completed": True, "completed_at": "2025-03-10T00:00:00"},
+        {"id": 4, "priority": "medium", "tags": ["home"], "created_at": ts(2025, 3, 11), "completed": False},
+    ]
+
+
+def test_analyze_python_fallback(items):
+    result = analyze(items, weeks=2, now=NOW, use_numpy=False)
+    assert result["backend"] == "python"
+    assert (result["total"], result["active"], result["completed"]) == (4, 1, 3)
+
+    cycle = result["cycle_time"]
+    assert cycle["all"]["count"] == 3
+    assert cycle["all"]["p50"] == 3 * DAY
+    assert cycle["all"]["p90"] == pytest.approx(4.6 * DAY)
+    assert cycle["priority"]["high"]["count"] == 2
+    assert cycle["priority"]["high"]["p50"] == 3 * DAY
+    assert cycle["tag"]["work"]["p50"] == 2 * DAY
+    assert cycle["tag"]["work"]["p90"] == pytest.approx(2.8 * DAY)
+    assert "medium" not in cycle["priority"]
+
+    assert result["weeks"] == [
+        {"week": "2025-03-10", "created": 3, "completed": 1, "active": 2},
+        {"week": "2025-03-17", "created": 0, "completed": 2, "active": 1},
+    ]
+
+
+def test_forecast():
+    items = [
+        {"id": 1, "created_at": ts(2025, 3, 1), "completed": True, "completed_at": ts(2025, 3, 10)},
+        {"id": 2, "created_at": ts(2025, 3, 1), "completed": True, "completed_at": ts(2025, 3, 12)},
+        {"id": 3, "created_at": ts(2025, 3, 11), "completed": False},
+    ]
+    forecast = analyze(items, weeks=2, now=NOW, use_numpy=False)["forecast"]
+    # one full week of history: 2 done, 1 created, so the single active task takes a week
+    assert forecast["weeks_left"] == 1.0
+    assert forecast["eta"] == "2025-03-26"
+
+    items.append({"id": 4, "created_at": ts(2025, 3, 12), "completed": False})
+    assert analyze(items, weeks=2, now=NOW, use_numpy=False)["forecast"]["weeks_left"] is None
+
+    assert analyze([], weeks=2, now=NOW, use_numpy=False)["forecast"]["weeks_left"] == 0.0
+
+
+def test_numpy_matches_python(items):
+    pytest.importorskip("numpy")
+    fast = analyze(items, weeks=3, now=NOW, use_numpy=True)
+    slow = analyze(items, weeks=3, now=NOW, use_numpy=False)
+    assert fast.pop("backend") == "numpy"
+    slow.pop("backend")
+    assert fast["weeks"] == slow["weeks"]
+    assert fast["forecast"] == slow["forecast"]
+    for group in ("priority", "tag"):
+        assert fast["cycle_time"][group].keys() == slow["cycle_time"][group].keys()
+        for name, stats in slow["cycle_time"][group].items():
+            assert fast["cycle_time"][group][name] == pytest.approx(stats)
+
+
+def test_read_jsonl_gz(tmp_path, items):
+    path = tmp_path / "tasks.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        f.writelines(json.dumps(i) + "\n" for i in items)
+    assert [i["id"] for i in read_jsonl(path)] == [1, 2, 3, 4]
@@ -0,0 +1,109 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+
+
+def complete(storage, text, completed_at):
+    task = storage.add_task(text)
+    task.completed = True
+    task.completed_at = completed_at
+    storage.update_task(task)
+    return task
+
+
+def test_archive_completed_moves_old_tasks(storage):
+    """Old completed tasks leave the hot file and land in monthly partitions"""
+    complete(storage, "old jan", "2025-01-10T10:00:00")
+    complete(storage, "old feb", "2025-02-03T10:00:00")
+    complete(storage, "recent", "2025-03-30T10:00:00")
+    storage.add_task("active")
+
+    moved = storage.archive_completed(30, now=datetime(2025, 4, 1))
+    assert moved == 2
+    assert [t.text for t in storage.load_tasks()] == ["recent", "active"]
+    assert [p.name for p in storage.archive.partitions()] == ["2025-01.jsonl.gz", "2025-02.jsonl.gz"]
+    with gzip.open(storage.archive.partitions()[0], "rt") as f:
+        assert json.loads(f.readline())["text"] == "old jan"
+
+    # archives are only read on request
+    assert len(storage.load_tasks(include_archived=True)) == 4
+    assert [t.text for t in storage.iter_tasks(include_archived=True)][-2:] == ["old jan", "old feb"]
+    assert len(storage.get_completed_tasks(include_archived=True)) == 3
+
+
+def test_archive_appends_to_existing_partition(storage):
+    complete(storage, "first", "2025-01-10T10:00:00")
+    storage.archive_completed(1, now=datetime(2025, 4, 1))
+    complete(storage, "second", "2025-01-20T10:00:00")
+    storage.archive_completed(1, now=datetime(2025, 4, 1))
+    assert len(storage.archive.partitions()) == 1
+    assert [t.text for t in storage.archive.iter_tasks()] == ["first", "second"]
+
+
+def test_maybe_archive_runs_once_per_interval(storage):
+    complete(storage, "old", "2020-01-01T00:00:00")
+    assert storage.maybe_archive(0) == 0
+    assert storage.maybe_archive(30) == 1
+    complete(storage, "also old", "2020-01-02T00:00:00")
+    assert storage.maybe_archive(30) == 0
+    assert storage.maybe_archive(30, interval_hours=0) == 1
+
+
+def test_archived_tasks_can_be_found_and_brought_back(storage):
+    """Archived IDs stay reachable: get_task finds them, unarchive moves them back into the store"""
+    old = complete(storage, "old", "2025-01-10T10:00:00")
+    other = complete(storage, "other", "2025-01-11T10:00:00")
+    storage.archive_completed(1, now=datetime(2025, 4, 1))
+    assert storage.get_task(old.id) is None
+    assert storage.get_task(old.id, include_archived=True).text == "old"
+    assert storage.archive.summary()["status"]["completed"] == 2
+
+    back = storage.unarchive(old.id)
+    assert back.text == "old" and back.completed
+    assert [t.text for t in storage.load_tasks()] == ["old"]
+    assert [t.id for t in storage.archive.iter_tasks()] == [other.id]
+    assert storage.archive.summary()["status"]["completed"] == 1
+    assert storage.unarchive(old.id) is None
+
+    storage.archive.take({other.id})
+    assert storage.archive.partitions() == []
+
+
+def test_backups_carry_the_archive(storage, tmp_path):
+    from tix.storage.backup import create_backup, restore_from_backup
+
+    complete(storage, "old", "2025-01-10T10:00:00")
+    storage.archive_completed(1, now=datetime(2025, 4, 1))
+    backup = create_backup(storage.storage_path)
+
+    assert storage.archive.clear() == 1
+    assert storage.load_tasks(include_archived=True) == []
+    restore_from_backup(backup.name, storage.storage_path, require_confirm=False)
+    assert [t.text for t in storage.load_tasks(include_archived=True)] == ["old"]
+
+
+def test_backups_in_the_same_second_replace_each_other(storage, monkeypatch):
+    from tix.storage import backup
+
+    class FrozenClock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2025, 4, 1, 12, 0, 0)
+
+    monkeypatch.setattr(backup, "datetime", FrozenClock)
+    complete(storage, "old", "2025-01-10T10:00:00")
+    storage.archive_completed(1, now=datetime(2025, 4, 1))
+    first = backup.create_backup(storage.storage_path)
+    # the second backup overwrites the first, archive included, instead of failing
+    assert backup.create_backup(storage.storage_path) == first
+    assert [p.name for p in backup.TaskArchive(first).partitions()] == ["2025-01.jsonl.gz"]
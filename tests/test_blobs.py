@@ -0,0 +1,208 @@
+import hashlib
+import os
+
+import pytest
+
+from tix.storage.blobs import BlobStore, IngestError, NameClashError, copy_file, expand_sources, hash_file
+
+
+def test_hash_file_streams_in_chunks(tmp_path):
+    src = tmp_path / "data.bin"
+    payload = os.urandom(10_000)
+    src.write_bytes(payload)
+    assert hash_file(src, chunk_size=1000) == hashlib.sha256(payload).hexdigest()
+
+
+def test_copy_file(tmp_path):
+    src, dst = tmp_path / "a", tmp_path / "b"
+    src.write_bytes(b"x" * 5000)
+    assert copy_file(src, dst) in ("reflink", "copy_file_range", "copy")
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_attachments_are_deduplicated_and_refcounted(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "build.log"
+    src.write_bytes(b"log line\n" * 1000)
+    first, second = tmp_path / "attachments" / "1" / "build.log", tmp_path / "attachments" / "2" / "build.log"
+
+    digest = store.attach(src, first)
+    assert store.attach(src, second) == digest
+    store.save()
+    blob = store.blob_path(digest)
+    assert blob.exists() and len(list(blob.parent.iterdir())) == 1
+    assert first.read_bytes() == second.read_bytes() == src.read_bytes()
+
+    store = BlobStore(tmp_path / "blobs")
+    assert store.refcount(digest) == 2
+    assert store.release(first)
+    assert blob.exists() and not first.exists()
+    assert store.release(second)
+    assert not blob.exists()
+    assert not store.release(second)
+
+
+def _force_link_method(monkeypatch, method):
+    """Make BlobStore.link fall back to a hard link or, failing that too, a copy"""
+    import tix.storage.blobs as blobs
+    monkeypatch.setattr(blobs, "_reflink", lambda src, dst: False)
+    if method == "copy":
+        def no_link(src, dst):
+            raise OSError("hard links not supported")
+        monkeypatch.setattr(blobs.os, "link", no_link)
+
+
+def test_attachments_share_their_blob_until_unshared(tmp_path):
+    src = tmp_path / "notes.txt"
+    src.write_text("v1")
+    store = BlobStore(tmp_path / "blobs")
+    first, second = tmp_path / "attachments" / "1" / "notes.txt", tmp_path / "attachments" / "2" / "notes.txt"
+    digest = store.ingest(src)
+    assert store.link(digest, first) in ("reflink", "hardlink")
+    assert store.link(digest, first) is None
+    store.link(digest, second)
+    if os.path.samefile(first, store.blob_path(digest)):
+        assert not first.stat().st_mode & 0o222  # the shared blob is read-only
+    store.unshare(first)
+    assert not os.path.samefile(first, store.blob_path(digest))
+    assert not store.unshare(first)
+    with open(first, "a") as f:  # edited in place
+        f.write(" edited")
+    assert second.read_text() == store.blob_path(digest).read_text() == "v1"
+    assert dict(store.verify([str(second)]))[str(second)] == "unchanged"
+
+
+@pytest.mark.parametrize("method", ["hardlink", "copy"])
+def test_link_falls_back_without_reflinks(tmp_path, monkeypatch, method):
+    _force_link_method(monkeypatch, method)
+    src = tmp_path / "notes.txt"
+    src.write_text("v1")
+    store = BlobStore(tmp_path / "blobs")
+    dest = tmp_path / "attachments" / "1" / "notes.txt"
+    digest = store.ingest(src)
+    assert store.link(digest, dest) == method
+    assert os.path.samefile(dest, store.blob_path(digest)) == (method == "hardlink")
+    assert store.unshare(dest) == (method == "hardlink")
+    dest.write_text("v2")
+    assert store.blob_path(digest).read_text() == "v1"
+
+
+def test_reattaching_replaces_previous_content(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    src, dest = tmp_path / "notes.txt", tmp_path / "attachments" / "1" / "notes.txt"
+    src.write_text("v1")
+    old = store.attach(src, dest)
+    src.write_text("v2")
+    new = store.attach(src, dest)
+    assert dest.read_text() == "v2"
+    assert not store.blob_path(old).exists() and store.refcount(new) == 1
+
+
+def test_expand_sources(tmp_path):
+    (tmp_path / "dist" / "sub").mkdir(parents=True)
+    (tmp_path / "dist" / "a.whl").write_bytes(b"a")
+    (tmp_path / "dist" / "sub" / "b.txt").write_bytes(b"b")
+    (tmp_path / "report.pdf").write_bytes(b"r")
+    sources, missing = expand_sources([str(tmp_path / "dist"), str(tmp_path / "*.pdf"), str(tmp_path / "nope")])
+    assert sorted(s.name for s in sources) == ["dist/a.whl", "dist/sub/b.txt", "report.pdf"]
+    assert {s.root for s in sources} == {"dist", "report.pdf"}
+    assert missing == [str(tmp_path / "nope")]
+
+
+
+def test_expand_sources_keeps_glob_matches_with_one_basename_apart(tmp_path):
+    for build in ("a", "b"):
+        (tmp_path / "build" / build).mkdir(parents=True)
+        (tmp_path / "build" / build / "out.log").write_text(build)
+    sources, _ = expand_sources([str(tmp_path / "build" / "*" / "out.log")])
+    assert sorted((s.name, s.root) for s in sources) == [("a/out.log", "a"), ("b/out.log", "b")]
+    # plain paths are attached by their name, so two of them can clash
+    with pytest.raises(NameClashError) as e:
+        expand_sources([str(tmp_path / "build" / "a" / "out.log"), str(tmp_path / "build" / "b" / "out.log")])
+    assert e.value.names == ["out.log"]
+
+
+def test_ingest_many_is_parallel_and_rolls_back(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    files = []
+    for i in range(20):
+        f = tmp_path / f"f{i}"
+        f.write_bytes(str(i).encode() * 100)
+        files.append(f)
+    progressed = []
+    digests = store.ingest_many(files, workers=4, advance=progressed.append)
+    assert len(set(digests.values())) == 20 and sum(progressed) == sum(f.stat().st_size for f in files)
+
+    new = tmp_path / "new"
+    new.write_bytes(b"fresh")
+    with pytest.raises(IngestError):
+        store.ingest_many([new, tmp_path / "missing"], workers=2)
+    assert not store.blob_path(hash_file(new)).exists()
+    # blobs that existed before the failed call are kept
+    assert all(store.blob_path(d).exists() for d in digests.values())
+
+
+def test_verify_uses_cache_and_detects_changes(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    src = tmp_path / "src"
+    (src / "dist").mkdir(parents=True)
+    for name in ("a", "b"):
+        (src / "dist" / name).write_text(name)
+    legacy = tmp_path / "attachments" / "2" / "old.txt"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text("copied before the blob store")
+    task_dir = tmp_path / "attachments" / "1" / "dist"
+    for name in ("a", "b"):
+        store.attach(src / "dist" / name, task_dir / name)
+    store.save()
+
+    store = BlobStore(tmp_path / "blobs")
+    entries = [str(task_dir), str(legacy), str(tmp_path / "gone.txt")]
+    result = dict(store.verify(entries, workers=2))
+    assert result == {str(task_dir / "a"): "unchanged", str(task_dir / "b"): "unchanged",
+                      str(legacy): "new", str(tmp_path / "gone.txt"): "missing"}
+
+    target = task_dir / "b"
+    target.chmod(0o644)
+    target.write_text("bit rot")
+    result = dict(store.verify(entries, workers=2))
+    assert result[str(target)] == "changed"
+    assert result[str(legacy)] == "unchanged"
+    assert dict(store.verify([str(task_dir)], force=True, workers=2))[str(task_dir / "a")] == "ok"
+
+
+@pytest.mark.parametrize("method, freed", [("hardlink", 370), ("copy", 1670)])
+def test_collect_garbage(tmp_path, monkeypatch, method, freed):
+    from tix.storage.blobs import collect_garbage
+
+    _force_link_method(monkeypatch, method)
+    store = BlobStore(tmp_path / "blobs")
+    root = tmp_path / "attachments"
+    src = tmp_path / "shared.bin"
+    src.write_bytes(b"s" * 1000)
+    store.attach(src, root / "1" / "shared.bin")
+    store.attach(src, root / "2" / "shared.bin")
+    (tmp_path / "dist").mkdir()
+    (tmp_path / "dist" / "only.bin").write_bytes(b"o" * 300)
+    store.attach(tmp_path / "dist" / "only.bin", root / "2" / "dist" / "only.bin")
+    (root / "7").mkdir()
+    (root / "7" / "legacy.txt").write_bytes(b"l" * 50)
+    (root / "8" / "empty").mkdir(parents=True)
+    (tmp_path / "interrupted.bin").write_bytes(b"i" * 20)
+    orphan = store.ingest(tmp_path / "interrupted.bin")  # stored but never linked
+    store.save()
+
+    # task 2 was deleted, task 7 is gone too; task 1 still exists
+    live = [str(root / "1" / "shared.bin")]
+    dry = collect_garbage(root, BlobStore(tmp_path / "blobs"), live, dry_run=True)
+    # a hard link frees nothing while its blob is shared; a copy frees its own size
+    assert (dry.files, dry.bytes, dry.blobs, dry.dirs) == (3, freed, 1, 5)
+    assert (root / "2" / "dist" / "only.bin").exists()
+
+    store = BlobStore(tmp_path / "blobs")
+    result = collect_garbage(root, store, live)
+    assert (result.files, result.bytes, result.blobs, result.dirs) == (3, freed, 1, 5)
+    assert sorted(p.name for p in root.iterdir()) == ["1"]
+    assert not store.blob_path(orphan).exists()
+    assert not store.blob_path(hash_file(tmp_path / "dist" / "only.bin")).exists()
+    assert store.refcount(hash_file(src)) == 1 and (root / "1" / "shared.bin").exists()
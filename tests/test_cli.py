@@ -285,3 +285,65 @@ def test_open_command_opens_attachments_and_links(runner, tmp_path):
         # Ensure the link was opened (regardless of platform details)
         calls = [str(call_args[0][0][1]) for call_args in mock_popen.call_args_list]
         assert "https://example.com" in calls
+
+
+def test_archived_tasks_through_undo_move_and_selectors(runner, tmp_path):
+    """undo ID and move bring archived tasks back; ID selectors say a task is archived"""
+    from datetime import datetime
+    from tix.storage.history import HistoryManager
+    from tix.storage.json_storage import TaskStorage
+
+    store = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+    for text in ("old", "older", "oldest"):
+        task = store.add_task(text)
+        task.completed = True
+        task.completed_at = "2025-01-10T10:00:00"
+        store.update_task(task)
+    store.archive_completed(1, now=datetime(2025, 4, 1))
+
+    with patch('tix.cli.storage', store):
+        result = runner.invoke(cli, ['undo', '1'])
+        assert result.exit_code == 0
+        assert 'Reactivated: old' in result.output
+        assert not store.get_task(1).completed
+
+        result = runner.invoke(cli, ['move', '2', '10'])
+        assert result.exit_code == 0
+        assert 'Moved task from #2 to #10' in result.output
+        assert store.get_task(10).text == "older"
+
+        result = runner.invoke(cli, ['priority', '3', 'high'])
+        assert result.exit_code == 0
+        assert 'Archived' in result.output and 'not found' not in result.output
+    assert [t.id for t in store.archive.iter_tasks()] == [3]
+
+
+def test_bulk_confirmation_shows_global_ids(runner, tmp_path):
+    """The preview before a bulk change lists global tasks by the ID the user types"""
+    from tix.storage.history import HistoryManager
+    from tix.storage.json_storage import TaskStorage
+
+    store = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"),
+                        global_path=tmp_path / "global.json")
+    store.global_store.add_task("rotate keys")
+    store.global_store.add_task("renew certs")
+
+    with patch('tix.cli.storage', store):
+        result = runner.invoke(cli, ['edit', '1-2', '--global', '-p', 'high'], input="n\n")
+        assert result.exit_code == 0
+        assert '#g1: rotate keys' in result.output and '#g2: renew certs' in result.output
+
+
+def test_quiet_edit_message_shows_global_id(runner, tmp_path):
+    """With update notifications off, editing a global task still names it g<ID>"""
+    from tix.storage.history import HistoryManager
+    from tix.storage.json_storage import TaskStorage
+
+    store = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"),
+                        global_path=tmp_path / "global.json")
+    store.global_store.add_task("rotate keys")
+
+    with patch('tix.cli.storage', store), patch.dict('tix.config.CONFIG', {'notifications': {'on_update': False}}):
+        result = runner.invoke(cli, ['edit', '1', '--global', '-p', 'high'])
+        assert result.exit_code == 0
+        assert 'Task #g1 updated' in result.output
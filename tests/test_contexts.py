@@ -0,0 +1,47 @@
+import pytest
+
+from tix.storage.contexts import ContextSet, context_counts
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage, store_paths
+
+
+@pytest.fixture
+def base(tmp_path):
+    history = HistoryManager(tmp_path / "history.json")
+    default = TaskStorage(tmp_path / "tasks.json", context="default", history=history)
+    work = TaskStorage(tmp_path / "contexts" / "work.json", context="work", history=history)
+    home = TaskStorage(tmp_path / "contexts" / "home.json", context="home", history=history)
+    default.add_task("inbox zero", tags=["admin"])
+    work.add_task("deploy release", priority="high", tags=["release"])
+    work.add_task("write report", tags=["admin"])
+    home.add_task("fix the sink", priority="high")
+    task = home.get_task(1)
+    task.mark_done()
+    home.update_task(task)
+    work.text_index()  # derived files must not be mistaken for contexts
+    return tmp_path
+
+
+def test_store_paths_skip_derived_files(base):
+    assert list(store_paths(base)) == ["default", "home", "work"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merged_results_are_sorted_and_labelled(base, workers):
+    contexts = ContextSet(store_paths(base), workers=workers)
+    assert [(t.context, t.id) for t in contexts.get_active_tasks()] == [("default", 1), ("work", 1), ("work", 2)]
+    assert [(t.context, t.id) for t in contexts.load_tasks()][-1] == ("home", 1)
+    assert [(t.context, t.id) for t in contexts.query("p:high")] == [("work", 1), ("home", 1)]
+    assert contexts.summary()["status"] == {"total": 4, "active": 3, "completed": 1}
+
+
+def test_select(base):
+    assert list(ContextSet.select(["work", "home"], base_dir=base).paths) == ["work", "home"]
+    with pytest.raises(KeyError):
+        ContextSet.select(["nope"], base_dir=base)
+
+
+def test_context_counts_from_headers(base):
+    counts = context_counts(base)
+    assert counts["work"] == {"total": 2, "active": 2, "completed": 0, "archived": 0}
+    assert counts["home"]["completed"] == 1
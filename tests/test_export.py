@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+from tix.commands.export import (
+    export_dict, filter_tasks, write_csv, write_ids, write_jsonl, write_markdown, write_tag_counts, write_tsv,
+)
+from tix.commands.report import write_json_report, write_text_report
+from tix.models import Task
+
+
+@pytest.fixture
+def tasks():
+    return [
+        Task(id=1, text="Write docs", priority="low", tags=["docs"], created_at="2025-01-01T09:00:00"),
+        Task(id=2, text="Fix | bug", priority="high", tags=["work", "urgent"], created_at="2025-02-01T09:00:00",
+             completed=True, completed_at="2025-02-02T09:00:00"),
+        Task(id=3, text="Release", priority="high", tags=["work"], created_at="2025-03-01T09:00:00"),
+    ]
+
+
+def test_filter_tasks(tasks):
+    """Filters are applied lazily and combined"""
+    assert [t.id for t in filter_tasks(tasks, status="active")] == [1, 3]
+    assert [t.id for t in filter_tasks(tasks, status="completed")] == [2]
+    assert [t.id for t in filter_tasks(tasks, tags=["work", "urgent"])] == [2]
+    assert [t.id for t in filter_tasks(tasks, priority="high", status="active")] == [3]
+    since = datetime(2025, 1, 15)
+    until = datetime(2025, 2, 15)
+    assert [t.id for t in filter_tasks(tasks, since=since, until=until)] == [2]
+
+
+def test_filter_tasks_date_bounds_cover_the_whole_day(tasks):
+    """--since D --until D keeps the tasks created on D; a time on until is exact"""
+    day = date(2025, 2, 1)
+    assert [t.id for t in filter_tasks(tasks, since=day, until=day)] == [2]
+    assert [t.id for t in filter_tasks(tasks, until=datetime(2025, 2, 1, 9))] == [1, 2]
+    assert [t.id for t in filter_tasks(tasks, until=datetime(2025, 2, 1, 8, 59))] == [1]
+
+
+def test_write_jsonl(tasks):
+    """Each task is written as one JSON line"""
+    out = io.StringIO()
+    assert write_jsonl(tasks, out) == 3
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    # timestamps are local ISO strings, like CSV and markdown, not the stored epoch seconds
+    second = json.loads(lines[1])
+    assert (second["created_at"], second["completed_at"]) == ("2025-02-01T09:00:00", "2025-02-02T09:00:00")
+    assert json.loads(lines[0])["completed_at"] is None
+
+
+def test_write_csv(tasks):
+    """CSV has a header row and joins list fields"""
+    out = io.StringIO()
+    assert write_csv(iter(tasks), out) == 3
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert rows[1]["tags"] == "work;urgent"
+    assert rows[1]["completed"] == "True"
+    assert rows[0]["completed_at"] == ""
+
+
+def test_write_markdown_escapes_pipes(tasks):
+    out = io.StringIO()
+    assert write_markdown(tasks, out) == 3
+    assert "Fix \\| bug" in out.getvalue()
+
+
+def test_json_report_matches_dumps_layout(tasks):
+    """Streamed JSON report is byte-compatible with json.dumps(indent=2)"""
+    out = io.StringIO()
+    write_json_report(tasks, out)
+    data = json.loads(out.getvalue())
+    expected = {
+        "generated": data["generated"],
+        "summary": {"total": 3, "active": 2, "completed": 1},
+        "tasks": [export_dict(t) for t in tasks],
+    }
+    assert out.getvalue() == json.dumps(expected, indent=2) + "\n"
+    assert data["tasks"][1]["completed_at"] == "2025-02-02T09:00:00"
+
+
+def test_text_report(tasks):
+    out = io.StringIO()
+    write_text_report(tasks, out)
+    text = out.getvalue()
+    assert "Total Tasks: 3" in text
+    assert "#3 [high] Release [work]" in text
+    assert "#2 ✔ Fix | bug [work, urgent]" in text
+
+
+def test_write_tsv_escapes_tabs(tasks):
+    tasks[0].text = "tab\there"
+    out = io.StringIO()
+    assert write_tsv(tasks, out) == 3
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "1\tactive\tlow\ttab\\there\tdocs"
+    assert lines[1].split("\t") == ["2", "done", "high", "Fix | bug", "work,urgent"]
+
+
+def test_write_ids_and_tag_counts(tasks):
+    out = io.StringIO()
+    write_ids(tasks, out)
+    assert out.getvalue() == "1\n2\n3\n"
+
+    out = io.StringIO()
+    write_tag_counts([("work", 2), ("docs", 1)], "jsonl", out)
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [
+        {"tag": "work", "count": 2}, {"tag": "docs", "count": 1},
+    ]
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from tix.storage.fuzzy import edit_distance, expand, rank
+from tix.storage.history import HistoryManager
+from tix.storage.index import TextIndex
+from tix.storage.json_storage import TaskStorage
+
+NOW = datetime(2025, 6, 1)
+
+
+def item(task_id, text, priority="medium", tags=(), created_at="2025-05-01T00:00:00"):
+    return {"id": task_id, "text": text, "priority": priority, "tags": list(tags), "created_at": created_at}
+
+
+@pytest.fixture
+def items():
+    return {i["id"]: i for i in [
+        item(1, "Deploy payment service", tags=["release"]),
+        item(2, "Write deployment docs", priority="low"),
+        item(3, "Fix payment rounding bug", priority="high"),
+        item(4, "Plan team offsite"),
+    ]}
+
+
+@pytest.fixture
+def index(tmp_path, items):
+    idx = TextIndex(tmp_path / "index.json")
+    idx.rebuild(items.values(), rev=1)
+    return idx
+
+
+def test_edit_distance():
+    assert edit_distance("payment", "payment", 2) == 0
+    assert edit_distance("paymnet", "payment", 2) == 1
+    assert edit_distance("tsak", "task", 1) == 1
+    assert edit_distance("kitten", "sitting", 1) == 2
+
+
+def test_expand_tolerates_typos(index):
+    assert set(expand(index, "paymnt")) == {"payment"}
+    assert "deployment" in expand(index, "deploy")
+    assert expand(index, "xyz") == {}
+
+
+def test_rank_orders_by_relevance_and_boosts(index, items):
+    ranked = [i["id"] for _, i in rank(index, items, "paymet", limit=10, now=NOW)]
+    # both mention payment; the high-priority one wins
+    assert ranked == [3, 1]
+    ranked = [i["id"] for _, i in rank(index, items, "deploy relase", now=NOW)]
+    assert ranked[0] == 1
+    assert [i["id"] for _, i in rank(index, items, "deploy", limit=1, now=NOW)] == [1]
+    assert rank(index, items, "offsite", limit=0) == []
+
+
+def test_rank_limit_matches_full_ranking(index, items):
+    full = [i["id"] for _, i in rank(index, items, "payment deploy docs", limit=None, now=NOW)]
+    for k in range(1, 5):
+        assert [i["id"] for _, i in rank(index, items, "payment deploy docs", limit=k, now=NOW)] == full[:k]
+
+
+def test_storage_fuzzy_search(tmp_path):
+    storage = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "h.json"))
+    storage.add_task("Renew domain certificate", tags=["ops"])
+    done = storage.add_task("Renew passport")
+    done.mark_done()
+    storage.update_task(done)
+    assert [t.id for t in storage.fuzzy_search("renw")] == [1]
+    assert sorted(t.id for t in storage.fuzzy_search("renw", include_completed=True)) == [1, 2]
+    assert [t.id for t in storage.fuzzy_search("certficate")] == [1]
@@ -0,0 +1,99 @@
+import pytest
+
+from tix.storage import json_storage
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage, read_cached, store_paths
+
+
+@pytest.fixture
+def stores(tmp_path):
+    history = HistoryManager(tmp_path / "history.json")
+    global_path = tmp_path / "global.json"
+    work = TaskStorage(tmp_path / "contexts" / "work.json", context="work", history=history, global_path=global_path)
+    home = TaskStorage(tmp_path / "contexts" / "home.json", context="home", history=history, global_path=global_path)
+    work.add_task("deploy release", tags=["release"])
+    home.add_task("fix the sink")
+    return work, home
+
+
+def test_global_task_is_written_to_the_global_store_only(stores):
+    work, home = stores
+    before = work.storage_path.read_bytes(), home.storage_path.read_bytes()
+    task = work.add_task("renew passport", priority="high", is_global=True)
+    assert task.context == "global" and task.id == 1
+    assert (work.storage_path.read_bytes(), home.storage_path.read_bytes()) == before
+    assert [t.text for t in home.global_tasks()] == ["renew passport"]
+    assert [t.text for t in work.load_tasks()] == ["deploy release"]
+
+
+def test_global_tasks_are_parsed_once_per_change(stores, monkeypatch):
+    work, home = stores
+    work.add_task("renew passport", is_global=True)
+    parses = []
+    real_loads = json_storage.json.loads
+    monkeypatch.setattr(json_storage.json, "loads", lambda s: parses.append(1) or real_loads(s))
+
+    work.global_tasks()
+    home.global_tasks()
+    assert len(parses) == 1
+    work.global_store.add_task("pay taxes")
+    parses.clear()
+    assert [t.text for t in home.global_tasks(include_completed=False)] == ["renew passport", "pay taxes"]
+    assert read_cached(home.global_path) is read_cached(work.global_path)
+    assert len(parses) == 1
+
+
+def test_summary_and_store_paths_include_global(stores, tmp_path):
+    work, _ = stores
+    work.add_task("renew passport", tags=["admin"], is_global=True)
+    assert work.summary()["status"]["total"] == 1
+    summary = work.summary(include_global=True)
+    assert summary["status"]["total"] == 2 and summary["tags"]["admin"]["active"] == 1
+    assert list(store_paths(tmp_path)) == ["home", "work", "global"]
+
+
+def test_explicit_store_path_has_no_global_store(tmp_path):
+    storage = TaskStorage(tmp_path / "tasks.json", context="test")
+    assert storage.global_store is None and storage.global_tasks() == []
+    task = storage.add_task("local anyway", is_global=True)
+    assert storage.get_task(task.id) is not None
+
+
+def test_global_tasks_are_told_apart_from_context_tasks(stores):
+    import io
+    from tix.commands.export import write_ids, write_jsonl, write_tsv
+    from tix.commands.selectors import split_global, task_ref
+
+    work, _ = stores
+    shared = work.add_task("renew passport", is_global=True)
+    local = work.get_task(1)
+    local.context = "work"
+    assert (local.id, shared.id) == (1, 1) and (task_ref(local), task_ref(shared)) == ("1", "g1")
+    assert split_global(["2", "g1", "G3-4"]) == (["2"], ["1", "3-4"])
+
+    out = io.StringIO()
+    write_ids([local, shared], out, show_context=True)
+    assert out.getvalue() == "1\ng1\n"
+    out = io.StringIO()
+    write_tsv([shared], out, show_context=True)
+    assert out.getvalue().startswith("global\tg1\tactive\t")
+    out = io.StringIO()
+    write_jsonl([shared], out, show_context=True)
+    assert '"context": "global", "ref": "g1"' in out.getvalue()
+
+    # attachment directories are keyed by store, so equal IDs do not share one
+    assert work.get_attachment_dir(1) != work.global_store.get_attachment_dir(1)
+    assert work.global_store.get_attachment_dir(1).parent.parent == work.get_attachments_root()
+
+
+def test_context_set_summary_counts_global_tasks_once(stores, tmp_path):
+    from tix.storage.contexts import ContextSet
+
+    work, _ = stores
+    work.add_task("renew passport", tags=["admin"], is_global=True)
+    one = ContextSet.select(["work"], base_dir=tmp_path)
+    assert one.summary()["status"]["total"] == 1
+    summary = one.summary(include_global=True)
+    assert summary["status"]["total"] == 2 and summary["tags"]["admin"]["total"] == 1
+    # with every context selected the global store is already one of them
+    assert ContextSet.select(base_dir=tmp_path).summary(include_global=True)["status"]["total"] == 3
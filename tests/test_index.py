@@ -0,0 +1,132 @@
+import pytest
+
+from tix.storage.history import HistoryManager
+from tix.storage.index import TextIndex, trigrams
+from tix.storage.json_storage import TaskStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+
+
+def test_trigrams():
+    assert trigrams("AbcD") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_candidates(tmp_path):
+    index = TextIndex(tmp_path / "index.json")
+    index.rebuild([
+        {"id": 1, "text": "Fix login bug"},
+        {"id": 2, "text": "Write blog post"},
+        {"id": 3, "text": "Debug logging"},
+    ], rev=1)
+    assert index.candidates("log") == {1, 2, 3}
+    assert index.candidates("LOGIN") == {1}
+    assert index.candidates("zzz") == set()
+    assert index.candidates("bu") == {1, 3}
+    assert index.candidates("n b") == {1}
+    assert index.candidates("") is None
+
+
+def test_find_text_uses_index_and_stays_in_sync(storage):
+    """Index is built on first search and then maintained by add/update/delete"""
+    storage.add_task("Fix login bug")
+    storage.add_task("Write blog post")
+    assert not storage.index_path.exists()
+    assert [t.id for t in storage.find_text("LOG")] == [1, 2]
+    assert storage.index_path.exists()
+
+    storage.add_task("Update changelog")
+    task = storage.get_task(1)
+    task.text = "Fix signup bug"
+    storage.update_task(task)
+    storage.delete_task(2)
+    assert [t.id for t in storage.find_text("log")] == [3]
+    assert [t.id for t in storage.find_text("signup")] == [1]
+
+    # incremental index equals a full rebuild
+    index = TextIndex(storage.index_path)
+    index.load()
+    rebuilt = TextIndex(storage.index_path)
+    rebuilt.rebuild([t.to_dict() for t in storage.load_tasks()], index.rev)
+    assert index.trigrams == rebuilt.trigrams
+    assert index.tokens == rebuilt.tokens
+
+
+def test_stale_index_is_rebuilt(storage):
+    storage.add_task("alpha")
+    storage.find_text("alp")
+    # a bulk save bypasses incremental maintenance and bumps the revision
+    tasks = storage.load_tasks()
+    tasks[0].text = "beta"
+    storage.save_tasks(tasks)
+    assert storage.find_text("alp") == []
+    assert [t.text for t in storage.find_text("bet")] == ["beta"]
+
+
+def test_restored_store_with_a_repeated_revision_rebuilds_the_index(storage, tmp_path):
+    import shutil
+
+    storage.add_task("alpha task")
+    storage.find_text("alpha")
+    backup = tmp_path / "backup.json"
+    shutil.copy(storage.storage_path, backup)
+    storage.add_task("zeta task")
+    assert [t.text for t in storage.find_text("zeta")] == ["zeta task"]
+    # restoring and writing once reaches the same revision with different content
+    shutil.copy(backup, storage.storage_path)
+    storage.add_task("omega task")
+    assert storage.find_text("zeta") == []
+    assert [t.text for t in storage.find_text("omega")] == ["omega task"]
+
+
+def test_writes_append_to_the_index_log_instead_of_rewriting_it(storage):
+    from tix.storage import deltas
+
+    for i in range(20):
+        storage.add_task(f"long enough task text number {i} for a snapshot")
+    storage.find_text("task")
+    snapshot = storage.index_path.read_bytes()
+    storage.add_task("Fix login bug")
+    task = storage.get_task(1)
+    task.text = "Fix signup bug"
+    storage.update_task(task)
+    # the snapshot is untouched; the writes are in the log and replayed on load
+    assert storage.index_path.read_bytes() == snapshot
+    assert len(deltas.log_path(storage.index_path).read_text().splitlines()) == 2
+    assert [t.id for t in storage.find_text("login")] == [21]
+    assert [t.id for t in storage.find_text("signup")] == [1]
+
+    # a log grown past a quarter of the snapshot is folded into it on the next search
+    for i in range(10):
+        storage.add_task(f"padding task {i} with enough text to grow the log quickly")
+    storage.find_text("padding")
+    assert not deltas.log_path(storage.index_path).exists()
+    assert [t.id for t in storage.find_text("login")] == [21]
+
+    # a write that is not logged leaves the index for a rebuild
+    storage.save_tasks(storage.load_tasks()[:1])
+    storage.add_task("after a bulk save")
+    assert not deltas.log_path(storage.index_path).exists()
+    assert [t.text for t in storage.find_text("bulk")] == ["after a bulk save"]
+
+
+def test_interrupted_save_keeps_the_previous_index(storage, monkeypatch):
+    from tix.storage import index as index_module
+
+    storage.add_task("Fix login bug")
+    storage.find_text("login")
+    index = TextIndex(storage.index_path)
+    assert index.load()
+    index.rebuild([], index.rev, index.stamp)
+
+    def crash(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(index_module.os, "replace", crash)
+    with pytest.raises(OSError):
+        index.save()
+    monkeypatch.undo()
+    assert TextIndex(storage.index_path).load()
+    assert [t.id for t in storage.find_text("login")] == [1]
@@ -0,0 +1,40 @@
+from tix.commands.listing import ansi_styler, plain_lines, select_tasks, task_cells
+from tix.models import Task
+
+
+def make_tasks():
+    tasks = [Task(id=i, text=f"task {i}", completed=(i % 3 == 0)) for i in range(10, 0, -1)]
+    return tasks
+
+
+def test_select_tasks_sorts_active_first():
+    ids = [t.id for t in select_tasks(make_tasks())]
+    assert ids == [1, 2, 4, 5, 7, 8, 10, 3, 6, 9]
+
+
+def test_select_tasks_limit_matches_full_sort():
+    """Top-K selection returns the same slice as a full sort"""
+    tasks = make_tasks()
+    full = [t.id for t in select_tasks(tasks)]
+    for offset in range(0, 11, 3):
+        for limit in (0, 1, 4, 20):
+            page = [t.id for t in select_tasks(tasks, limit=limit, offset=offset)]
+            assert page == full[offset:offset + limit]
+
+
+def test_task_cells_and_plain_lines():
+    task = Task(id=7, text="a very long task text", priority="high", tags=["x", "y"], links=["https://a"])
+    cells = task_cells(task, max_text_length=10)
+    assert cells == ["7", "○", "high", "a very ... 📎", "x, y"]
+    line = next(plain_lines([task], compact_mode=True))
+    assert line == "   7  ○  high      a very long task text 📎\n"
+
+
+def test_plain_lines_accept_rich_only_styles():
+    """Colours from config are rich style strings; ones click does not know must not fail"""
+    task = Task(id=1, text="styled", priority="high")
+    styled = ansi_styler("256")
+    line = next(plain_lines([task], compact_mode=True, style=lambda text, p: styled(text, "bold bright_magenta")))
+    assert "\x1b[1;95m" in line and "high" in line
+    line = next(plain_lines([task], compact_mode=True, style=lambda text, p: styled(text, "not a colour")))
+    assert line == "   1  ○  high      styled\n"
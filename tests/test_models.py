@@ -36,4 +36,25 @@ def test_mark_done():
 
     task.mark_done()
     assert task.completed == True
-    assert task.completed_at is not None
\ No newline at end of file
+    assert task.completed_at is not None
+
+def test_timestamps_are_epoch_seconds():
+    """ISO strings from older stores are converted to integer epoch seconds"""
+    task = Task(id=1, text="Old", created_at="2025-01-01T09:00:00")
+    assert task.created_at == int(datetime(2025, 1, 1, 9).timestamp())
+    assert task.to_dict()["created_at"] == task.created_at
+    assert Task.from_dict(task.to_dict()) == task
+
+    task.mark_done()
+    assert isinstance(task.completed_at, int)
+
+
+def test_datetime_accessors_are_cached():
+    task = Task(id=1, text="Test", created_at=int(datetime(2025, 3, 4, 5, 6).timestamp()))
+    assert task.created == datetime(2025, 3, 4, 5, 6)
+    assert task.created is task.created
+    assert task.completed_time is None
+
+    # a new value invalidates the cached view
+    task.created_at = int(datetime(2025, 3, 5).timestamp())
+    assert task.created == datetime(2025, 3, 5)
@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pytest
+
+from tix.models import Task
+from tix.storage.history import HistoryManager
+from tix.storage.index import TextIndex
+from tix.storage.json_storage import TaskStorage
+from tix.storage.query import QueryError, compile_query, plan
+
+NOW = datetime(2025, 3, 19, 12)
+
+
+def ts(*args):
+    return int(datetime(*args).timestamp())
+
+
+@pytest.fixture
+def tasks():
+    return [
+        Task(id=1, text="Ship release notes", priority="high", tags=["release", "docs"], created_at=ts(2025, 1, 5)),
+        Task(id=2, text="Fix login bug", priority="high", tags=["release", "bug"], created_at=ts(2025, 2, 10),
+             completed=True, completed_at=ts(2025, 3, 18)),
+        Task(id=3, text="Write blog post", priority="low", tags=["docs"], created_at=ts(2025, 3, 15)),
+        Task(id=4, text="Tag release build", priority="medium", tags=[], created_at=ts(2025, 3, 19)),
+    ]
+
+
+def ids(query, tasks):
+    q = compile_query(query, now=NOW)
+    return [t.id for t in tasks if q.match(t)]
+
+
+def test_terms(tasks):
+    assert ids("p:high", tasks) == [1, 2]
+    assert ids("p:h,l", tasks) == [1, 2, 3]
+    assert ids("tag:bug,docs", tasks) == [1, 2, 3]
+    assert ids("tag:release+docs", tasks) == [1]
+    assert ids("tags:[bug,docs] s:active", tasks) == [1, 3]
+    assert ids("release", tasks) == [1, 4]
+    assert ids('"release notes"', tasks) == [1]
+    assert ids("text:LOGIN", tasks) == [2]
+    assert ids("id:2-3", tasks) == [2, 3]
+    assert ids("id>2", tasks) == [3, 4]
+    assert ids("!tag:docs !s:done", tasks) == [4]
+    assert ids("!release", tasks) == [2, 3]
+
+
+def test_dates(tasks):
+    assert ids("created:2025-03", tasks) == [3, 4]
+    assert ids("created<2025-02", tasks) == [1]
+    assert ids("created>=2025-02-10 created<=2025-03-15", tasks) == [2, 3]
+    assert ids("created:7d", tasks) == [3, 4]
+    assert ids("created:today", tasks) == [4]
+    assert ids("completed:yesterday", tasks) == [2]
+
+
+def test_errors():
+    for bad in ("p:urgent", "created:someday", "tag:", "p>high", "id:5-2"):
+        with pytest.raises(QueryError):
+            compile_query(bad)
+    # lenient mode drops terms that do not parse yet, e.g. while typing
+    assert [t.kind for t in compile_query("p:hi tag: bug", strict=False).terms] == ["priority", "text"]
+
+
+def test_colons_and_phrases_are_plain_text():
+    tasks = [
+        Task(id=1, text="TODO: fix the login bug"),
+        Task(id=2, text="read http://example.com/docs"),
+        Task(id=3, text="fix bug in login"),
+    ]
+    assert ids("TODO: fix", tasks) == [1]
+    assert ids("http://example.com", tasks) == [2]
+    assert ids("owner:me", tasks) == []
+    # several words are one substring, as before the query language
+    assert ids("login bug", tasks) == [1]
+    assert ids("fix bug p:medium", tasks) == [3]
+    assert [t.values for t in compile_query("fix bug !login in").terms] == [("fix bug",), ("login",), ("in",)]
+
+
+def test_prepared_match_and_narrowing(tasks):
+    q = compile_query("tag:release rel !s:done", now=NOW)
+    assert [t.id for t in tasks if q.match_prepared(t, t.text.lower(), frozenset(t.tags))] == ids(q.source, tasks)
+
+    def narrows(new, old):
+        return compile_query(new, strict=False, now=NOW).narrows(compile_query(old, strict=False, now=NOW))
+    assert narrows("deploy", "dep")
+    assert narrows("dep p:high", "dep")
+    assert not narrows("p:hig deploy", "p:h dep")  # "p:hig" is dropped while typing
+    assert not narrows("!deploy", "!dep")
+    assert not narrows("id:10", "id:1")
+    assert not narrows("dep", "dep p:high")
+
+
+def test_planner_picks_most_selective_index(tasks):
+    index = TextIndex(None)
+    index.rebuild([t.to_dict() for t in tasks], rev=1)
+
+    p = plan(compile_query("tag:release blog"), index, hot_size=4)
+    assert p.candidates == {3} and p.steps[0].startswith("text index")
+
+    p = plan(compile_query("tag:bug release"), index, hot_size=4)
+    assert p.candidates == {2} and p.steps[0].startswith("tag index")
+
+    assert plan(compile_query("id:4"), hot_size=4).candidates == {4}
+    assert plan(compile_query("p:high"), index, hot_size=4).candidates is None
+
+    p = plan(compile_query("completed:2025-01"), hot_completed=0, months=["2024-12", "2025-01", "undated"])
+    assert not p.scan_hot and p.months == {"2025-01", "undated"}
+    assert plan(compile_query("s:active"), months=["2025-01"]).months == set()
+
+
+def test_storage_query_reads_only_needed_partitions(tmp_path):
+    storage = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "h.json"))
+    for text, completed_at in (("jan report", "2025-01-10T10:00:00"), ("feb report", "2025-02-10T10:00:00")):
+        task = storage.add_task(text, tags=["report"])
+        task.completed = True
+        task.completed_at = completed_at
+        storage.update_task(task)
+    storage.add_task("open report", tags=["report"])
+    storage.archive_completed(30, now=datetime(2025, 4, 1))
+
+    assert [t.text for t in storage.query("report", include_archived=True)] == ["open report", "jan report", "feb report"]
+    assert [t.text for t in storage.query("report s:active", include_archived=True)] == ["open report"]
+    assert [t.text for t in storage.query("completed:2025-02", include_archived=True)] == ["feb report"]
+
+    seen = []
+    original = storage.archive.iter_raw
+    storage.archive.iter_raw = lambda months=None: seen.append(months) or original(months)
+    storage.query("completed:2025-02 tag:report", include_archived=True)
+    assert seen == [{"2025-02"}]
@@ -0,0 +1,55 @@
+import pytest
+
+from tix.commands.selectors import is_bulk, missing_ids, parse_id_spec, parse_where, select
+from tix.models import Task
+
+
+@pytest.fixture
+def tasks():
+    return [
+        Task(id=1, text="Ship release notes", priority="high", tags=["release"]),
+        Task(id=2, text="Fix login bug", priority="high", tags=["release", "bug"], completed=True),
+        Task(id=3, text="Write blog post", priority="low", tags=["docs"]),
+        Task(id=4, text="Tag release", priority="medium", tags=["release"]),
+    ]
+
+
+def test_parse_id_spec():
+    assert parse_id_spec("7") == [(7, 7)]
+    assert parse_id_spec("100-250") == [(100, 250)]
+    assert parse_id_spec("1,3,10-12") == [(1, 1), (3, 3), (10, 12)]
+    with pytest.raises(ValueError, match="lower ID first"):
+        parse_id_spec("5-2")
+    # the message names the bad part and the accepted forms, not int()'s wording
+    with pytest.raises(ValueError) as e:
+        parse_id_spec("1,abc")
+    assert str(e.value) == "invalid ID 'abc' (use an ID like 3, a range like 3-7 or a list like 1,4)"
+    with pytest.raises(ValueError, match="invalid ID '3-x'"):
+        parse_id_spec("3-x")
+
+
+def test_parse_where(tasks):
+    match = parse_where("tag:release priority:high status:active")
+    assert [t.id for t in tasks if match(t)] == [1]
+    match = parse_where("p:h release")
+    assert [t.id for t in tasks if match(t)] == [1]
+    match = parse_where("id:2-4 s:done")
+    assert [t.id for t in tasks if match(t)] == [2]
+    # an unknown key is text to look for, not an error
+    assert [t.id for t in tasks if parse_where("owner:me")(t)] == []
+    with pytest.raises(ValueError):
+        parse_where("priority:urgent")
+
+
+def test_select_combines_ids_and_where(tasks):
+    assert [t.id for t in select(tasks, ["1-3"], "tag:release")] == [1, 2]
+    assert [t.id for t in select(tasks, [], "tag:release status:active")] == [1, 4]
+    assert [t.id for t in select(tasks, ["3", "4"])] == [3, 4]
+
+
+def test_missing_ids_and_bulk(tasks):
+    matched = select(tasks, ["3", "9", "10-20"])
+    assert missing_ids(["3", "9", "10-20"], matched) == [9]
+    assert not is_bulk(["3", "4"], None)
+    assert is_bulk(["3-4"], None)
+    assert is_bulk([], "tag:x")
@@ -74,3 +74,67 @@ def test_backward_compatibility(temp_storage):
     assert isinstance(data, dict)
     assert "next_id" in data
     assert "tasks" in data
+
+
+def test_update_and_delete_many(temp_storage):
+    """Bulk updates and deletes touch the store once and can be undone from history"""
+    tasks = [temp_storage.add_task(f"task {i}") for i in range(5)]
+    for t in tasks[:3]:
+        t.mark_done()
+    assert temp_storage.update_tasks(tasks[:3]) == 3
+    assert [t.id for t in temp_storage.get_completed_tasks()] == [1, 2, 3]
+
+    removed = temp_storage.delete_tasks([2, 4, 99])
+    assert sorted(t.id for t in removed) == [2, 4]
+    assert [t.id for t in temp_storage.load_tasks()] == [1, 3, 5]
+    assert temp_storage.delete_tasks([99]) == []
+
+
+def test_iso_store_is_migrated_once(temp_storage):
+    """Stores with ISO timestamps are rewritten with epoch seconds on first read"""
+    temp_storage.storage_path.write_text(json.dumps({"next_id": 2, "tasks": [
+        {"id": 1, "text": "Old", "completed": True,
+         "created_at": "2025-01-01T09:00:00", "completed_at": "2025-01-02T09:00:00"}
+    ]}))
+    task = temp_storage.get_task(1)
+    assert task.completed_time.day == 2
+
+    data = json.loads(temp_storage.storage_path.read_text())
+    assert data["schema"] == 2
+    assert isinstance(data["tasks"][0]["created_at"], int)
+    assert data["tasks"][0]["completed_at"] - data["tasks"][0]["created_at"] == 86400
+
+
+def test_apply_changes_renumbers_taken_ids(temp_storage):
+    """Adds with preassigned IDs and updates share one write; an ID taken meanwhile is reassigned"""
+    from tix.models import Task
+
+    first = temp_storage.add_task("first", record_history=False)
+    temp_storage.add_task("added elsewhere", record_history=False)  # took ID 2
+    first.text = "first, edited"
+    result = temp_storage.apply_changes([Task(id=2, text="mine"), Task(id=3, text="also mine")], [first],
+                                        record_history=False)
+    assert result.renumbered == {2: 4} and result.rev == result.base_rev + 1
+    assert sorted((t.id, t.text) for t in temp_storage.load_tasks()) == [
+        (1, "first, edited"), (2, "added elsewhere"), (3, "also mine"), (4, "mine")]
+    assert temp_storage.read_header()["next_id"] == 5
+    assert not temp_storage.storage_path.with_name(temp_storage.storage_path.name + ".tmp").exists()
+
+
+def test_apply_changes_reports_conflicts_instead_of_overwriting(temp_storage):
+    """An update based on a stale read of its task is not written"""
+    mine = temp_storage.add_task("mine", record_history=False)
+    gone = temp_storage.add_task("deleted elsewhere", record_history=False)
+    stale = temp_storage.add_task("stale", record_history=False)
+    expected = {t.id: t.to_dict() for t in (mine, gone, stale)}
+    other = temp_storage.get_task(stale.id)
+    other.text = "edited elsewhere"
+    temp_storage.update_task(other, record_history=False)
+    temp_storage.delete_tasks([gone.id], record_history=False)
+
+    for task in (mine, gone, stale):
+        task.text += ", edited here"
+    result = temp_storage.apply_changes([], [mine, gone, stale], record_history=False, expected=expected)
+    assert result.conflicts[gone.id] is None and result.conflicts[stale.id]["text"] == "edited elsewhere"
+    assert sorted(result.conflicts) == [gone.id, stale.id]
+    assert [t.text for t in temp_storage.load_tasks()] == ["mine, edited here", "edited elsewhere"]
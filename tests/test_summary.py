@@ -0,0 +1,106 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from tix.storage import summary as summaries
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+
+
+def fresh(storage):
+    return summaries.build(storage._read_data()["tasks"])
+
+
+def test_summary_tracks_every_write(storage):
+    """The header summary always equals a from-scratch rebuild"""
+    a = storage.add_task("a", tags=["work", "urgent"])
+    b = storage.add_task("b", tags=["work"])
+    storage.add_task("c")
+    assert storage.summary() == fresh(storage)
+    assert summaries.tag_counts(storage.summary()) == [("work", 2), ("urgent", 1)]
+
+    a.completed = True
+    a.tags = ["work"]
+    storage.update_task(a)
+    b.tags = []
+    storage.update_tasks([b])
+    storage.delete_task(a.id)
+    assert storage.summary() == fresh(storage)
+    assert storage.summary()["tags"] == {}
+    assert storage.summary()["untagged"] == {"total": 2, "active": 2, "completed": 0}
+
+
+def test_read_header_skips_tasks(storage):
+    storage.add_task("a", tags=["x"])
+    header = storage.read_header()
+    assert "tasks" not in header
+    assert header["next_id"] == 2
+    assert header["summary"]["tags"]["x"]["total"] == 1
+
+
+def test_old_store_is_upgraded(storage):
+    """Stores written before summaries existed get one on first use"""
+    storage.storage_path.write_text(json.dumps({"next_id": 2, "tasks": [{"id": 1, "text": "t", "tags": ["k"]}]}))
+    assert summaries.tag_counts(storage.summary()) == [("k", 1)]
+    assert "summary" in storage.read_header()
+
+
+def test_archive_summary_is_merged(storage):
+    task = storage.add_task("old", tags=["done"])
+    task.completed = True
+    task.completed_at = "2025-01-10T10:00:00"
+    storage.update_task(task)
+    storage.add_task("new", tags=["done"])
+    storage.archive_completed(30, now=datetime(2025, 4, 1))
+
+    assert storage.summary()["tags"]["done"]["total"] == 1
+    merged = storage.summary(include_archived=True)
+    assert merged["tags"]["done"] == {"total": 2, "active": 1, "completed": 1}
+
+    # a missing archive summary is rebuilt from the partitions
+    storage.archive.summary_path.unlink()
+    assert storage.summary(include_archived=True) == merged
+
+
+def test_status_priority_and_day_buckets(storage):
+    a = storage.add_task("a", priority="high")
+    storage.add_task("b", priority="low")
+    a.completed = True
+    a.completed_at = "2025-03-02T09:00:00"
+    storage.update_task(a)
+
+    summary = storage.summary()
+    assert summary["status"] == {"total": 2, "active": 1, "completed": 1}
+    assert summary["priority"]["high"] == {"total": 1, "active": 0, "completed": 1}
+    assert summary["priority"]["low"]["active"] == 1
+    assert summary["completed_by_day"] == {"2025-03-02": 1}
+
+    storage.delete_task(a.id)
+    assert storage.summary()["completed_by_day"] == {}
+    assert storage.summary() == fresh(storage)
+
+
+def test_show_stats_reads_summary_only(storage, monkeypatch):
+    """stats never loads the task list"""
+    from tix.commands import stats
+
+    task = storage.add_task("done", tags=["work"])
+    task.mark_done()
+    storage.update_task(task)
+    storage.add_task("todo")
+    monkeypatch.setattr(storage, "load_tasks", None)
+    monkeypatch.setattr(storage, "iter_tasks", None)
+
+    with stats.console.capture() as capture:
+        stats.show_stats(storage, detailed=True)
+    out = capture.get()
+    assert "Total tasks: 2" in out
+    assert "Completed today: 1" in out
+    assert "work: 1 task(s)" in out
+    assert f"{datetime.now().date()}: 1 task(s)" in out
@@ -0,0 +1,246 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("textual")
+
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage
+from tix.tui.app import Tix
+from tix.tui.model import TaskModel, WriteBehind
+from tix.tui.table import TaskTable
+from tix.tui import watch
+from tix.tui.watch import StoreWatcher
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+    for i in range(5):
+        storage.add_task(f"task {i + 1}", tags=["t"] if i % 2 else [])
+    return storage
+
+
+def run(app, steps):
+    async def main():
+        async with app.run_test() as pilot:
+            while app._loading:
+                await pilot.pause(0.01)
+            await steps(app, pilot)
+    asyncio.run(main())
+
+
+async def settle(app, pilot):
+    """Write pending changes now and wait for the writer"""
+    app._flush()
+    while app._writer.busy:
+        await pilot.pause(0.01)
+    await pilot.pause()
+
+
+async def until(pilot, condition, timeout=5.0):
+    """Wait for something the watcher or writer thread does"""
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await pilot.pause(0.02)
+    assert condition()
+
+
+def row_ids(app):
+    table = app.query_one(TaskTable)
+    return [int(table.get_row_at(i)[0]) for i in range(table.row_count)]
+
+
+def cells(app, task_id):
+    return app.query_one(TaskTable).get_row_at(row_ids(app).index(task_id))
+
+
+def test_actions_update_rows_in_place(storage, monkeypatch):
+    app = Tix(storage=storage)
+
+    async def steps(app, pilot):
+        loads = []
+        real = app._load_tasks
+        monkeypatch.setattr(app, "_load_tasks", lambda: loads.append(1) or real())
+        table = app.query_one(TaskTable)
+        table.move_cursor(row=1)
+        await pilot.press("d")
+        assert row_ids(app) == [1, 3, 4, 5, 2]
+        assert cells(app, 2)[1] == "✔"
+        app._handle_add("new one")
+        assert row_ids(app) == [1, 3, 4, 5, 6, 2]
+        app._handle_edit(3, "renamed")
+        assert cells(app, 3)[3] == "renamed"
+        # the table changes at once, the file only after the writer ran
+        assert storage.get_task(3).text == "task 3"
+        assert str(app.query_one("#status").render()) == "● 3 unsaved"
+        await settle(app, pilot)
+        # our own writes do not trigger a reload
+        assert loads == []
+        assert storage.get_task(2).completed and storage.get_task(3).text == "renamed"
+        assert storage.get_task(6).text == "new one"
+
+
+    run(app, steps)
+
+
+def test_tasks_added_while_loading_are_kept(storage, monkeypatch):
+    app = Tix(storage=storage)
+    release = threading.Event()
+    real = app._load_tasks
+    monkeypatch.setattr(app, "_load_tasks", lambda: release.wait(5) and real())
+
+    async def main():
+        async with app.run_test() as pilot:
+            assert app._loading
+            app._handle_add("typed early")
+            release.set()
+            await until(pilot, lambda: not app._loading)
+            await pilot.pause()
+            assert row_ids(app) == [1, 2, 3, 4, 5, 6]
+            assert app._tasks[6].text == "typed early"
+            await settle(app, pilot)
+            assert storage.get_task(6).text == "typed early"
+    asyncio.run(main())
+
+
+def test_changes_by_other_processes_are_merged(storage, monkeypatch):
+    app = Tix(storage=storage)
+
+    async def steps(app, pilot):
+        loads = []
+        monkeypatch.setattr(app, "_load_tasks", lambda: loads.append(1))
+        other = storage.get_task(4)
+        other.text = "changed elsewhere"
+        storage.update_task(other)
+        storage.delete_tasks([5])
+        storage.add_task("added elsewhere")
+        await until(pilot, lambda: 6 in row_ids(app))
+        assert row_ids(app) == [1, 2, 3, 4, 6] and cells(app, 4)[3] == "changed elsewhere"
+        assert loads == [] and app._model.rev == storage.read_header()["rev"]
+
+        # an edit of a task another process changed before it was written is not written
+        app._handle_edit(4, "edited here")
+        stale = storage.get_task(4)
+        stale.text = "edited there"
+        storage.update_task(stale)
+        await settle(app, pilot)
+        assert storage.get_task(4).text == "edited there"
+        assert cells(app, 4)[3] == "edited there" and not app._model.pending(4)
+
+    run(app, steps)
+
+
+def test_search_diffs_visible_rows(storage):
+    app = Tix(storage=storage)
+
+    async def steps(app, pilot):
+        app._search("tag:t")
+        assert row_ids(app) == [2, 4]
+        app._search("~task 5")
+        assert row_ids(app)[0] == 5
+        app._search("")
+        assert row_ids(app) == [1, 2, 3, 4, 5]
+
+    run(app, steps)
+
+
+def test_write_behind_coalesces_and_renumbers(storage):
+    model = TaskModel(storage)
+    model.load()
+    saved = []
+    writer = WriteBehind(storage, saved.append, lambda e, batch: pytest.fail(str(e)))
+    task = model.add("mine")
+    storage.add_task("added elsewhere")  # takes ID 6 in the file
+    writer.submit(model.take())
+    task.text = "mine, edited"
+    model.changed(task)
+    writer.submit(model.take())
+    threading.Thread(target=writer.run).start()
+    assert writer.close(timeout=10)
+    # both batches were merged into one write; the edit followed the task to its new ID
+    assert [r.renumbered for r in saved] == [{6: 7}] and not writer.busy
+    assert storage.get_task(7).text == "mine, edited"
+    assert storage.get_task(6).text == "added elsewhere"
+    assert [t.id for t in model.renumber(saved[0].renumbered)] == [7]
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_store_watcher_notices_replaced_file(storage, monkeypatch, inotify):
+    if not inotify:
+        monkeypatch.setattr(watch, "_libc", lambda: None)
+    elif watch._libc() is None:
+        pytest.skip("no inotify")
+    calls = []
+    changed = threading.Event()
+    watcher = StoreWatcher(storage.storage_path, lambda: calls.append(1) or changed.set(), interval=0.05)
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    try:
+        assert changed.wait(5) and calls == [1]  # the first check always reports
+        changed.clear()
+        (storage.storage_path.parent / "notes.txt").write_text("x")  # other files do not count
+        storage.add_task("written elsewhere")
+        assert changed.wait(5) and len(calls) == 2
+        assert watcher.mode == ("inotify" if inotify else "polling")
+        changed.clear()
+        watcher.poke()
+        assert changed.wait(5) and len(calls) == 3
+    finally:
+        watcher.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_search_is_debounced_and_narrows(storage, monkeypatch):
+    app = Tix(storage=storage)
+
+    async def steps(app, pilot):
+        scans = []
+        real = app._candidates
+        monkeypatch.setattr(app, "_candidates", lambda q: scans.append(q.source) or real(q))
+        app.action_search_tasks()
+        for ch in "task":
+            await pilot.press(ch)
+        await pilot.pause(0.3)
+        # four keystrokes, one search over all tasks
+        assert scans == ["task"] and len(row_ids(app)) == 5
+        await pilot.press("space", "5")
+        await pilot.pause(0.3)
+        # the extended query only filtered the previous matches
+        assert scans == ["task"] and row_ids(app) == [5]
+        await pilot.press("backspace")
+        await pilot.pause(0.3)
+        assert scans == ["task", "task "]
+
+    run(app, steps)
+
+
+def test_table_renders_only_rows_in_view(tmp_path, monkeypatch):
+    from tix.models import Task
+    from tix.tui import table as table_module
+
+    storage = TaskStorage(tmp_path / "big.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+    storage.save_tasks([Task(id=i, text=f"task {i}", completed=i % 2 == 0) for i in range(1, 10_001)])
+    rendered = []
+    real = table_module.task_cells
+    monkeypatch.setattr(table_module, "task_cells", lambda t: rendered.append(t.id) or real(t))
+    app = Tix(storage=storage)
+
+    async def steps(app, pilot):
+        await pilot.pause()
+        table = app.query_one(TaskTable)
+        assert table.row_count == 10_000 and table.get_row_at(0)[0] == "1"
+        assert 0 < len(set(rendered)) <= table.size.height + 1
+        rendered.clear()
+        await pilot.press("end")
+        await pilot.pause()
+        assert table.cursor_task.id == 10_000
+        assert 10_000 in rendered and len(set(rendered)) <= table.size.height + 1
+        # completing a task moves its row without re-sorting the table
+        await pilot.press("home", "d")
+        assert table.get_row_at(4998)[0] == "9999" and table.get_row_at(4999)[0] == "1"
+
+    run(app, steps)
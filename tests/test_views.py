@@ -0,0 +1,98 @@
+import pytest
+
+from tix.storage.history import HistoryManager
+from tix.storage.json_storage import TaskStorage
+from tix.storage.query import QueryError, compile_query
+from tix.storage.views import MaterializedViews
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return TaskStorage(tmp_path / "tasks.json", context="test", history=HistoryManager(tmp_path / "history.json"))
+
+
+def view_ids(storage, name, query):
+    return [t.id for t in storage.view(name, query)]
+
+
+def test_view_is_maintained_by_writes(storage):
+    query = "p:high tag:work s:active"
+    storage.add_task("Deploy", priority="high", tags=["work"])
+    storage.add_task("Groceries", priority="high", tags=["home"])
+    storage.materialize("urgent", query)
+    assert view_ids(storage, "urgent", query) == [1]
+
+    storage.add_task("Review PR", priority="high", tags=["work"])
+    task = storage.get_task(2)
+    task.tags = ["work"]
+    storage.update_task(task)
+    task = storage.get_task(1)
+    task.mark_done()
+    storage.update_task(task)
+    storage.delete_task(3)
+    assert view_ids(storage, "urgent", query) == [2]
+
+    # the incremental view equals a fresh evaluation of the query
+    expected = [t.id for t in compile_query(query).filter(storage.load_tasks())]
+    views = MaterializedViews(storage.views_path)
+    views.load()
+    assert [i["id"] for i in views.get("urgent")] == expected
+    assert views.rev == storage.read_header()["rev"]
+
+
+def test_stale_view_is_rebuilt(storage):
+    storage.add_task("alpha", tags=["x"])
+    storage.materialize("x", "tag:x")
+    # bulk writes without deltas leave the views behind the store
+    tasks = storage.load_tasks()
+    tasks[0].tags = []
+    storage.save_tasks(tasks)
+    assert view_ids(storage, "x", "tag:x") == []
+
+
+def test_view_defined_on_first_use_and_redefined_on_new_query(storage):
+    storage.add_task("alpha", priority="low")
+    storage.add_task("beta", priority="high")
+    assert view_ids(storage, "v", "p:low") == [1]
+    assert view_ids(storage, "v", "p:high") == [2]
+    assert storage.drop_view("v")
+    assert not storage.drop_view("v")
+
+
+def test_clock_dependent_queries_are_rejected(storage):
+    with pytest.raises(QueryError):
+        storage.materialize("recent", "created:7d")
+    MaterializedViews.check("created>2025-01")
+
+
+def test_restored_store_with_a_repeated_revision_refills_views(storage, tmp_path):
+    import shutil
+
+    storage.add_task("alpha", tags=["x"])
+    storage.materialize("x", "tag:x")
+    backup = tmp_path / "backup.json"
+    shutil.copy(storage.storage_path, backup)
+    storage.add_task("beta", tags=["x"])
+    assert view_ids(storage, "x", "tag:x") == [1, 2]
+    shutil.copy(backup, storage.storage_path)
+    storage.add_task("gamma", tags=["y"])
+    assert view_ids(storage, "x", "tag:x") == [1]
+
+
+def test_interrupted_save_keeps_the_previous_views(storage, monkeypatch):
+    from tix.storage import views as views_module
+
+    storage.add_task("alpha", tags=["x"])
+    storage.materialize("x", "tag:x")
+    views = MaterializedViews(storage.views_path)
+    assert views.load()
+    views.views["x"]["tasks"] = {}
+
+    def crash(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(views_module.os, "replace", crash)
+    with pytest.raises(OSError):
+        views.save()
+    monkeypatch.undo()
+    assert MaterializedViews(storage.views_path).load()
+    assert view_ids(storage, "x", "tag:x") == [1]
@@ -4,24 +4,111 @@ import subprocess
 import platform
 import os
 import sys
-from rich.console import Console
-from rich.table import Table
 from pathlib import Path
-from tix.storage.json_storage import TaskStorage
+from tix.storage.json_storage import GLOBAL_CONTEXT, TaskStorage
 from tix.storage.context_storage import ContextStorage
 from tix.storage.history import HistoryManager
 from tix.storage.backup import create_backup, list_backups, restore_from_backup
-from tix.models import Task
-from rich.prompt import Prompt
-from rich.markdown import Markdown
+from tix.models import Task, now_epoch
 from datetime import datetime
 from .storage import storage
 from .config import CONFIG
 from .context import context_storage
 
-console = Console()
+
+
+class _LazyConsole:
+    """Create the rich console on first use so machine-readable output never imports rich"""
+
+    _console = None
+
+    def get(self):
+        """The underlying rich Console, for APIs that need the real object (e.g. progress bars)"""
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return _LazyConsole._console
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+console = _LazyConsole()
 storage = TaskStorage()
 
+MACHINE_FORMATS = ['tsv', 'jsonl', 'ids']
+
+
+def _format_option(f):
+    """--format option shared by ls, search, filter apply and tags"""
+    return click.option('--format', 'output_format', type=click.Choice(['table'] + MACHINE_FORMATS),
+                        default='table', help='Output format (tsv, jsonl and ids skip rich rendering)')(f)
+
+
+def _contexts_option(f):
+    """--all-contexts / --contexts options shared by ls, search, stats and tags"""
+    f = click.option('--contexts', 'contexts', help='Comma-separated contexts to read, e.g. work,home')(f)
+    return click.option('--all-contexts', is_flag=True, help='Read every context')(f)
+
+
+def _task_source(all_contexts, contexts):
+    """The active context's storage, or a read-only set of the requested contexts (None if one is unknown)"""
+    if not all_contexts and not contexts:
+        return storage
+    from tix.storage.contexts import ContextSet
+    names = [c.strip() for c in contexts.split(",") if c.strip()] if contexts else None
+    try:
+        return ContextSet.select(names)
+    except KeyError as e:
+        console.print(f"[red]✗[/red] Unknown context(s): {e.args[0]}")
+        return None
+
+
+def _global_option(f):
+    """--global option shared by add, done, rm and edit"""
+    return click.option('--global', '-g', 'is_global', is_flag=True,
+                        help='Use the global tasks shared by every context')(f)
+
+
+def _store(is_global):
+    """The store a write goes to: the global store for --global, else the active context"""
+    return storage.global_store if is_global else storage
+
+
+def _with_global(tasks, shared):
+    """Merge global tasks into the active context's results, labelling both by context"""
+    from tix.storage.contexts import merge_key
+    for task in tasks:
+        task.context = storage.context
+    return sorted(list(tasks) + shared, key=merge_key)
+
+
+def _write_machine(tasks, output_format, show_context=False):
+    """Write tasks straight to stdout in a machine-readable format (with contexts when stores are merged)"""
+    from tix.commands.export import MACHINE_WRITERS
+    MACHINE_WRITERS[output_format](tasks, click.get_text_stream("stdout"), show_context=show_context)
+
+
+def _scope(task_ids, is_global):
+    """
+    The store a command acts on and its ID specs: g-prefixed IDs (g3, g1-4) and --global
+    select global tasks, other IDs the active context's. Raises UsageError for a mix.
+    """
+    from tix.commands.selectors import split_global
+
+    local, shared = split_global(task_ids)
+    if shared and local:
+        raise click.UsageError("Give either global task IDs (like g3) or context task IDs, not both")
+    if shared:
+        return storage.global_store, shared
+    return _store(is_global), local
+
+
+def _ref(store, task_id):
+    """A task ID as the user types it: g<ID> in the global store"""
+    from tix.commands.selectors import GLOBAL_PREFIX
+    return f"{GLOBAL_PREFIX}{task_id}" if store is not storage and store.context == GLOBAL_CONTEXT else str(task_id)
+
 from typing import Optional, Dict, Any
 import json
 
@@ -45,6 +132,17 @@ def cli(ctx):
     if ctx.invoked_subcommand is None:
         ctx.invoke(ls)
 
+
+def _auto_archive():
+    """
+    Move old completed tasks into the compressed archive if archive.after_days is set
+    (checked at most once a day). Only called by commands that write the store anyway.
+    """
+    try:
+        storage.maybe_archive(CONFIG.get('archive', {}).get('after_days', 0))
+    except Exception:
+        pass
+
 # -----------------------
 # Backup CLI group
 # -----------------------
@@ -146,9 +244,10 @@ def restore(backup_file, data_file, yes):
               type=click.Choice(['low', 'medium', 'high']),
               help='Set task priority')
 @click.option('--tag', '-t', multiple=True, help='Add tags to task')
-@click.option('--attach', '-f', multiple=True, help='Attach file(s)')
+@click.option('--attach', '-f', multiple=True, help='Attach file(s), directories or globs')
 @click.option('--link', '-l', multiple=True, help='Attach URL(s)')
-def add(task, priority, tag, attach, link):
+@_global_option
+def add(task, priority, tag, attach, link, is_global=False):
     """Add a new task"""
     from tix.config import CONFIG
 
@@ -161,23 +260,16 @@ def add(task, priority, tag, attach, link):
     tags = list(default_tags) + list(tag)
     tags = list(dict.fromkeys(tags))  # preserve order, unique
 
-    new_task = storage.add_task(task, priority, tags)
+    # copy attachments before creating the task, so a failed copy leaves nothing behind
+    ingested = _ingest_attachments(attach) if attach else []
+    if ingested is None:
+        sys.exit(1)
+
+    new_task = storage.add_task(task, priority, tags, is_global=is_global)
 
     # Handle attachments
-    if attach:
-        attachment_dir = Path.home() / ".tix" / "attachments" / str(new_task.id)
-        attachment_dir.mkdir(parents=True, exist_ok=True)
-        for file_path in attach:
-            try:
-                src = Path(file_path).expanduser().resolve()
-                if not src.exists():
-                    console.print(f"[red]✗[/red] File not found: {file_path}")
-                    continue
-                dest = attachment_dir / src.name
-                dest.write_bytes(src.read_bytes())
-                new_task.attachments.append(str(dest))
-            except Exception as e:
-                console.print(f"[red]✗[/red] Failed to attach {file_path}: {e}")
+    if ingested:
+        _link_attachments(new_task, ingested, _store(is_global))
 
     # Links
     if link:
@@ -185,23 +277,44 @@ def add(task, priority, tag, attach, link):
             new_task.links = []
         new_task.links.extend(link)
 
-    storage.update_task(new_task, record_history=False)
+    _store(is_global).update_task(new_task, record_history=False)
 
     color = {'high': 'red', 'medium': 'yellow', 'low': 'green'}[priority]
-    console.print(f"[green]✔[/green] Added task #{new_task.id}: [{color}]{task}[/{color}]")
+    scope = " global" if is_global else ""
+    console.print(f"[green]✔[/green] Added{scope} task #{_ref(_store(is_global), new_task.id)}: [{color}]{task}[/{color}]")
     if tags:
         console.print(f"[dim]  Tags: {', '.join(tags)}[/dim]")
     if attach or link:
         console.print(f"[dim]  Attachments/Links added[/dim]")
+    _auto_archive()
 
 
 @cli.command()
 @click.option("--all", "-a", "show_all", is_flag=True, help="Show completed tasks too")
-def ls(show_all):
+@click.option("--limit", "-n", type=click.IntRange(min=0), default=None, help="Show at most N tasks")
+@click.option("--offset", type=click.IntRange(min=0), default=0, help="Skip the first M tasks")
+@click.option("--page", is_flag=True, help="Stream rows through $PAGER")
+@_format_option
+@_contexts_option
+def ls(show_all, limit, offset, page, output_format, all_contexts=False, contexts=None):
     """List all tasks"""
     from tix.config import CONFIG
+    from tix.commands.listing import ansi_styler, select_tasks, plain_lines, task_cells
 
-    tasks = storage.load_tasks() if show_all else storage.get_active_tasks()
+    source = _task_source(all_contexts, contexts)
+    if source is None:
+        return
+    multi = source is not storage
+    tasks = source.load_tasks(include_archived=True) if show_all else source.get_active_tasks()
+    # global tasks are merged into every context's listing
+    shared = [] if multi else storage.global_tasks(include_completed=show_all)
+    if shared:
+        multi = True
+        tasks = _with_global(tasks, shared)
+
+    if output_format != 'table':
+        _write_machine(select_tasks(tasks, limit=limit, offset=offset), output_format, show_context=multi)
+        return
 
     if not tasks:
         console.print("[dim]No tasks found. Use 'tix add' to create one![/dim]")
@@ -219,8 +332,44 @@ def ls(show_all):
     status_colors = CONFIG.get('colors', {}).get('status', {})
     tag_color = CONFIG.get('colors', {}).get('tags', 'cyan')
 
+    total = len(tasks)
+    completed_count = sum(1 for t in tasks if getattr(t, "completed", False))
+    selected = select_tasks(tasks, limit=limit, offset=offset)
+    shown = f"Showing {offset + 1}-{offset + len(selected)} of {total}" if (limit is not None or offset) and selected else None
+    summary = f"Total tasks:{total}\nActive tasks:{total - completed_count}\nCompleted tasks:{completed_count}"
+
+    def color_for(priority):
+        return priority_colors.get(priority, {'high': 'red', 'medium': 'yellow', 'low': 'green'}.get(priority, 'yellow'))
+
+    # colours are rich style strings ("bold green"), rendered to ANSI without a table
+    styled = ansi_styler(console.color_system or "standard")
+    rows = plain_lines(selected, show_ids, show_dates, compact_mode, max_text_length,
+                       style=lambda text, p: styled(text, color_for(p)), show_context=multi)
+
+    if page:
+        def paged():
+            yield from rows
+            if shown:
+                yield f"\n{shown}\n"
+            yield f"\n{summary}\n"
+        click.echo_via_pager(paged())
+        return
+
+    if not console.is_terminal:
+        # fast path for pipes: no table layout, rows are written as they are rendered
+        for line in rows:
+            click.echo(line, nl=False)
+        if shown:
+            click.echo(shown)
+        click.echo(summary)
+        return
+
+    from rich.table import Table
+
     title = "All Tasks" if show_all else "Tasks"
     table = Table(title=title)
+    if multi:
+        table.add_column("Context", style="magenta")
     if show_ids:
         table.add_column("ID", style="cyan", width=4)
     table.add_column("✔", width=3)
@@ -231,66 +380,42 @@ def ls(show_all):
     if show_dates:
         table.add_column("Created", style="dim")
 
-    count = dict()
-
-    for task in sorted(tasks, key=lambda t: (getattr(t, "completed", False), getattr(t, "id", 0))):
-        status = "✔" if getattr(task, "completed", False) else "○"
-        priority_color = priority_colors.get(getattr(task, "priority", "medium"),
-                                            {'high': 'red', 'medium': 'yellow', 'low': 'green'}[getattr(task, "priority", "medium")])
-        tags_str = ", ".join(getattr(task, "tags", [])) if getattr(task, "tags", None) else ""
-
-        attach_icon = " 📎" if getattr(task, "attachments", None) or getattr(task, "links", None) else ""
-
-        # text truncation
-        text_val = getattr(task, "text", getattr(task, "task", ""))
-        if max_text_length and max_text_length > 0 and len(text_val) > max_text_length:
-            text_val = text_val[: max_text_length - 3] + "..."
-
-        task_style = "dim strike" if getattr(task, "completed", False) else ""
-        row = []
-        if show_ids:
-            row.append(str(getattr(task, "id", "")))
-        row.append(status)
-        row.append(f"[{priority_color}]{getattr(task, 'priority', '')}[/{priority_color}]")
-        if getattr(task, "completed", False):
-            row.append(f"[{task_style}]{text_val}[/{task_style}]{attach_icon}")
-        else:
-            row.append(f"{text_val}{attach_icon}")
-        if not compact_mode:
-            row.append(tags_str)
-        if show_dates:
-            created = getattr(task, "created", getattr(task, "created_at", None))
-            if created:
-                try:
-                    created_date = datetime.fromisoformat(created).strftime('%Y-%m-%d')
-                    row.append(created_date)
-                except:
-                    row.append("")
-            else:
-                row.append("")
+    text_col = (3 if show_ids else 2) + multi
+    for task in selected:
+        row = task_cells(task, show_ids, show_dates, compact_mode, max_text_length, show_context=multi)
+        priority_color = color_for(task.priority)
+        row[text_col - 1] = f"[{priority_color}]{row[text_col - 1]}[/{priority_color}]"
+        if task.completed:
+            attach_icon = " 📎" if task.attachments or task.links else ""
+            plain_text = row[text_col][: len(row[text_col]) - len(attach_icon)]
+            row[text_col] = f"[dim strike]{plain_text}[/dim strike]{attach_icon}"
         table.add_row(*row)
-        count[getattr(task, "completed", False)] = count.get(getattr(task, "completed", False), 0) + 1
 
     console.print(table)
     if not compact_mode:
         console.print("\n")
-    console.print(f"[cyan]Total tasks:{sum(count.values())}")
-    console.print(f"[cyan]Active tasks:{count.get(False, 0)}")
-    console.print(f"[green]Completed tasks:{count.get(True, 0)}")
+    if shown:
+        console.print(f"[dim]{shown}[/dim]")
+    console.print(f"[cyan]Total tasks:{total}")
+    console.print(f"[cyan]Active tasks:{total - completed_count}")
+    console.print(f"[green]Completed tasks:{completed_count}")
 
     if show_all:
-        active = len([t for t in tasks if not getattr(t, "completed", False)])
-        completed = len([t for t in tasks if getattr(t, "completed", False)])
-        console.print(f"\n[dim]Total: {len(tasks)} | Active: {active} | Completed: {completed}[/dim]")
+        console.print(f"\n[dim]Total: {total} | Active: {total - completed_count} | Completed: {completed_count}[/dim]")
 
 
 @cli.command()
-@click.argument("task_id", type=int)
-def done(task_id):
-    """Mark a task as done"""
+@click.argument("task_id")
+@_global_option
+def done(task_id, is_global=False):
+    """Mark a task as done (g<ID>, e.g. g3, for a global task)"""
     from tix.config import CONFIG
 
-    task = storage.get_task(task_id)
+    store, (spec,) = _scope([task_id], is_global)
+    if not spec.isdigit():
+        raise click.BadParameter(f"'{task_id}' is not a task ID like 3 or g3", param_hint="TASK_ID")
+    task_id = _ref(store, spec)
+    task = store.get_task(int(spec), include_archived=True)
     if not task:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
         return
@@ -304,58 +429,101 @@ def done(task_id):
         task.mark_done()
     else:
         task.completed = True
-        task.completed_at = datetime.now().isoformat()
-    storage.update_task(task)
+        task.completed_at = now_epoch()
+    store.update_task(task)
 
     if CONFIG.get('notifications', {}).get('on_completion', True):
         console.print(f"[green]✔[/green] Completed: {getattr(task, 'text', getattr(task, 'task', ''))}")
     else:
         console.print(f"[green]✔[/green] Task #{task_id} completed")
+    _auto_archive()
+
+
+def _select_targets(task_ids, where, is_global=False):
+    """
+    Resolve ID/range arguments and a --where selector in one pass against the active
+    context, or the global store for --global or g-prefixed IDs (see _scope).
+    Returns (store, matched_tasks, missing_refs) or None after printing an error.
+    """
+    from tix.commands.selectors import select, missing_ids
+
+    if not task_ids and not where:
+        raise click.UsageError("Give at least one task ID, an ID range like 100-250, or --where")
+    store, specs = _scope(task_ids, is_global)
+    try:
+        matched = select(store.load_tasks(), specs, where)
+        missing = missing_ids(specs, matched)
+    except ValueError as e:
+        console.print(f"[red]✗[/red] Invalid selector: {e}")
+        return None
+    if missing and store.archive.exists():
+        # archived tasks are read-only here: say so instead of calling them missing
+        archived_ids = {item.get("id") for item in store.archive.iter_raw()}
+        archived = [i for i in missing if i in archived_ids]
+        if archived:
+            refs = ", ".join(f"#{_ref(store, i)}" for i in archived)
+            console.print(f"[yellow]Archived, bring back with `tix undo <ID>` first: {refs}[/yellow]")
+            missing = [i for i in missing if i not in archived_ids]
+    return store, matched, [_ref(store, i) for i in missing]
+
+
+def _confirm_bulk(store, targets, action):
+    """Preview the selected tasks like `clear` does and ask for confirmation"""
+    count = len(targets)
+    console.print(f"[yellow]About to {action} {count} task(s):[/yellow]")
+    for task in targets[:5]:
+        console.print(f"  - #{_ref(store, task.id)}: {task.text}")
+    if count > 5:
+        console.print(f"  ... and {count - 5} more")
+    if not click.confirm("Continue?"):
+        console.print("[dim]Cancelled[/dim]")
+        return False
+    return True
 
 
 @cli.command()
-@click.argument("task_id", type=int)
+@click.argument("task_ids", nargs=-1)
+@click.option("--where", "-w", help='Select tasks, e.g. "tag:release priority:high status:active"')
 @click.option("--confirm", "-y", is_flag=True, help="Skip confirmation")
-def rm(task_id, confirm):
-    """Remove a task"""
-    task = storage.get_task(task_id)
-    if not task:
+@_global_option
+def rm(task_ids, where, confirm, is_global=False):
+    """Remove tasks by ID, ID range (e.g. 100-250) or --where selector"""
+    from tix.commands.selectors import is_bulk
+
+    selection = _select_targets(task_ids, where, is_global)
+    if selection is None:
+        return
+    store, targets, missing = selection
+    for task_id in missing:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
+    if not targets:
+        if not missing:
+            console.print("[yellow]No tasks match the selector[/yellow]")
         return
 
+    bulk = len(targets) > 1 or is_bulk(task_ids, where)
     if not confirm:
-        if not click.confirm(f"Are you sure you want to delete task #{task_id}: '{getattr(task, 'text', getattr(task, 'task', ''))}'?"):
+        if bulk:
+            if not _confirm_bulk(store, targets, "delete"):
+                return
+        elif not click.confirm(f"Are you sure you want to delete task #{_ref(store, targets[0].id)}: '{targets[0].text}'?"):
             console.print("[yellow]⚠ Cancelled[/yellow]")
             return
 
     # Auto-backup
     try:
-        bpath = create_backup(storage.storage_path)
+        bpath = create_backup(store.storage_path)
         console.print(f"[dim]Backup created before delete:[/dim] {bpath}")
     except Exception as e:
         console.print(f"[red]Failed to create backup before delete:[/red] {e}")
         console.print("[red]Aborting delete.[/red]")
         return
 
-    # delete
-    if hasattr(storage, "delete_task"):
-        ok = storage.delete_task(task_id)
-        if ok:
-            console.print(f"[red]✗[/red] Removed: {getattr(task, 'text', getattr(task, 'task', ''))}")
-    elif hasattr(storage, "remove_task"):
-        storage.remove_task(task_id)
-        console.print(f"[red]✖ Task {task_id} removed[/red]")
-    else:
-        # fallback: write back without that task
-        try:
-            tasks = storage.load_tasks()
-            remaining = [t for t in tasks if getattr(t, "id", None) != task_id]
-            if hasattr(storage, "save_tasks"):
-                storage.save_tasks(remaining)
-            else:
-                console.print(f"[red]✗[/red] Could not remove task {task_id} (no supported API).")
-        except Exception as e:
-            console.print(f"[red]✗[/red] Error removing task: {e}")
+    if bulk:
+        removed = store.delete_tasks([t.id for t in targets])
+        console.print(f"[red]✗[/red] Removed {len(removed)} task(s)")
+    elif store.delete_task(targets[0].id):
+        console.print(f"[red]✗[/red] Removed: {targets[0].text}")
 
 
 @cli.command()
@@ -364,19 +532,23 @@ def rm(task_id, confirm):
 def clear(completed, force):
     """Clear multiple tasks at once"""
     tasks = storage.load_tasks()
+    archived = []
     if completed:
         to_clear = [t for t in tasks if getattr(t, "completed", False)]
         remaining = [t for t in tasks if not getattr(t, "completed", False)]
         task_type = "completed"
+        # archived tasks are completed tasks too
+        archived = list(storage.archive.iter_tasks())
     else:
         to_clear = [t for t in tasks if not getattr(t, "completed", False)]
         remaining = [t for t in tasks if getattr(t, "completed", False)]
         task_type = "active"
 
-    if not to_clear:
+    if not to_clear and not archived:
         console.print(f"[yellow]No {task_type} tasks to clear[/yellow]")
         return
 
+    to_clear += archived
     count = len(to_clear)
     if not force:
         console.print(f"[yellow]About to clear {count} {task_type} task(s):[/yellow]")
@@ -408,25 +580,130 @@ def clear(completed, force):
                 storage.update_task(t)
             except Exception:
                 pass
+    if archived:
+        storage.archive.clear()
 
     console.print(f"[green]✔[/green] Cleared {count} {task_type} task(s)")
 
 
 @cli.command()
-@click.argument("task_id", type=int)
+@click.argument("task_ids", nargs=-1)
+@click.option("--where", "-w", help='Select tasks, e.g. "tag:release priority:high status:active"')
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation for bulk edits")
 @click.option('--text', '-t', help='New task text')
 @click.option('--priority', '-p', type=click.Choice(['low', 'medium', 'high']), help='New priority')
 @click.option('--add-tag', multiple=True, help='Add tags')
 @click.option('--remove-tag', multiple=True, help='Remove tags')
-@click.option('--attach', '-f', multiple=True, help='Attach file(s)')
+@click.option('--attach', '-f', multiple=True, help='Attach file(s), directories or globs')
 @click.option('--link', '-l', multiple=True, help='Attach URL(s)')
-def edit(task_id, text, priority, add_tag, remove_tag, attach, link):
-    """Edit a task"""
-    task = storage.get_task(task_id)
-    if not task:
+@_global_option
+def edit(task_ids, where, yes, text, priority, add_tag, remove_tag, attach, link, is_global=False):
+    """Edit a task, an ID range (e.g. 100-250) or tasks matching --where"""
+    from tix.commands.selectors import is_bulk
+
+    selection = _select_targets(task_ids, where, is_global)
+    if selection is None:
+        return
+    store, targets, missing = selection
+    for task_id in missing:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
+    if not targets:
+        if not missing:
+            console.print("[yellow]No tasks match the selector[/yellow]")
+        return
+
+    bulk = len(targets) > 1 or is_bulk(task_ids, where)
+    if bulk and not yes and not _confirm_bulk(store, targets, "edit"):
+        return
+
+    # every copy finishes before any task changes; a failed copy aborts the edit
+    ingested = _ingest_attachments(attach) if attach else []
+    if ingested is None:
+        return
+
+    changed = []
+    for task in targets:
+        changes = _apply_edit(task, text, priority, add_tag, remove_tag, ingested, link, store)
+        if changes:
+            changed.append((task, changes))
+
+    if not changed:
+        console.print("[yellow]No changes made[/yellow]")
         return
 
+    if len(changed) == 1 and not bulk:
+        store.update_task(changed[0][0])
+    else:
+        store.update_tasks([task for task, _ in changed])
+
+    from tix.config import CONFIG
+    if bulk:
+        console.print(f"[green]✔[/green] Updated {len(changed)} task(s)")
+    elif CONFIG.get('notifications', {}).get('on_update', True):
+        console.print(f"[green]✔[/green] Updated task #{_ref(store, changed[0][0].id)}:")
+        for c in changed[0][1]:
+            console.print(f"  • {c}")
+    else:
+        console.print(f"[green]✔[/green] Task #{_ref(store, changed[0][0].id)} updated")
+
+
+def _ingest_attachments(patterns):
+    """
+    Copy files, directories and globs into the blob store in parallel with a progress bar.
+    Returns (source, hash) pairs, or None if a copy failed and nothing was kept.
+    """
+    import time
+    from rich.filesize import decimal
+    from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TransferSpeedColumn
+    from tix.storage.blobs import IngestError, NameClashError, expand_sources
+
+    try:
+        sources, missing = expand_sources(patterns)
+    except NameClashError as e:
+        console.print(f"[red]✗[/red] Different files would be attached as: {e}; nothing was attached")
+        return None
+    for pattern in missing:
+        console.print(f"[red]✗[/red] File not found: {pattern}")
+    if not sources:
+        return []
+    total = sum(source.path.stat().st_size for source in sources)
+    start = time.perf_counter()
+    with Progress(TextColumn("Attaching"), BarColumn(), DownloadColumn(), TransferSpeedColumn(),
+                  console=console.get(), transient=True) as progress:
+        bar = progress.add_task("attach", total=total)
+        try:
+            digests = storage.get_blob_store().ingest_many(
+                [source.path for source in sources], advance=lambda n: progress.update(bar, advance=n))
+        except IngestError as e:
+            progress.stop()
+            console.print(f"[red]✗[/red] Failed to attach {e}; no attachments were added")
+            return None
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    console.print(f"[dim]  Copied {len(sources)} file(s), {decimal(total)} in {elapsed:.1f}s "
+                  f"({decimal(int(total / elapsed))}/s)[/dim]")
+    return [(source, digests[source.path]) for source in sources]
+
+
+def _link_attachments(task, ingested, store=None):
+    """Link ingested files into the task's attachment directory in its store and record them on the task"""
+    blobs = storage.get_blob_store()
+    attachment_dir = (store or storage).get_attachment_dir(task.id)
+    copied = 0
+    for source, digest in ingested:
+        if blobs.link(digest, attachment_dir / source.name) == "copy":
+            copied += 1
+        # a directory is recorded once, as the folder `tix open` shows
+        root = str(attachment_dir / source.root)
+        if root not in task.attachments:
+            task.attachments.append(root)
+    blobs.save()
+    if copied:
+        console.print(f"[yellow]![/yellow] This filesystem supports neither reflinks nor hard links: "
+                      f"{copied} attachment(s) take up space twice, once in the blob store")
+
+
+def _apply_edit(task, text, priority, add_tag, remove_tag, ingested, link, store=None):
+    """Apply edit options to one task in memory and return a list of change descriptions"""
     changes = []
     if text:
         old = getattr(task, "text", getattr(task, "task", ""))
@@ -447,48 +724,21 @@ def edit(task_id, text, priority, add_tag, remove_tag, attach, link):
             task.tags.remove(tag)
             changes.append(f"-tag: '{tag}'")
 
-    if attach:
-        attachment_dir = Path.home() / ".tix" / "attachments" / str(task.id)
-        attachment_dir.mkdir(parents=True, exist_ok=True)
-        for file_path in attach:
-            try:
-                src = Path(file_path).expanduser().resolve()
-                if not src.exists():
-                    console.print(f"[red]✗[/red] File not found: {file_path}")
-                    continue
-                dest = attachment_dir / src.name
-                dest.write_bytes(src.read_bytes())
-                if not hasattr(task, "attachments"):
-                    task.attachments = []
-                task.attachments.append(str(dest))
-            except Exception as e:
-                console.print(f"[red]✗[/red] Failed to attach {file_path}: {e}")
-        changes.append(f"attachments added: {[Path(f).name for f in attach]}")
+    if ingested:
+        _link_attachments(task, ingested, store)
+        changes.append(f"attachments added: {list(dict.fromkeys(source.root for source, _ in ingested))}")
 
     if link:
         if not hasattr(task, "links"):
             task.links = []
         task.links.extend(link)
         changes.append(f"links added: {list(link)}")
+    return changes
 
-    if changes:
-        storage.update_task(task)
-        from tix.config import CONFIG
-        if CONFIG.get('notifications', {}).get('on_update', True):
-            console.print(f"[green]✔[/green] Updated task #{task_id}:")
-            for c in changes:
-                console.print(f"  • {c}")
-        else:
-            console.print(f"[green]✔[/green] Task #{task_id} updated")
-    else:
-        console.print("[yellow]No changes made[/yellow]")
 
-
-@cli.command()
-@click.argument("task_id", type=int)
-def undo(task_id):
-    """Mark a completed task as active again"""
-    task = storage.get_task(task_id)
+def _reactivate(task_id):
+    """Mark a completed task as active again, bringing it back from the archive if needed"""
+    task = storage.get_task(task_id) or storage.unarchive(task_id)
     if not task:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
         return
@@ -503,51 +753,41 @@ def undo(task_id):
     console.print(f"[green]✔[/green] Reactivated: {task.text}")
 
 
-@cli.command(name="done-all")
-@click.argument("task_ids", nargs=-1, type=int, required=True)
-def done_all(task_ids):
-    """Mark multiple tasks as done"""
-    completed = []
-    not_found = []
-    already_done = []
-    for tid in task_ids:
-        task = storage.get_task(tid)
-        if not task:
-            not_found.append(tid)
-        elif getattr(task, "completed", False):
-            already_done.append(tid)
-        else:
-            if hasattr(task, "mark_done"):
-                task.mark_done()
-            else:
-                task.completed = True
-                task.completed_at = datetime.now().isoformat()
-            storage.update_task(task)
-            completed.append((tid, getattr(task, "text", getattr(task, "task", ""))))
-    if completed:
-        console.print("[green]✔ Completed:[/green]")
-        for tid, text in completed:
-            console.print(f"  #{tid}: {text}")
-    if already_done:
-        console.print(f"[yellow]Already done: {', '.join(map(str, already_done))}[/yellow]")
-    if not_found:
-        console.print(f"[red]Not found: {', '.join(map(str, not_found))}[/red]")
-
-
 @cli.command()
-@click.argument("task_id", type=int)
+@click.argument("task_ids", nargs=-1)
 @click.argument("priority", type=click.Choice(["low", "medium", "high"]))
-def priority(task_id, priority):
-    """Quick priority change"""
-    task = storage.get_task(task_id)
-    if not task:
+@click.option("--where", "-w", help='Select tasks, e.g. "tag:release status:active"')
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation for bulk changes")
+def priority(task_ids, priority, where, yes):
+    """Quick priority change for a task, an ID range or tasks matching --where"""
+    from tix.commands.selectors import is_bulk
+
+    selection = _select_targets(task_ids, where)
+    if selection is None:
+        return
+    store, targets, missing = selection
+    for task_id in missing:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
+    if not targets:
+        if not missing:
+            console.print("[yellow]No tasks match the selector[/yellow]")
         return
-    old_priority = getattr(task, "priority", None)
-    task.priority = priority
-    storage.update_task(task)
+
     color = {"high": "red", "medium": "yellow", "low": "green"}[priority]
-    console.print(f"[green]✔[/green] Changed priority: {old_priority} → [{color}]{priority}[/{color}]")
+    if len(targets) == 1 and not is_bulk(task_ids, where):
+        task = targets[0]
+        old_priority = getattr(task, "priority", None)
+        task.priority = priority
+        store.update_task(task)
+        console.print(f"[green]✔[/green] Changed priority: {old_priority} → [{color}]{priority}[/{color}]")
+        return
+
+    if not yes and not _confirm_bulk(store, targets, f"set priority {priority} on"):
+        return
+    for task in targets:
+        task.priority = priority
+    count = store.update_tasks(targets)
+    console.print(f"[green]✔[/green] Changed priority of {count} task(s) to [{color}]{priority}[/{color}]")
 
 def apply(op):
     """Re-apply an operation (used for redo)"""
@@ -560,6 +800,10 @@ def apply(op):
         storage.update_task(Task.from_dict(op["after"]), record_history=False)
     elif op["op"] == "delete":
         storage.delete_task(op["before"]["id"], record_history=False)
+    elif op["op"] == "update_many":
+        storage.update_tasks([Task.from_dict(d) for d in op["after"]], record_history=False)
+    elif op["op"] == "delete_many":
+        storage.delete_tasks([d["id"] for d in op["before"]], record_history=False)
 
 def apply_inverse(op):
     """Apply the inverse of an operation (used for undo)"""
@@ -572,10 +816,20 @@ def apply_inverse(op):
         restored_task = Task.from_dict(op["before"])
         tasks.append(restored_task)
         storage.save_tasks(sorted(tasks, key=lambda t: t.id))
+    elif op["op"] == "update_many":
+        storage.update_tasks([Task.from_dict(d) for d in op["before"]], record_history=False)
+    elif op["op"] == "delete_many":
+        tasks = storage.load_tasks()
+        tasks.extend(Task.from_dict(d) for d in op["before"])
+        storage.save_tasks(sorted(tasks, key=lambda t: t.id))
 
 @cli.command()
-def undo():
-    """Undo the last operation"""
+@click.argument("task_id", type=int, required=False)
+def undo(task_id):
+    """Undo the last operation, or with TASK_ID reactivate that completed (or archived) task"""
+    if task_id is not None:
+        _reactivate(task_id)
+        return
     op = history.pop_undo()
     if not op:
         console.print("[yellow]No operations to undo[/yellow]")
@@ -596,23 +850,29 @@ def redo():
     console.print(f"[green]✔ Redo complete[/green]")
 
 @cli.command(name="done-all")
-@click.argument("task_ids", nargs=-1, type=int, required=True)
-def done_all(task_ids):
-    """Mark multiple tasks as done"""
-    completed = []
-    not_found = []
-    already_done = []
-
-    for task_id in task_ids:
-        task = storage.get_task(task_id)
-        if not task:
-            not_found.append(task_id)
-        elif task.completed:
-            already_done.append(task_id)
-        else:
-            task.mark_done()
-            storage.update_task(task)
-            completed.append((task_id, task.text))
+@click.argument("task_ids", nargs=-1)
+@click.option("--where", "-w", help='Select tasks, e.g. "tag:release priority:high status:active"')
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation for selectors and ranges")
+def done_all(task_ids, where, yes):
+    """Mark multiple tasks as done (IDs, ranges like 100-250, or --where)"""
+    from tix.commands.selectors import is_bulk
+
+    selection = _select_targets(task_ids, where)
+    if selection is None:
+        return
+    store, matched, not_found = selection
+    already_done = [_ref(store, t.id) for t in matched if t.completed]
+    pending = [t for t in matched if not t.completed]
+
+    if pending and is_bulk(task_ids, where) and not yes:
+        if not _confirm_bulk(store, pending, "complete"):
+            return
+
+    for task in pending:
+        task.mark_done()
+    if pending:
+        store.update_tasks(pending)
+    completed = [(_ref(store, t.id), t.text) for t in pending]
 
     # Report results
     if completed:
@@ -625,12 +885,48 @@ def done_all(task_ids):
 
     if not_found:
         console.print(f"[red]Not found: {', '.join(map(str, not_found))}[/red]")
-        
-@click.argument("name")
+
+    if not matched and not not_found:
+        console.print("[yellow]No tasks match the selector[/yellow]")
+    if pending:
+        _auto_archive()
+
+
+@cli.command()
+@click.argument("name", required=False)
 def context(name):
-    """Switch or create context"""
+    """Switch or create context; `tix context list` shows every context with its task counts"""
+    if name in (None, "list"):
+        _context_list()
+        return
+    if name == GLOBAL_CONTEXT:
+        console.print(f"[red]✗[/red] '{GLOBAL_CONTEXT}' is reserved for global tasks; use --global")
+        return
     context_storage.set_active_context(name)
     console.print(f"[blue]Switched to context:[/blue] {name}")
+
+
+def _context_list():
+    """Contexts and their task counts, read from store headers without parsing the task lists"""
+    from rich.table import Table
+    from tix.storage.contexts import context_counts
+
+    counts = context_counts()
+    if not counts:
+        console.print("[dim]No contexts yet[/dim]")
+        return
+    table = Table(title="Contexts")
+    table.add_column("Context", style="magenta")
+    table.add_column("Active", justify="right")
+    table.add_column("Completed", justify="right")
+    table.add_column("Archived", justify="right", style="dim")
+    for name, c in counts.items():
+        marker = " [green]●[/green]" if name == storage.context else ""
+        table.add_row(f"{name}{marker}", str(c["active"]), str(c["completed"]), str(c["archived"]))
+    console.print(table)
+
+
+@cli.command()
 @click.argument("from_id", type=int)
 @click.argument("to_id", type=int)
 def move(from_id, to_id):
@@ -638,13 +934,14 @@ def move(from_id, to_id):
     if from_id == to_id:
         console.print("[yellow]Source and destination IDs are the same[/yellow]")
         return
-    src = storage.get_task(from_id)
+    if storage.get_task(to_id, include_archived=True):
+        console.print(f"[red]✗[/red] Task #{to_id} already exists")
+        return
+    # an archived task is brought back into the store to be renumbered
+    src = storage.get_task(from_id) or storage.unarchive(from_id)
     if not src:
         console.print(f"[red]✗[/red] Task #{from_id} not found")
         return
-    if storage.get_task(to_id):
-        console.print(f"[red]✗[/red] Task #{to_id} already exists")
-        return
     tasks = storage.load_tasks()
     tasks = [t for t in tasks if getattr(t, "id", None) != from_id]
     src.id = to_id
@@ -662,21 +959,60 @@ def move(from_id, to_id):
 @click.option("--tag", "-t", help="Filter by tag")
 @click.option("--priority", "-p", type=click.Choice(["low", "medium", "high"]), help="Filter by priority")
 @click.option("--completed", "-c", is_flag=True, help="Search in completed tasks")
-def search(query, tag, priority, completed):
-    """Search tasks by text"""
-    tasks = storage.load_tasks()
-    if not completed:
-        tasks = [t for t in tasks if not getattr(t, "completed", False)]
-    q = query.lower()
-    results = [t for t in tasks if q in getattr(t, "text", getattr(t, "task", "")).lower()]
-    if tag:
-        results = [t for t in results if tag in getattr(t, "tags", [])]
-    if priority:
-        results = [t for t in results if getattr(t, "priority", None) == priority]
+@click.option("--fuzzy", "-z", is_flag=True, help="Typo-tolerant search over text and tags, ranked by relevance")
+@click.option("--limit", "-n", type=click.IntRange(min=0), default=None, help="Show at most N results")
+@_format_option
+@_contexts_option
+def search(query, tag, priority, completed, fuzzy, limit, output_format, all_contexts=False, contexts=None):
+    """
+    Search tasks with the query language: bare words match the text, plus
+    p:high, tag:a,b (any) or tag:a+b (all), s:done, id:1-50, created>2025-01, !tag:x ...
+    """
+    from tix.commands.listing import highlight
+    from tix.commands.selectors import option_terms, task_ref
+    from tix.storage.query import QueryError, compile_query
+
+    try:
+        q = compile_query(query, option_terms(priority, tag, None if completed else False))
+    except QueryError as e:
+        console.print(f"[red]✗[/red] Invalid query: {e}")
+        return
+    source = _task_source(all_contexts, contexts)
+    if source is None:
+        return
+    multi = source is not storage
+    if fuzzy:
+        # rank the words, then apply the structured terms: fetch extra candidates only when they can drop some
+        rest = q.without_text()
+        fetch = None if any(t.kind != "status" for t in rest.terms) else (limit if limit is not None else 20)
+        words = " ".join(q.text_terms)
+        if multi or not storage.global_tasks():
+            candidates = source.fuzzy_search(words, limit=fetch, include_completed=completed)
+        else:
+            candidates = _fuzzy_with_global(words, fetch, completed)
+            multi = True
+        results = list(rest.filter(candidates))
+    else:
+        # the planner skips the archive unless completed tasks can match
+        results = source.query(q, include_archived=True)
+        shared = [] if multi else list(q.filter(storage.global_tasks()))
+        if shared:
+            multi = True
+            results = _with_global(results, shared)
+    if limit is not None:
+        results = results[:limit]
+    elif fuzzy:
+        results = results[:20]
+    if output_format != 'table':
+        _write_machine(results, output_format, show_context=multi)
+        return
     if not results:
         console.print(f"[dim]No tasks matching '{query}'[/dim]")
         return
+    from rich.table import Table
     table = Table()
+    if multi:
+        table.add_column("Context", style="magenta")
     table.add_column("ID", style="cyan", width=4)
     table.add_column("✔", width=3)
     table.add_column("Priority", width=8)
@@ -686,12 +1022,24 @@ def search(query, tag, priority, completed):
         status = "✔" if getattr(t, "completed", False) else "○"
         priority_color = {"high": "red", "medium": "yellow", "low": "green"}.get(getattr(t, "priority", "medium"), "yellow")
         tags_str = ", ".join(getattr(t, "tags", [])) if getattr(t, "tags", None) else ""
-        ttext = getattr(t, "text", getattr(t, "task", ""))
-        highlighted = ttext.replace(query, f"[bold yellow]{query}[/bold yellow]") if query.lower() in ttext.lower() else ttext
-        table.add_row(str(getattr(t, "id", "")), status, f"[{priority_color}]{getattr(t, 'priority', '')}[/{priority_color}]", highlighted, tags_str)
+        highlighted = highlight(getattr(t, "text", getattr(t, "task", "")), q.text_terms)
+        row = [task_ref(t), status, f"[{priority_color}]{getattr(t, 'priority', '')}[/{priority_color}]", highlighted, tags_str]
+        table.add_row(*([t.context] if multi else []), *row)
     console.print(table)
 
 
+def _fuzzy_with_global(words, limit, include_completed):
+    """Fuzzy matches of the active context and the global store, best first"""
+    from tix.storage.contexts import merge_key
+    scored = []
+    for store in (storage, storage.global_store):
+        for score, task in store.fuzzy_search(words, limit, include_completed, scored=True):
+            task.context = store.context
+            scored.append((score, task))
+    scored.sort(key=lambda x: (-x[0], merge_key(x[1])))
+    return [task for _, task in (scored if limit is None else scored[:limit])]
+
+
 # ---- Saved filters: replace the old `filter` command with this group ----
 from typing import Optional, Dict, Any
 import json
@@ -733,8 +1081,12 @@ def filter():
 @click.option("--priority", "-p", type=click.Choice(["low", "medium", "high"]), help="Filter by priority")
 @click.option("--tag", "-t", help="Filter by tag")
 @click.option("--completed/--active", "-c/-a", default=None, help="Filter by completion status")
+@click.option("--text", "-x", help="Filter by text (substring)")
+@click.option("--query", "-q", "query", help="Filter with the query language, e.g. 'p:high tag:a+b created>7d'")
 @click.option("--saved", "-s", "saved_name", help="Apply a saved filter by name")
-def filter_apply(priority: Optional[str], tag: Optional[str], completed: Optional[bool], saved_name: Optional[str]):
+@_format_option
+def filter_apply(priority: Optional[str], tag: Optional[str], completed: Optional[bool], saved_name: Optional[str],
+                 output_format: str = 'table', text: Optional[str] = None, query: Optional[str] = None):
     """
     Apply a filter (immediately). Use --saved <name> to apply saved filters.
     If --saved is provided, any inline options are ignored (saved filter takes precedence).
@@ -748,19 +1100,28 @@ def filter_apply(priority: Optional[str], tag: Optional[str], completed: Optiona
         priority = saved.get("priority")
         tag = saved.get("tag")
         completed = saved.get("completed")
+        text = saved.get("text")
+        query = saved.get("query")
 
-    # Now perform filtering (same UX as previous 'filter' command)
-    tasks = storage.load_tasks() if hasattr(storage, "load_tasks") else []
-
-    # completion filter: None = all, True = completed, False = active
-    if completed is not None:
-        tasks = [t for t in tasks if getattr(t, "completed", False) == completed]
+    from tix.commands.selectors import option_query, option_terms
+    from tix.storage.query import QueryError, compile_query
 
-    if priority:
-        tasks = [t for t in tasks if getattr(t, "priority", None) == priority]
+    try:
+        if saved_name and saved.get("materialized"):
+            # maintained on every change: only the matching tasks are read
+            tasks = storage.view(saved_name, option_query(priority, tag, completed, text, query),
+                                 include_archived=True)
+        else:
+            q = compile_query(query or "", option_terms(priority, tag, completed, text))
+            # the planner only reads archived (completed) tasks when they can match
+            tasks = storage.query(q, include_archived=True)
+    except QueryError as e:
+        console.print(f"[red]✗[/red] Invalid query: {e}")
+        return
 
-    if tag:
-        tasks = [t for t in tasks if tag in getattr(t, "tags", [])]
+    if output_format != 'table':
+        _write_machine(sorted(tasks, key=lambda t: (t.completed, t.id)), output_format)
+        return
 
     if not tasks:
         console.print("[dim]No matching tasks[/dim]")
@@ -772,11 +1133,16 @@ def filter_apply(priority: Optional[str], tag: Optional[str], completed: Optiona
         filters_desc.append(f"priority={priority}")
     if tag:
         filters_desc.append(f"tag='{tag}'")
+    if text:
+        filters_desc.append(f"text~'{text}'")
     if completed is not None:
         filters_desc.append("completed" if completed else "active")
+    if query:
+        filters_desc.append(f"({query})")
     filter_desc = " AND ".join(filters_desc) if filters_desc else "all"
     console.print(f"[bold]{len(tasks)} task(s) matching [{filter_desc}]:[/bold]\n")
 
+    from rich.table import Table
     table = Table()
     table.add_column("ID", style="cyan", width=4)
     table.add_column("✔", width=3)
@@ -804,12 +1170,30 @@ def filter_apply(priority: Optional[str], tag: Optional[str], completed: Optiona
 @click.option("--priority", "-p", type=click.Choice(["low", "medium", "high"]), help="Filter by priority")
 @click.option("--tag", "-t", help="Filter by tag")
 @click.option("--completed/--active", "-c/-a", default=None, help="Filter by completion status")
+@click.option("--text", "-x", help="Filter by text (substring)")
+@click.option("--query", "-q", "query", help="Filter with the query language, e.g. 'p:high tag:a+b created>7d'")
 @click.option("--force", "-f", is_flag=True, help="Overwrite existing saved filter of same name")
-def filter_save(name: str, priority: Optional[str], tag: Optional[str], completed: Optional[bool], force: bool):
+@click.option("--materialize", "-m", is_flag=True, help="Keep the matching tasks up to date on every change")
+def filter_save(name: str, priority: Optional[str], tag: Optional[str], completed: Optional[bool], force: bool,
+                text: Optional[str] = None, query: Optional[str] = None, materialize: bool = False):
     """
     Save a filter under <name>. Later you can apply it with `tix filter apply --saved <name>`.
+    With --materialize the store maintains the filter's result, so applying it reads only matches.
     Example: tix filter save work -t work -p high
     """
+    from tix.commands.selectors import option_query
+    from tix.storage.query import QueryError, compile_query
+    from tix.storage.views import MaterializedViews
+
+    try:
+        if query:
+            compile_query(query)
+        if materialize:
+            MaterializedViews.check(option_query(priority, tag, completed, text, query))
+    except QueryError as e:
+        console.print(f"[red]✗[/red] Invalid query: {e}")
+        return
+
     filters = _load_saved_filters()
     if name in filters and not force:
         console.print(f"[red]✗[/red] A saved filter named '{name}' already exists. Use --force to overwrite.")
@@ -818,8 +1202,11 @@ def filter_save(name: str, priority: Optional[str], tag: Optional[str], complete
     storage_obj = {
         "priority": priority,
         "tag": tag,
+        "text": text,
+        "query": query,
         # store completed as True/False/null
         "completed": None if completed is None else (True if completed else False),
+        "materialized": True if materialize else None,
         "saved_at": datetime.now().isoformat()
     }
 
@@ -827,15 +1214,23 @@ def filter_save(name: str, priority: Optional[str], tag: Optional[str], complete
     storage_obj = {k: v for k, v in storage_obj.items() if v is not None}
     filters[name] = storage_obj
     if _save_saved_filters(filters):
-        console.print(f"[green]✔[/green] Saved filter '{name}'")
+        if materialize:
+            storage.materialize(name, option_query(priority, tag, completed, text, query))
+        else:
+            storage.drop_view(name)
+        console.print(f"[green]✔[/green] Saved filter '{name}'" + (" (materialized)" if materialize else ""))
         # quick usage hint
         parts = []
         if "priority" in storage_obj:
             parts.append(f"-p {storage_obj['priority']}")
         if "tag" in storage_obj:
             parts.append(f"-t {storage_obj['tag']}")
+        if "text" in storage_obj:
+            parts.append(f"-x '{storage_obj['text']}'")
         if "completed" in storage_obj:
             parts.append("--completed" if storage_obj["completed"] else "--active")
+        if "query" in storage_obj:
+            parts.append(f"-q '{storage_obj['query']}'")
         if parts:
             console.print(f"[dim]Use: tix filter apply --saved {name}  (equivalent: tix filter apply {' '.join(parts)})[/dim]")
     else:
@@ -850,6 +1245,7 @@ def filter_list():
         console.print("[dim]No saved filters[/dim]")
         return
 
+    from rich.table import Table
     table = Table(title="Saved Filters")
     table.add_column("Name", style="cyan")
     table.add_column("Filter", style="dim")
@@ -861,9 +1257,15 @@ def filter_list():
             parts.append(f"priority={obj['priority']}")
         if "tag" in obj:
             parts.append(f"tag='{obj['tag']}'")
+        if "text" in obj:
+            parts.append(f"text~'{obj['text']}'")
         if "completed" in obj:
             parts.append("completed" if obj["completed"] else "active")
+        if "query" in obj:
+            parts.append(f"({obj['query']})")
         filter_desc = " AND ".join(parts) if parts else "all"
+        if obj.get("materialized"):
+            filter_desc += " (materialized)"
         saved_at = obj.get("saved_at", "-")
         table.add_row(name, filter_desc, saved_at)
 
@@ -874,113 +1276,158 @@ def filter_list():
 
 @cli.command()
 @click.option("--no-tags", is_flag=True, help="Show tasks without tags")
-def tags(no_tags):
+@_format_option
+@_contexts_option
+def tags(no_tags, output_format, all_contexts=False, contexts=None):
     """List all unique tags or tasks without tags"""
-    tasks = storage.load_tasks()
+    from tix.storage.summary import tag_counts as summary_tag_counts
+
+    source = _task_source(all_contexts, contexts)
+    if source is None:
+        return
+    from tix.commands.selectors import task_ref
+
+    # counts come from the summaries kept in the store header and archive, no task scan needed;
+    # global tasks count in every context
+    summary = source.summary(include_archived=True, include_global=True)
     if no_tags:
-        untagged = [t for t in tasks if not getattr(t, "tags", [])]
-        if not untagged:
+        if summary["untagged"]["total"] == 0 and output_format == 'table':
             console.print("[dim]All tasks have tags[/dim]")
             return
+        untagged = [t for t in source.iter_tasks(include_archived=True) if not getattr(t, "tags", [])]
+        multi = source is not storage
+        shared = [] if multi else [t for t in storage.global_tasks() if not t.tags]
+        if shared:
+            multi = True
+            untagged = _with_global(untagged, shared)
+        if output_format != 'table':
+            _write_machine(untagged, output_format, show_context=multi)
+            return
         console.print(f"[bold]{len(untagged)} task(s) without tags:[/bold]\n")
         for t in untagged:
             status = "✔" if getattr(t, "completed", False) else "○"
-            console.print(f"{status} #{getattr(t,'id','')}: {getattr(t,'text',getattr(t,'task',''))}")
+            where = f"{t.context} " if multi else ""
+            console.print(f"{status} {where}#{task_ref(t)}: {getattr(t,'text',getattr(t,'task',''))}")
     else:
-        tag_counts = {}
-        for t in tasks:
-            for tg in getattr(t, "tags", []):
-                tag_counts[tg] = tag_counts.get(tg, 0) + 1
+        tag_counts = summary_tag_counts(summary)
+        if output_format != 'table':
+            from tix.commands.export import write_tag_counts
+            write_tag_counts(tag_counts, output_format, click.get_text_stream("stdout"))
+            return
         if not tag_counts:
             console.print("[dim]No tags found[/dim]")
             return
         console.print("[bold]Tags in use:[/bold]\n")
-        for tg, cnt in sorted(tag_counts.items(), key=lambda x: (-x[1], x[0])):
+        for tg, cnt in tag_counts:
             console.print(f"  • {tg} ({cnt} task{'s' if cnt != 1 else ''})")
 
 
 @cli.command()
 @click.option("--detailed", "-d", is_flag=True, help="Show detailed breakdown")
-def stats(detailed):
+@_contexts_option
+def stats(detailed, all_contexts=False, contexts=None):
     """Show task statistics"""
     from tix.commands.stats import show_stats
-    show_stats(storage)
-    if detailed:
-        tasks = storage.load_tasks()
-        if tasks:
-            console.print("\n[bold]Detailed Breakdown:[/bold]\n")
-            from collections import defaultdict
-            by_day = defaultdict(list)
-            for t in tasks:
-                if getattr(t, "completed", False) and getattr(t, "completed_at", None):
-                    try:
-                        day = datetime.fromisoformat(getattr(t, "completed_at")).date()
-                    except Exception:
-                        continue
-                    by_day[day].append(t)
-            if by_day:
-                console.print("[bold]Recent Completions:[/bold]")
-                for day in sorted(by_day.keys(), reverse=True)[:5]:
-                    console.print(f"  • {day}: {len(by_day[day])} task(s)")
+    source = _task_source(all_contexts, contexts)
+    if source is not None:
+        show_stats(source, detailed=detailed)
+
+
+@cli.command()
+@click.option('--input', '-i', 'input_path', type=click.Path(exists=True, dir_okay=False),
+              help='Analyze an exported JSON Lines file (.jsonl or .jsonl.gz) instead of the store')
+@click.option('--weeks', '-w', type=click.IntRange(1, 520), default=12, show_default=True,
+              help='Number of weeks of throughput and burndown')
+@click.option('--top-tags', type=click.IntRange(0), default=5, show_default=True,
+              help='Tags to show cycle times for')
+@click.option('--format', '-f', 'output_format', type=click.Choice(['text', 'json']), default='text',
+              help='Output format')
+def analytics(input_path, weeks, top_tags, output_format):
+    """Cycle times, weekly throughput, burndown and a completion forecast (faster with NumPy)"""
+    from tix.commands.stats import show_analytics
+
+    if input_path:
+        from tix.commands.analytics import read_jsonl
+        items = read_jsonl(input_path)
+    else:
+        items = storage.iter_raw(include_archived=True)
+    show_analytics(items, weeks=weeks, top_tags=top_tags, output_format=output_format)
+
+
+class DateOrDateTime(click.DateTime):
+    """click.DateTime that returns a date when no time was given, so a bound can cover the whole day"""
+
+    name = "date"
+
+    def convert(self, value, param, ctx):
+        converted = super().convert(value, param, ctx)
+        if isinstance(value, str):
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+                return converted.date()
+            except ValueError:
+                pass
+        return converted
+
+
+def task_filter_options(f):
+    """Shared --status/--tag/--priority/--since/--until options for report and export"""
+    f = click.option('--until', type=DateOrDateTime(), help='Only tasks created on or before this date')(f)
+    f = click.option('--since', type=DateOrDateTime(), help='Only tasks created on or after this date')(f)
+    f = click.option('--priority', '-p', type=click.Choice(['low', 'medium', 'high']), help='Filter by priority')(f)
+    f = click.option('--tag', '-t', multiple=True, help='Filter by tag (repeat to require several)')(f)
+    f = click.option('--status', '-s', type=click.Choice(['all', 'active', 'completed']), default='all',
+                     help='Filter by completion status')(f)
+    return f
 
 
 @cli.command()
-@click.option('--format', '-f', type=click.Choice(['text', 'json','markdown']), default='text', help='Output format')
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'markdown', 'jsonl', 'csv']), default='text', help='Output format')
 @click.option('--output', '-o', type=click.Path(), help='Output to file')
-def report(format, output):
+@task_filter_options
+def report(format, output, status, tag, priority, since, until):
     """Generate a task report"""
-    tasks = storage.load_tasks()
-    if not tasks:
+    from itertools import chain
+    from tix.commands.export import filter_tasks
+    from tix.commands.report import write_report
+
+    # one streaming pass over the store feeds the summary and every section
+    tasks = filter_tasks(storage.iter_tasks(include_archived=status != 'active'), status=status,
+                         tags=tag, priority=priority, since=since, until=until)
+    first = next(tasks, None)
+    if first is None:
         console.print("[dim]No tasks to report[/dim]")
         return
-    active = [t for t in tasks if not getattr(t, "completed", False)]
-    completed = [t for t in tasks if getattr(t, "completed", False)]
-    if format == "json":
-        import json
-        report_data = {'generated': datetime.now().isoformat(),
-                       'summary': {'total': len(tasks), 'active': len(active), 'completed': len(completed)},
-                       'tasks': [t.to_dict() for t in tasks]}
-        report_text = json.dumps(report_data, indent=2)
-    elif format == 'markdown':
-        lines = ["# TIX Task Report", "", f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}", "", "## Summary", "", f"- **Total Tasks:** {len(tasks)}", f"- **Active:** {len(active)}", f"- **Completed:** {len(completed)}", ""]
-        for t in active:
-            tags = f" `{', '.join(getattr(t,'tags',[]))}`" if getattr(t,'tags',None) else ""
-            lines.append(f"- [ ] **#{getattr(t,'id','')}** {getattr(t,'text',getattr(t,'task',''))}{tags}")
-        if completed:
-            lines.append("")
-            lines.append("## Completed Tasks")
-            lines.append("")
-            lines.append("| ID | Task | Priority | Tags | Completed At |")
-            lines.append("|---|---|---|---|---|")
-            for t in completed:
-                tags = ", ".join([f"`{x}`" for x in getattr(t,'tags',[])]) if getattr(t,'tags',None) else "-"
-                comp = getattr(t,'completed_at', "-")
-                lines.append(f"| #{getattr(t,'id','')} | ~~{getattr(t,'text',getattr(t,'task',''))}~~ | {getattr(t,'priority','')} | {tags} | {comp} |")
-        report_text = "\n".join(lines)
-    else:
-        lines = ["TIX TASK REPORT", "="*40, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", "", f"Total Tasks: {len(tasks)}", f"Active: {len(active)}", f"Completed: {len(completed)}", "", "ACTIVE TASKS:", "-"*20]
-        for t in active:
-            tags = f" [{', '.join(getattr(t,'tags',[]))}]" if getattr(t,'tags',None) else ""
-            lines.append(f"#{getattr(t,'id','')} [{getattr(t,'priority','')}] {getattr(t,'text',getattr(t,'task',''))}{tags}")
-        lines.append("")
-        lines.append("COMPLETED TASKS:")
-        lines.append("-"*20)
-        for t in completed:
-            tags = f" [{', '.join(getattr(t,'tags',[]))}]" if getattr(t,'tags',None) else ""
-            lines.append(f"#{getattr(t,'id','')} ✔ {getattr(t,'text',getattr(t,'task',''))}{tags}")
-        report_text = "\n".join(lines)
+    tasks = chain([first], tasks)
     if output:
-        Path(output).write_text(report_text)
+        with click.open_file(output, "w", encoding="utf-8") as out:
+            write_report(tasks, format, out)
         console.print(f"[green]✔[/green] Report saved to {output}")
     else:
-        console.print(report_text)
+        write_report(tasks, format, click.get_text_stream("stdout"))
+
+
+@cli.command()
+@click.option('--format', '-f', type=click.Choice(['jsonl', 'csv', 'markdown']), default='jsonl', help='Output format')
+@click.option('--output', '-o', type=click.Path(), default='-', help='Output file (default: stdout)')
+@task_filter_options
+def export(format, output, status, tag, priority, since, until):
+    """Stream tasks to a file or stdout as JSON Lines, CSV or markdown"""
+    from tix.commands.export import WRITERS, filter_tasks
+
+    tasks = filter_tasks(storage.iter_tasks(include_archived=status != 'active'), status=status, tags=tag,
+                         priority=priority, since=since, until=until)
+    with click.open_file(output, "w", encoding="utf-8") as out:
+        count = WRITERS[format](tasks, out)
+    if output != "-":
+        console.print(f"[green]✔[/green] Exported {count} task(s) to {output}")
 
 
 @cli.command()
 @click.argument('task_id', type=int)
 def open(task_id):
     """Open all attachments and links for a task"""
-    task = storage.get_task(task_id)
+    task = storage.get_task(task_id, include_archived=True)
     if not task:
         console.print(f"[red]✗[/red] Task #{task_id} not found")
         return
@@ -1004,6 +1451,14 @@ def open(task_id):
         except Exception as e:
             console.print(f"[yellow]![/yellow] Could not open {'link' if is_link else 'file'}: {path_or_url} ({e})")
 
+    from tix.storage.blobs import iter_files
+
+    # hard-linked attachments share a read-only blob: give them a private copy to edit
+    blobs = storage.get_blob_store()
+    for path in iter_files(getattr(task, "attachments", [])):
+        blobs.unshare(Path(path))
+    blobs.save()
+
     for file_path in getattr(task, "attachments", []):
         p = Path(file_path)
         if not p.exists():
@@ -1014,6 +1469,80 @@ def open(task_id):
         safe_open(url, is_link=True)
 
 
+@cli.group()
+def attachments():
+    """Check and maintain attached files"""
+    pass
+
+
+@attachments.command("verify")
+@click.argument("task_id", type=int, required=False)
+@click.option("--all", "-a", "verify_all", is_flag=True, help="Verify attachments of every task, archived ones included")
+@click.option("--force", is_flag=True, help="Re-hash files even if their size and mtime are unchanged")
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=None, help="Hashing processes (default: one per CPU)")
+def attachments_verify(task_id, verify_all, force, jobs):
+    """Re-hash attached files and report missing or changed ones"""
+    if verify_all == (task_id is not None):
+        console.print("[red]✗[/red] Give a task ID or --all")
+        return
+    if verify_all:
+        tasks = storage.iter_tasks(include_archived=True)
+    else:
+        task = storage.get_task(task_id, include_archived=True)
+        if not task:
+            console.print(f"[red]✗[/red] Task #{task_id} not found")
+            return
+        tasks = [task]
+    paths = [path for task in tasks for path in task.attachments]
+    if not paths:
+        console.print("[dim]No attachments to verify[/dim]")
+        return
+
+    blobs = storage.get_blob_store()
+    with console.status("Verifying attachments..."):
+        results = blobs.verify(paths, force=force, workers=jobs)
+    blobs.save()
+
+    counts = {}
+    for path, status in results:
+        counts[status] = counts.get(status, 0) + 1
+        if status in ("missing", "changed"):
+            console.print(f"[red]✗[/red] {status}: {path}")
+    ok = counts.get("ok", 0) + counts.get("unchanged", 0) + counts.get("new", 0)
+    console.print(f"[{'green' if ok == len(results) else 'yellow'}]Verified {len(results)} file(s)[/]: "
+                  f"{ok} ok ({counts.get('unchanged', 0)} unchanged since last check, "
+                  f"{counts.get('new', 0)} newly recorded), {counts.get('changed', 0)} changed, "
+                  f"{counts.get('missing', 0)} missing")
+
+
+@attachments.command("gc")
+@click.option("--dry-run", "-n", is_flag=True, help="Only report what would be removed")
+def attachments_gc(dry_run):
+    """Remove attachment files and blobs that no task refers to"""
+    import time
+    from rich.filesize import decimal
+    from tix.storage.blobs import collect_garbage
+    from tix.storage.json_storage import store_paths
+
+    start = time.perf_counter()
+    # every context's tasks (and the global ones) keep their attachments alive
+    live = (entry
+            for name, store in store_paths().items()
+            for item in TaskStorage(store, context=name, history=history).iter_raw(include_archived=True)
+            for entry in item.get("attachments") or ())
+    result = collect_garbage(storage.get_attachments_root(), storage.get_blob_store(), live, dry_run=dry_run)
+    elapsed = time.perf_counter() - start
+
+    if not (result.files or result.blobs or result.dirs):
+        console.print(f"[green]✔[/green] No unreferenced attachments ({elapsed:.1f}s)")
+        return
+    verb = "Would free" if dry_run else "Freed"
+    console.print(f"[green]✔[/green] {verb} {decimal(result.bytes)}: {result.files} file(s), "
+                  f"{result.blobs} orphaned blob(s), {result.dirs} empty director(ies) ({elapsed:.1f}s)")
+    if dry_run:
+        console.print("[dim]Run without --dry-run to remove them[/dim]")
+
+
 @cli.command()
 @click.option('--all', '-a', 'show_all', is_flag=True, help='Show completed tasks too')
 def interactive(show_all):
@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from tix.models import Task
+from tix.storage.summary import sketch_bucket, sketch_quantile
+
+
+class Accumulator:
+    """Consumes tasks one at a time; state must not grow with the number of tasks"""
+
+    def add(self, task: Task):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class StatusCounts(Accumulator):
+    def __init__(self):
+        self.total = self.active = self.completed = 0
+
+    def add(self, task: Task):
+        self.total += 1
+        if task.completed:
+            self.completed += 1
+        else:
+            self.active += 1
+
+    def result(self) -> Dict[str, int]:
+        return {"total": self.total, "active": self.active, "completed": self.completed}
+
+
+def week_of(day: date) -> str:
+    """ISO week label such as 2025-W07"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class CompletionHistogram(Accumulator):
+    """Completed tasks per day (YYYY-MM-DD) or ISO week (YYYY-Www)"""
+
+    def __init__(self, period: str = "day"):
+        if period not in ("day", "week"):
+            raise ValueError(f"Unknown period: {period}")
+        self.period = period
+        self.buckets: Dict[str, int] = {}
+
+    def add(self, task: Task):
+        if task.completed and task.completed_at is not None:
+            self.add_count(date.fromtimestamp(task.completed_at), 1)
+
+    def add_count(self, day: date, n: int):
+        """Add n completions on a day, e.g. from pre-aggregated daily buckets"""
+        key = day.isoformat() if self.period == "day" else week_of(day)
+        self.buckets[key] = self.buckets.get(key, 0) + n
+
+    def result(self) -> Dict[str, int]:
+        return dict(sorted(self.buckets.items()))
+
+
+class LeadTimes(Accumulator):
+    """
+    Creation-to-completion time percentiles from a log-bucketed sketch, in
+    the same bucket layout the store summary persists
+    """
+
+    def __init__(self, quantiles=(0.5, 0.9, 0.99), buckets: Dict[str, int] = None):
+        self.quantiles = quantiles
+        self.buckets: Dict[str, int] = dict(buckets or {})
+
+    def add(self, task: Task):
+        if task.completed and task.completed_at is not None and task.created_at is not None:
+            key = sketch_bucket(max(task.completed_at - task.created_at, 0))
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def result(self) -> Dict[str, Optional[float]]:
+        """Seconds per quantile (keys like p50), plus the number of completed tasks measured"""
+        result = {"count": sum(self.buckets.values())}
+        for q in self.quantiles:
+            result[f"p{q * 100:g}"] = sketch_quantile(self.buckets, q)
+        return result
+
+
+def aggregate(tasks: Iterable[Task], accumulators: Dict[str, Accumulator]) -> Dict[str, object]:
+    """Feed every task to every accumulator in a single pass, return results by name"""
+    accs = list(accumulators.values())
+    for task in tasks:
+        for acc in accs:
+            acc.add(task)
+    return {name: acc.result() for name, acc in accumulators.items()}
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Compact human duration: 45m, 5.2h, 3.1d"""
+    if seconds is None:
+        return "-"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
@@ -0,0 +1,216 @@
+import gzip
+import json
+import math
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from tix.models import to_epoch
+
+try:
+    import numpy as np
+except ImportError:  # analytics falls back to pure Python
+    np = None
+
+WEEK = 7 * 86400
+PRIORITIES = ("high", "medium", "low")
+QUANTILES = (50, 90)
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    """Serialized tasks from an exported JSON Lines file, gzip-compressed if it ends in .gz"""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Columns:
+    """
+    Column-oriented copy of serialized tasks: one integer per task and field, plus
+    (row, tag) pairs. Columns are NumPy arrays when NumPy is used, otherwise compact
+    stdlib arrays. completed_at is -1 for tasks that are not done.
+    """
+
+    def __init__(self, items: Iterable[dict], use_numpy: bool):
+        created, completed, priority = array("q"), array("q"), array("b")
+        tag_rows, tag_codes = array("q"), array("q")
+        tag_ids: Dict[str, int] = {}
+        levels = {p: i for i, p in enumerate(PRIORITIES)}
+        row = -1
+        for row, item in enumerate(items):
+            created_at = item.get("created_at")
+            if type(created_at) is not int:
+                created_at = to_epoch(created_at) or 0
+            completed_at = item.get("completed_at") if item.get("completed") else None
+            if completed_at is not None and type(completed_at) is not int:
+                completed_at = to_epoch(completed_at)
+            created.append(created_at)
+            completed.append(-1 if completed_at is None else completed_at)
+            priority.append(levels.get(item.get("priority"), 1))
+            for tag in item.get("tags") or ():
+                tag_rows.append(row)
+                tag_codes.append(tag_ids.setdefault(tag, len(tag_ids)))
+        self.size = row + 1
+        self.tags: List[str] = list(tag_ids)
+        self.use_numpy = use_numpy
+        if use_numpy:
+            created, completed, priority, tag_rows, tag_codes = (
+                np.frombuffer(a, dtype=a.typecode) if len(a) else np.zeros(0, dtype=a.typecode)
+                for a in (created, completed, priority, tag_rows, tag_codes)
+            )
+        self.created, self.completed_at, self.priority = created, completed, priority
+        self.tag_rows, self.tag_codes = tag_rows, tag_codes
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of a sorted sequence (NumPy's default method)"""
+    pos = q / 100 * (len(sorted_values) - 1)
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _grouped_percentiles_numpy(codes, values, names: Sequence[str]) -> Dict[str, dict]:
+    """Percentiles of values per group code, for all groups at once"""
+    if not len(values):
+        return {}
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order].astype(np.float64)
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    counts = np.diff(np.r_[starts, len(codes)])
+    result = {names[c]: {"count": int(n)} for c, n in zip(codes[starts], counts)}
+    for q in QUANTILES:
+        pos = starts + q / 100 * (counts - 1)
+        lo, hi = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        vals = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        for c, v in zip(codes[starts], vals):
+            result[names[c]][f"p{q}"] = float(v)
+    return result
+
+
+def _grouped_percentiles_python(pairs: Iterable, names: Sequence[str]) -> Dict[str, dict]:
+    groups: Dict[int, List[int]] = {}
+    for code, value in pairs:
+        groups.setdefault(code, []).append(value)
+    result = {}
+    for code, values in groups.items():
+        values.sort()
+        stats = {"count": len(values)}
+        for q in QUANTILES:
+            stats[f"p{q}"] = float(_percentile(values, q))
+        result[names[code]] = stats
+    return result
+
+
+def cycle_times(cols: Columns) -> Dict[str, Dict[str, dict]]:
+    """Created→completed percentiles in seconds: overall, by priority and by tag"""
+    if cols.use_numpy:
+        done = cols.completed_at >= 0
+        lead = np.maximum(cols.completed_at - cols.created, 0)
+        overall = _grouped_percentiles_numpy(np.zeros(int(done.sum()), dtype=np.int64), lead[done], ["all"])
+        by_priority = _grouped_percentiles_numpy(cols.priority[done].astype(np.int64), lead[done], PRIORITIES)
+        pair_done = done[cols.tag_rows] if len(cols.tag_rows) else np.zeros(0, dtype=bool)
+        by_tag = _grouped_percentiles_numpy(cols.tag_codes[pair_done], lead[cols.tag_rows[pair_done]], cols.tags)
+    else:
+        lead = [max(c - s, 0) if c >= 0 else -1 for s, c in zip(cols.created, cols.completed_at)]
+        overall = _grouped_percentiles_python(((0, v) for v in lead if v >= 0), ["all"])
+        by_priority = _grouped_percentiles_python(
+            ((p, v) for p, v in zip(cols.priority, lead) if v >= 0), PRIORITIES)
+        by_tag = _grouped_percentiles_python(
+            ((c, lead[r]) for r, c in zip(cols.tag_rows, cols.tag_codes) if lead[r] >= 0), cols.tags)
+    return {"all": overall.get("all"), "priority": by_priority, "tag": by_tag}
+
+
+def week_start(now: datetime) -> datetime:
+    """Local midnight of the Monday starting now's week"""
+    return (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def weekly(cols: Columns, weeks: int, now: datetime) -> List[dict]:
+    """
+    Per-week created and completed counts and the active backlog at each week's end,
+    for the last `weeks` weeks including the current one
+    """
+    origin = int((week_start(now) - timedelta(weeks=weeks - 1)).timestamp())
+    now_ts = int(now.timestamp())
+    ends = [min(origin + (k + 1) * WEEK, now_ts) for k in range(weeks)]
+    if cols.use_numpy:
+        done_at = cols.completed_at[cols.completed_at >= 0]
+        created = _bincount_numpy(cols.created, origin, weeks)
+        completed = _bincount_numpy(done_at, origin, weeks)
+        active = (np.searchsorted(np.sort(cols.created), ends, side="right")
+                  - np.searchsorted(np.sort(done_at), ends, side="right")).tolist()
+    else:
+        done_at = [c for c in cols.completed_at if c >= 0]
+        created = _bincount_python(cols.created, origin, weeks)
+        completed = _bincount_python(done_at, origin, weeks)
+        created_sorted, done_sorted = sorted(cols.created), sorted(done_at)
+        active = [bisect_right(created_sorted, e) - bisect_right(done_sorted, e) for e in ends]
+    return [
+        {"week": time.strftime("%Y-%m-%d", time.localtime(origin + k * WEEK)),
+         "created": int(created[k]), "completed": int(completed[k]), "active": int(active[k])}
+        for k in range(weeks)
+    ]
+
+
+def _bincount_numpy(timestamps, origin: int, weeks: int):
+    idx = (timestamps - origin) // WEEK
+    idx = idx[(idx >= 0) & (idx < weeks)]
+    return np.bincount(idx, minlength=weeks).tolist()
+
+
+def _bincount_python(timestamps: Iterable[int], origin: int, weeks: int) -> List[int]:
+    counts = [0] * weeks
+    for ts in timestamps:
+        k = (ts - origin) // WEEK
+        if 0 <= k < weeks:
+            counts[k] += 1
+    return counts
+
+
+def forecast(active: int, history: List[dict], now: datetime) -> dict:
+    """
+    Weeks until the active backlog is cleared at the average net pace of the
+    full weeks in history (completed minus created per week); None if it isn't shrinking
+    """
+    full = history[:-1] or history
+    done_rate = sum(w["completed"] for w in full) / len(full)
+    new_rate = sum(w["created"] for w in full) / len(full)
+    net = done_rate - new_rate
+    result = {"completed_per_week": done_rate, "created_per_week": new_rate, "weeks_left": None, "eta": None}
+    if active == 0:
+        result["weeks_left"] = 0.0
+        result["eta"] = now.date().isoformat()
+    elif net > 0:
+        result["weeks_left"] = active / net
+        result["eta"] = (now + timedelta(weeks=active / net)).date().isoformat()
+    return result
+
+
+def analyze(items: Iterable[dict], weeks: int = 12, now: datetime = None,
+            use_numpy: Optional[bool] = None) -> dict:
+    """
+    Compute all analytics for serialized tasks in one load. use_numpy=None picks
+    NumPy when it is installed; False forces the pure-Python implementation.
+    """
+    use_numpy = np is not None if use_numpy is None else (use_numpy and np is not None)
+    now = now or datetime.now()
+    cols = Columns(items, use_numpy)
+    if cols.use_numpy:
+        completed = int((cols.completed_at >= 0).sum())
+    else:
+        completed = sum(1 for c in cols.completed_at if c >= 0)
+    history = weekly(cols, weeks, now)
+    return {
+        "backend": "numpy" if cols.use_numpy else "python",
+        "total": cols.size,
+        "active": cols.size - completed,
+        "completed": completed,
+        "cycle_time": cycle_times(cols),
+        "weeks": history,
+        "forecast": forecast(cols.size - completed, history, now),
+    }
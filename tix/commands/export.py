@@ -0,0 +1,184 @@
+import csv
+import json
+from datetime import date, datetime, timedelta
+from typing import IO, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from tix.commands.selectors import task_ref
+from tix.models import Task, format_timestamp
+
+CSV_FIELDS = [
+    "id", "text", "priority", "completed", "created_at", "completed_at",
+    "tags", "attachments", "links",
+]
+TIMESTAMP_FIELDS = ("created_at", "completed_at")
+
+
+def export_dict(task: Task) -> dict:
+    """
+    A task as written to files and pipes: like to_dict, but with timestamps as local
+    ISO 8601 strings (None if missing) instead of the epoch seconds kept in the store
+    """
+    item = task.to_dict()
+    for field in TIMESTAMP_FIELDS:
+        item[field] = format_timestamp(item[field]) or None
+    return item
+
+
+def _bound(value: Union[date, datetime, None], end: bool) -> Optional[float]:
+    """
+    Timestamp of a date bound. A plain date (no time given) covers the whole day, so as
+    an end it is the start of the next day, which filter_tasks treats as exclusive.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value + timedelta(days=1) if end else value, datetime.min.time())
+    return value.timestamp()
+
+
+def filter_tasks(tasks: Iterable[Task], status: str = "all", tags: Sequence[str] = (),
+                 priority: Optional[str] = None, since: Union[date, datetime, None] = None,
+                 until: Union[date, datetime, None] = None) -> Iterator[Task]:
+    """
+    Lazily filter tasks so only matching ones are serialized.
+    - status: 'all', 'active' or 'completed'
+    - tags: task must carry every given tag
+    - since/until: inclusive bounds on the creation date; a date (rather than a
+      datetime) includes the whole day
+    """
+    # convert the bounds once so each task costs an integer comparison
+    since_ts = _bound(since, end=False)
+    until_ts = _bound(until, end=True)
+    until_whole_day = until is not None and not isinstance(until, datetime)
+    for task in tasks:
+        if status == "active" and task.completed:
+            continue
+        if status == "completed" and not task.completed:
+            continue
+        if priority and task.priority != priority:
+            continue
+        if tags and not all(tag in task.tags for tag in tags):
+            continue
+        if since_ts is not None or until_ts is not None:
+            created = task.created_at
+            if created is None:
+                continue
+            if since_ts is not None and created < since_ts:
+                continue
+            if until_ts is not None and (created >= until_ts if until_whole_day else created > until_ts):
+                continue
+        yield task
+
+
+def write_jsonl(tasks: Iterable[Task], out: IO[str], show_context: bool = False) -> int:
+    """
+    Write one JSON object per line, return number of tasks written.
+    With show_context, listings that merge stores add each task's context and its `ref`
+    (g<ID> for global tasks), since IDs repeat across stores.
+    """
+    count = 0
+    for task in tasks:
+        item = export_dict(task)
+        if show_context:
+            item["context"] = getattr(task, "context", "")
+            item["ref"] = task_ref(task)
+        out.write(json.dumps(item, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def _tsv_cell(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def write_tsv(tasks: Iterable[Task], out: IO[str], show_context: bool = False) -> int:
+    """
+    Write id, status, priority, text and comma-joined tags separated by tabs, no header.
+    With show_context the context comes first and global IDs are written as g<ID>.
+    """
+    count = 0
+    for task in tasks:
+        if show_context:
+            out.write(f"{_tsv_cell(getattr(task, 'context', ''))}\t")
+        out.write(
+            f"{task_ref(task)}\t{'done' if task.completed else 'active'}\t{task.priority}\t"
+            f"{_tsv_cell(task.text)}\t{_tsv_cell(','.join(task.tags))}\n"
+        )
+        count += 1
+    return count
+
+
+def write_ids(tasks: Iterable[Task], out: IO[str], show_context: bool = False) -> int:
+    """
+    Write one task ID per line, g<ID> for global tasks so the output can be fed back to
+    done/rm/edit; show_context is accepted like the other writers but each line stays one ID
+    """
+    count = 0
+    for task in tasks:
+        out.write(f"{task_ref(task)}\n")
+        count += 1
+    return count
+
+
+def write_tag_counts(counts: Iterable[Tuple[str, int]], fmt: str, out: IO[str]) -> int:
+    """Write (tag, count) pairs in one of the machine-readable formats"""
+    count = 0
+    for tag, n in counts:
+        if fmt == "jsonl":
+            out.write(json.dumps({"tag": tag, "count": n}, ensure_ascii=False) + "\n")
+        elif fmt == "ids":
+            out.write(f"{tag}\n")
+        else:
+            out.write(f"{_tsv_cell(tag)}\t{n}\n")
+        count += 1
+    return count
+
+
+def write_csv(tasks: Iterable[Task], out: IO[str]) -> int:
+    """Write tasks as CSV with a header row, list fields joined by ';' and timestamps in local ISO format"""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for task in tasks:
+        row = export_dict(task)
+        writer.writerow([
+            ";".join(row[f]) if isinstance(row[f], list) else ("" if row[f] is None else row[f])
+            for f in CSV_FIELDS
+        ])
+        count += 1
+    return count
+
+
+def _md_cell(value: str) -> str:
+    return value.replace("|", "\\|").replace("\n", " ")
+
+
+def write_markdown(tasks: Iterable[Task], out: IO[str]) -> int:
+    """Write tasks as a markdown table"""
+    out.write("| ID | ✔ | Priority | Task | Tags | Created | Completed |\n")
+    out.write("|---|---|---|---|---|---|---|\n")
+    count = 0
+    for task in tasks:
+        tags = ", ".join(f"`{t}`" for t in task.tags) if task.tags else "-"
+        out.write(
+            f"| #{task.id} | {'x' if task.completed else ' '} | {task.priority} "
+            f"| {_md_cell(task.text)} | {_md_cell(tags)} | {format_timestamp(task.created_at) or '-'} "
+            f"| {format_timestamp(task.completed_at) or '-'} |\n"
+        )
+        count += 1
+    return count
+
+
+WRITERS = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "markdown": write_markdown,
+}
+
+# rich-free formats accepted by --format on ls, search, filter apply and tags
+MACHINE_WRITERS = {
+    "tsv": write_tsv,
+    "jsonl": write_jsonl,
+    "ids": write_ids,
+}
@@ -0,0 +1,121 @@
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from tix.commands.selectors import task_ref
+from tix.models import Task
+
+
+def sort_key(task: Task):
+    """Default ordering for task lists: active first, then by ID"""
+    return (task.completed, task.id)
+
+
+def select_tasks(tasks: Iterable[Task], limit: Optional[int] = None, offset: int = 0) -> List[Task]:
+    """
+    Return the sorted slice [offset, offset + limit) of tasks.
+    With a limit only the top offset + limit tasks are selected with a heap
+    instead of sorting the whole list.
+    """
+    offset = max(offset or 0, 0)
+    if limit is not None:
+        if limit <= 0:
+            return []
+        return heapq.nsmallest(offset + limit, tasks, key=sort_key)[offset:]
+    return sorted(tasks, key=sort_key)[offset:]
+
+
+def truncate(text: str, max_text_length: int) -> str:
+    if max_text_length and max_text_length > 0 and len(text) > max_text_length:
+        return text[: max_text_length - 3] + "..."
+    return text
+
+
+def highlight(text: str, terms: Iterable[str], style: str = "bold yellow") -> str:
+    """Rich markup for text with every case-insensitive occurrence of terms highlighted"""
+    import re
+    from rich.markup import escape
+
+    terms = [t for t in terms if t]
+    if not terms:
+        return escape(text)
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts, pos = [], 0
+    for m in pattern.finditer(text):
+        parts.append(escape(text[pos:m.start()]))
+        parts.append(f"[{style}]{escape(m.group())}[/{style}]")
+        pos = m.end()
+    parts.append(escape(text[pos:]))
+    return "".join(parts)
+
+
+def created_date(task: Task) -> str:
+    created = task.created
+    return created.strftime('%Y-%m-%d') if created else ""
+
+
+def task_cells(task: Task, show_ids: bool = True, show_dates: bool = False,
+               compact_mode: bool = False, max_text_length: int = 0,
+               show_context: bool = False) -> List[str]:
+    """Plain (markup-free) cells for one task row, in table column order"""
+    cells = []
+    if show_context:
+        cells.append(getattr(task, "context", ""))
+    if show_ids:
+        cells.append(task_ref(task))
+    cells.append("✔" if task.completed else "○")
+    cells.append(task.priority)
+    attach_icon = " 📎" if task.attachments or task.links else ""
+    cells.append(truncate(task.text, max_text_length) + attach_icon)
+    if not compact_mode:
+        cells.append(", ".join(task.tags))
+    if show_dates:
+        cells.append(created_date(task))
+    return cells
+
+
+def ansi_styler(color_system: str = "standard") -> Callable[[str, str], str]:
+    """
+    style(text, rich_style) that wraps text in the ANSI codes of a rich style string
+    (e.g. "bold green"), for output written without a rich console. Styles rich cannot
+    parse leave the text plain.
+    """
+    from rich.console import COLOR_SYSTEMS
+    from rich.errors import StyleSyntaxError
+    from rich.style import Style
+
+    system = COLOR_SYSTEMS[color_system]
+    parsed: Dict[str, Optional[Style]] = {}
+
+    def style(text: str, name: str) -> str:
+        if name not in parsed:
+            try:
+                parsed[name] = Style.parse(name)
+            except StyleSyntaxError:
+                parsed[name] = None
+        found = parsed[name]
+        return found.render(text, color_system=system) if found else text
+    return style
+
+
+def plain_lines(tasks: Iterable[Task], show_ids: bool = True, show_dates: bool = False,
+                compact_mode: bool = False, max_text_length: int = 0,
+                style=None, show_context: bool = False) -> Iterator[str]:
+    """
+    Lazily render tasks as fixed-width text lines without building a table.
+    `style(text, priority)` can be given to colour the priority column.
+    """
+    for task in tasks:
+        cells = task_cells(task, show_ids, show_dates, compact_mode, max_text_length, show_context)
+        i = 0
+        parts = []
+        if show_context:
+            parts.append(cells[0].ljust(12))
+            cells = cells[1:]
+        if show_ids:
+            parts.append(cells[0].rjust(4))
+            i = 1
+        parts.append(cells[i])
+        priority = cells[i + 1].ljust(8)
+        parts.append(style(priority, task.priority) if style else priority)
+        parts.extend(cells[i + 2:])
+        yield "  ".join(parts).rstrip() + "\n"
@@ -0,0 +1,158 @@
+import json
+import shutil
+import tempfile
+import textwrap
+from datetime import datetime
+from typing import IO, Callable, Iterable, List, Optional
+
+from tix.commands.aggregate import Accumulator, StatusCounts, aggregate
+from tix.commands.export import WRITERS, export_dict
+from tix.models import Task, format_timestamp
+
+# section text beyond this is spooled to a temporary file instead of memory
+SPOOL_BYTES = 1 << 20
+
+
+def _tags(task: Task) -> List[str]:
+    return getattr(task, "tags", None) or []
+
+
+class Section(Accumulator):
+    """
+    Rendered lines of one report section, collected during the single pass over the tasks
+    so they can be written after the summary that precedes them. render returns None for
+    tasks that are not in the section; sep goes between entries.
+    """
+
+    def __init__(self, render: Callable[[Task], Optional[str]], sep: str = ""):
+        self.render = render
+        self.sep = sep
+        self.count = 0
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, mode="w+", encoding="utf-8")
+
+    def add(self, task: Task):
+        text = self.render(task)
+        if text is not None:
+            self.buffer.write(self.sep + text if self.count else text)
+            self.count += 1
+
+    def result(self) -> "Section":
+        return self
+
+    def copy_to(self, out: IO[str]):
+        """Write the section out and free its buffer"""
+        with self.buffer:
+            self.buffer.seek(0)
+            shutil.copyfileobj(self.buffer, out)
+
+
+def summarize(tasks: Iterable[Task], **sections: Section) -> dict:
+    """
+    Header counts for a report from one streaming pass over tasks, which also fills the
+    given sections. Returns the counts under 'status' and each section by its name.
+    """
+    return aggregate(tasks, {"status": StatusCounts(), **sections})
+
+
+def _text_active(t: Task) -> Optional[str]:
+    if not t.completed:
+        tags = f" [{', '.join(_tags(t))}]" if _tags(t) else ""
+        return f"#{t.id} [{t.priority}] {t.text}{tags}\n"
+    return None
+
+
+def _text_completed(t: Task) -> Optional[str]:
+    if t.completed:
+        tags = f" [{', '.join(_tags(t))}]" if _tags(t) else ""
+        return f"#{t.id} ✔ {t.text}{tags}\n"
+    return None
+
+
+def write_text_report(tasks: Iterable[Task], out: IO[str]):
+    """Stream the plain-text report; tasks are read once"""
+    report = summarize(tasks, active=Section(_text_active), completed=Section(_text_completed))
+    counts = report["status"]
+    out.write("TIX TASK REPORT\n")
+    out.write("=" * 40 + "\n")
+    out.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
+    out.write(f"Total Tasks: {counts['total']}\n")
+    out.write(f"Active: {counts['active']}\n")
+    out.write(f"Completed: {counts['completed']}\n\n")
+    out.write("ACTIVE TASKS:\n" + "-" * 20 + "\n")
+    report["active"].copy_to(out)
+    out.write("\nCOMPLETED TASKS:\n" + "-" * 20 + "\n")
+    report["completed"].copy_to(out)
+
+
+def _markdown_active(t: Task) -> Optional[str]:
+    if not t.completed:
+        tags = f" `{', '.join(_tags(t))}`" if _tags(t) else ""
+        return f"- [ ] **#{t.id}** {t.text}{tags}\n"
+    return None
+
+
+def _markdown_completed(t: Task) -> Optional[str]:
+    if t.completed:
+        tags = ", ".join(f"`{x}`" for x in _tags(t)) if _tags(t) else "-"
+        return f"| #{t.id} | ~~{t.text}~~ | {t.priority} | {tags} | {format_timestamp(t.completed_at) or '-'} |\n"
+    return None
+
+
+def write_markdown_report(tasks: Iterable[Task], out: IO[str]):
+    """Stream the markdown report; tasks are read once"""
+    report = summarize(tasks, active=Section(_markdown_active), completed=Section(_markdown_completed))
+    counts = report["status"]
+    completed = counts["completed"]
+    out.write("# TIX Task Report\n\n")
+    out.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
+    out.write("## Summary\n\n")
+    out.write(f"- **Total Tasks:** {counts['total']}\n")
+    out.write(f"- **Active:** {counts['active']}\n")
+    out.write(f"- **Completed:** {completed}\n\n")
+    report["active"].copy_to(out)
+    if completed:
+        out.write("\n## Completed Tasks\n\n")
+        out.write("| ID | Task | Priority | Tags | Completed At |\n")
+        out.write("|---|---|---|---|---|\n")
+    report["completed"].copy_to(out)
+
+
+def _json_task(t: Task) -> str:
+    return textwrap.indent(json.dumps(export_dict(t), indent=2), "    ")
+
+
+def write_json_report(tasks: Iterable[Task], out: IO[str]):
+    """
+    Stream the JSON report; tasks are read once.
+    The layout matches json.dumps(report, indent=2) without holding the whole document.
+    """
+    report = summarize(tasks, entries=Section(_json_task, sep=",\n"))
+    summary = report["status"]
+    out.write("{\n")
+    out.write(f'  "generated": {json.dumps(datetime.now().isoformat())},\n')
+    out.write('  "summary": ' + textwrap.indent(json.dumps(summary, indent=2), "  ").lstrip() + ",\n")
+    if not summary["total"]:
+        out.write('  "tasks": []\n}\n')
+        return
+    out.write('  "tasks": [\n')
+    report["entries"].copy_to(out)
+    out.write("\n  ]\n}\n")
+
+
+REPORT_WRITERS = {
+    "text": write_text_report,
+    "markdown": write_markdown_report,
+    "json": write_json_report,
+}
+
+
+def write_report(tasks: Iterable[Task], fmt: str, out: IO[str]):
+    """
+    Write a report in the given format; row-only formats are delegated to the exporters.
+    tasks can be a one-shot iterator: every format reads it once, and section text
+    waiting for the summary above it is spooled to disk when it grows large.
+    """
+    if fmt in REPORT_WRITERS:
+        REPORT_WRITERS[fmt](tasks, out)
+    else:
+        WRITERS[fmt](tasks, out)
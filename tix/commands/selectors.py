@@ -0,0 +1,101 @@
+import shlex
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from tix.models import Task
+from tix.storage.json_storage import GLOBAL_CONTEXT
+from tix.storage.query import PRIORITY_ALIASES, STATUS_ALIASES, Term, compile_query, parse_id_spec  # noqa: F401
+
+# global tasks are numbered apart from context tasks; on the command line their IDs carry this prefix
+GLOBAL_PREFIX = "g"
+
+
+def task_ref(task: Task) -> str:
+    """How a task is addressed on the command line: its ID, as g<ID> for a global task"""
+    if getattr(task, "context", None) == GLOBAL_CONTEXT:
+        return f"{GLOBAL_PREFIX}{task.id}"
+    return str(task.id)
+
+
+def split_global(id_specs: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Split ID specs into those of context tasks and g-prefixed ones of global tasks (prefix removed)"""
+    local, shared = [], []
+    for spec in id_specs:
+        if spec[:1].lower() == GLOBAL_PREFIX:
+            shared.append(spec[1:])
+        else:
+            local.append(spec)
+    return local, shared
+
+
+def parse_where(where: str) -> Callable[[Task], bool]:
+    """
+    Compile a selector like 'tag:release priority:high status:active' into a predicate.
+    This is the query language of tix.storage.query; bare words match the task text.
+    Raises ValueError on unknown keys or values.
+    """
+    return compile_query(where).match
+
+
+def option_terms(priority: Optional[str] = None, tag: Optional[str] = None,
+                 completed: Optional[bool] = None, text: Optional[str] = None) -> List[Term]:
+    """Query terms for the classic --priority/--tag/--completed/--text options"""
+    terms = []
+    if priority:
+        terms.append(Term("priority", (priority,)))
+    if tag:
+        terms.append(Term("tag", (tag,)))
+    if completed is not None:
+        terms.append(Term("status", (completed,)))
+    if text:
+        terms.append(Term("text", (text.lower(),)))
+    return terms
+
+
+def option_query(priority: Optional[str] = None, tag: Optional[str] = None, completed: Optional[bool] = None,
+                 text: Optional[str] = None, query: Optional[str] = None) -> str:
+    """The classic options and an optional query as a single query string, e.g. for materialized views"""
+    parts = []
+    if priority:
+        parts.append(f"p:{priority}")
+    if tag:
+        parts.append(shlex.quote(f"tag:{tag}"))
+    if completed is not None:
+        parts.append("s:done" if completed else "s:active")
+    if text:
+        parts.append(shlex.quote(f"text:{text}"))
+    if query:
+        parts.append(query)
+    return " ".join(parts)
+
+
+def select(tasks: Iterable[Task], id_specs: Sequence[str] = (), where: Optional[str] = None) -> List[Task]:
+    """
+    Return tasks matching any of the ID specs and the --where selector, in one pass.
+    With no ID specs every task is a candidate for the selector.
+    """
+    ranges = [r for spec in id_specs for r in parse_id_spec(spec)]
+    predicate = parse_where(where) if where else None
+    matched = []
+    for task in tasks:
+        if ranges and not any(lo <= task.id <= hi for lo, hi in ranges):
+            continue
+        if predicate and not predicate(task):
+            continue
+        matched.append(task)
+    return matched
+
+
+def missing_ids(id_specs: Sequence[str], matched: Iterable[Task]) -> List[int]:
+    """Return explicitly listed single IDs (not ranges) that matched no task"""
+    found = {t.id for t in matched}
+    missing = []
+    for spec in id_specs:
+        for lo, hi in parse_id_spec(spec):
+            if lo == hi and lo not in found:
+                missing.append(lo)
+    return missing
+
+
+def is_bulk(id_specs: Sequence[str], where: Optional[str]) -> bool:
+    """True when the selection may cover more than the explicitly listed IDs"""
+    return bool(where) or any("-" in spec for spec in id_specs)
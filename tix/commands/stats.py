@@ -1,48 +1,41 @@
+import json
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress, BarColumn, TextColumn
-from datetime import datetime, timedelta
-from collections import Counter
+from datetime import date, datetime, timedelta
+from tix.commands.aggregate import CompletionHistogram, LeadTimes, format_duration
+from tix.storage.summary import tag_counts as tag_counts_from
 
 console = Console()
 
 
-def show_stats(storage):
-    """Display comprehensive task statistics"""
-    tasks = storage.load_tasks()
+def show_stats(storage, detailed: bool = False):
+    """Display comprehensive task statistics from the aggregates kept by storage"""
+    summary = storage.summary(include_archived=True, include_global=True)
+    status = summary["status"]
+    total, active, completed = status["total"], status["active"], status["completed"]
 
-    if not tasks:
+    if not total:
         console.print("[dim]No tasks to analyze. Add some tasks first![/dim]")
         return
 
-    active = [t for t in tasks if not t.completed]
-    completed = [t for t in tasks if t.completed]
-
     # Priority breakdown
-    priority_counts = Counter(t.priority for t in active)
+    priority_counts = {p: c["active"] for p, c in summary["priority"].items()}
 
     # Tags analysis
-    all_tags = []
-    for task in tasks:
-        all_tags.extend(task.tags)
-    tag_counts = Counter(all_tags)
+    tag_counts = tag_counts_from(summary)
 
     # Time analysis
-    today = datetime.now().date()
-    today_completed = len([
-        t for t in completed
-        if t.completed_at and
-           datetime.fromisoformat(t.completed_at).date() == today
-    ])
+    today_completed = summary["completed_by_day"].get(datetime.now().date().isoformat(), 0)
 
     # Create stats panel
     stats_text = f"""[bold cyan]📊 Task Statistics[/bold cyan]
 
 [bold]Overview:[/bold]
-  • Total tasks: {len(tasks)}
-  • Active: {len(active)} ({len(active) / max(len(tasks), 1) * 100:.0f}%)
-  • Completed: {len(completed)} ({len(completed) / max(len(tasks), 1) * 100:.0f}%)
+  • Total tasks: {total}
+  • Active: {active} ({active / max(total, 1) * 100:.0f}%)
+  • Completed: {completed} ({completed / max(total, 1) * 100:.0f}%)
 
 [bold]Priority Distribution (Active):[/bold]
   • 🔴 High: {priority_counts.get('high', 0)}
@@ -55,7 +48,7 @@ def show_stats(storage):
 [bold]Top Tags:[/bold]"""
 
     if tag_counts:
-        for tag, count in tag_counts.most_common(3):
+        for tag, count in tag_counts[:3]:
             stats_text += f"\n  • {tag}: {count} task(s)"
     else:
         stats_text += "\n  • No tags used yet"
@@ -64,7 +57,7 @@ def show_stats(storage):
     console.print(panel)
 
     # Progress bar
-    if tasks:
+    if total:
         console.print("\n[bold]Completion Progress:[/bold]")
         with Progress(
                 TextColumn("[progress.description]{task.description}"),
@@ -73,6 +66,73 @@ def show_stats(storage):
         ) as progress:
             progress.add_task(
                 "Overall",
-                total=len(tasks),
-                completed=len(completed)
-            )
\ No newline at end of file
+                total=total,
+                completed=completed
+            )
+
+    if detailed:
+        by_day = summary["completed_by_day"]
+        console.print("\n[bold]Detailed Breakdown:[/bold]\n")
+        if by_day:
+            console.print("[bold]Recent Completions:[/bold]")
+            for day in sorted(by_day, reverse=True)[:5]:
+                console.print(f"  • {day}: {by_day[day]} task(s)")
+
+            weekly = CompletionHistogram("week")
+            for day, n in by_day.items():
+                weekly.add_count(date.fromisoformat(day), n)
+            console.print("\n[bold]Completions by Week:[/bold]")
+            for week, n in list(weekly.result().items())[-4:]:
+                console.print(f"  • {week}: {n} task(s)")
+
+        lead = LeadTimes(buckets=summary["lead_time"]).result()
+        if lead["count"]:
+            console.print("\n[bold]Lead Time (created → completed):[/bold]")
+            console.print(f"  • median {format_duration(lead['p50'])}, p90 {format_duration(lead['p90'])}, "
+                          f"p99 {format_duration(lead['p99'])} over {lead['count']} task(s)")
+
+def show_analytics(items, weeks: int = 12, top_tags: int = 5, output_format: str = "text", use_numpy=None):
+    """Render cycle times, weekly throughput, burndown and a completion forecast"""
+    from tix.commands.analytics import analyze
+
+    result = analyze(items, weeks=weeks, use_numpy=use_numpy)
+    if output_format == "json":
+        print(json.dumps(result, indent=2))
+        return
+    if not result["total"]:
+        console.print("[dim]No tasks to analyze. Add some tasks first![/dim]")
+        return
+
+    cycle = result["cycle_time"]
+    table = Table(title="Cycle Time (created → completed)")
+    table.add_column("Group")
+    table.add_column("Tasks", justify="right")
+    table.add_column("Median", justify="right")
+    table.add_column("p90", justify="right")
+    rows = [("all", cycle["all"])] if cycle["all"] else []
+    rows += [(f"priority: {p}", cycle["priority"][p]) for p in ("high", "medium", "low") if p in cycle["priority"]]
+    top = sorted(cycle["tag"].items(), key=lambda x: (-x[1]["count"], x[0]))[:top_tags]
+    rows += [(f"tag: {tag}", stats) for tag, stats in top]
+    for name, stats in rows:
+        table.add_row(name, str(stats["count"]), format_duration(stats["p50"]), format_duration(stats["p90"]))
+    if rows:
+        console.print(table)
+    else:
+        console.print("[dim]No completed tasks yet[/dim]")
+
+    table = Table(title="Weekly Throughput and Burndown")
+    table.add_column("Week of")
+    table.add_column("Created", justify="right")
+    table.add_column("Completed", justify="right")
+    table.add_column("Active at end", justify="right")
+    for week in result["weeks"]:
+        table.add_row(week["week"], str(week["created"]), str(week["completed"]), str(week["active"]))
+    console.print(table)
+
+    fc = result["forecast"]
+    pace = f"{fc['completed_per_week']:.1f} done / {fc['created_per_week']:.1f} new per week"
+    if fc["weeks_left"] is None:
+        outlook = "[yellow]backlog is not shrinking at the current pace[/yellow]"
+    else:
+        outlook = f"[green]{result['active']} active task(s) cleared in ~{fc['weeks_left']:.1f} weeks ({fc['eta']})[/green]"
+    console.print(f"\n[bold]Forecast:[/bold] {outlook}\n[dim]  {pace} · computed with {result['backend']}[/dim]")
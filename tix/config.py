@@ -42,6 +42,9 @@ DEFAULT_CONFIG = {
         'compact_mode': False,
         'max_text_length': 0,  # 0 means no limit
     },
+    'archive': {
+        'after_days': 0,  # move completed tasks older than this many days into archives; 0 is off
+    },
 }
 
 
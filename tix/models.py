@@ -1,7 +1,48 @@
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, List
 
+
+def now_epoch() -> int:
+    """Current time as integer epoch seconds"""
+    return int(time.time())
+
+
+def to_epoch(value) -> Optional[int]:
+    """Epoch seconds from an int, a float or a legacy ISO 8601 string; None if missing or invalid"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1 << 16)
+def _local_day(quarter_hour: int) -> str:
+    return time.strftime('%Y-%m-%d', time.localtime(quarter_hour * 900))
+
+
+def local_day(ts: int) -> str:
+    """
+    Local YYYY-MM-DD of an epoch timestamp. UTC offsets are multiples of 15 minutes,
+    so the date only needs computing once per quarter hour and is cached by that integer.
+    """
+    return _local_day(ts // 900)
+
+
+def format_timestamp(value, fmt: str = '%Y-%m-%dT%H:%M:%S') -> str:
+    """Render a stored timestamp in local time for people, '' if missing"""
+    ts = to_epoch(value)
+    return "" if ts is None else time.strftime(fmt, time.localtime(ts))
+
+
 @dataclass
 class Task:
     """Task model with all necessary properties"""
@@ -9,11 +50,36 @@ class Task:
     text: str
     priority: str = 'medium'
     completed: bool = False
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    completed_at: Optional[str] = None
+    created_at: Optional[int] = field(default_factory=now_epoch)
+    completed_at: Optional[int] = None
     tags: List[str] = field(default_factory=list)
     attachments: List[str] = field(default_factory=list)
-    links: List[str] = field(default_factory=list)  
+    links: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        # timestamps are epoch seconds; ISO strings from older stores are converted once here
+        self.created_at = to_epoch(self.created_at)
+        self.completed_at = to_epoch(self.completed_at)
+
+    def _datetime(self, attr: str) -> Optional[datetime]:
+        ts = to_epoch(getattr(self, attr))
+        if ts is None:
+            return None
+        cache = self.__dict__.setdefault("_datetimes", {})
+        hit = cache.get(attr)
+        if hit is None or hit[0] != ts:
+            hit = cache[attr] = (ts, datetime.fromtimestamp(ts))
+        return hit[1]
+
+    @property
+    def created(self) -> Optional[datetime]:
+        """created_at as a local datetime, converted on first access and cached"""
+        return self._datetime("created_at")
+
+    @property
+    def completed_time(self) -> Optional[datetime]:
+        """completed_at as a local datetime, converted on first access and cached"""
+        return self._datetime("completed_at")
 
     def to_dict(self) -> dict:
         """Convert task to dictionary for JSON serialization"""
@@ -22,8 +88,8 @@ class Task:
             'text': self.text,
             'priority': self.priority,
             'completed': self.completed,
-            'created_at': self.created_at,
-            'completed_at': self.completed_at,
+            'created_at': to_epoch(self.created_at),
+            'completed_at': to_epoch(self.completed_at),
             'tags': self.tags,
             'attachments': self.attachments,
             'links': self.links,
@@ -37,19 +103,19 @@ class Task:
             text=data['text'],
             priority=data.get('priority', 'medium'),
             completed=data.get('completed', False),
-            created_at=data.get('created_at', datetime.now().isoformat()),
+            created_at=data.get('created_at') or now_epoch(),
             completed_at=data.get('completed_at'),
             tags=data.get('tags', []),
-            attachments=data.get('attachments', []),  
-            links=data.get('links', [])               
+            attachments=data.get('attachments', []),
+            links=data.get('links', [])
         )
 
     def mark_done(self):
         """Mark task as completed with timestamp"""
         self.completed = True
-        self.completed_at = datetime.now().isoformat()
+        self.completed_at = now_epoch()
 
     def add_tag(self, tag: str):
         """Add a tag to the task"""
         if tag not in self.tags:
-            self.tags.append(tag)
\ No newline at end of file
+            self.tags.append(tag)
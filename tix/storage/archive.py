@@ -0,0 +1,129 @@
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from tix.models import Task, to_epoch
+from tix.storage import summary as summaries
+
+PARTITION_SUFFIX = ".jsonl.gz"
+
+
+class TaskArchive:
+    """Monthly gzip-compressed JSON Lines partitions of completed tasks, kept next to the store"""
+
+    def __init__(self, storage_path: Path):
+        """Archive for tasks.json lives in tasks.archive/ beside it"""
+        self.archive_dir = storage_path.with_name(f"{storage_path.stem}.archive")
+        self.summary_path = self.archive_dir / "summary.json"
+
+    def partitions(self) -> List[Path]:
+        """Return partition files sorted by month, oldest first"""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(self.archive_dir.glob(f"*{PARTITION_SUFFIX}"))
+
+    def exists(self) -> bool:
+        return bool(self.partitions())
+
+    def months(self) -> List[str]:
+        """Partition keys (YYYY-MM or 'undated') present on disk"""
+        return [p.name[:-len(PARTITION_SUFFIX)] for p in self.partitions()]
+
+    @staticmethod
+    def partition_key(item: dict) -> str:
+        """Month partition (YYYY-MM) for a serialized task, based on completion time"""
+        ts = to_epoch(item.get("completed_at"))
+        return "undated" if ts is None else time.strftime("%Y-%m", time.localtime(ts))
+
+    def append(self, items: Iterable[dict]) -> int:
+        """Append serialized tasks to their monthly partitions, return number archived"""
+        by_month: Dict[str, List[dict]] = {}
+        for item in items:
+            by_month.setdefault(self.partition_key(item), []).append(item)
+        if not by_month:
+            return 0
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for month, month_items in by_month.items():
+            # appending creates a new gzip member, which gzip readers handle transparently
+            with gzip.open(self.archive_dir / f"{month}{PARTITION_SUFFIX}", "at", encoding="utf-8") as f:
+                for item in month_items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    count += 1
+        summary = self._load_summary()
+        if summary is not None:
+            for month_items in by_month.values():
+                for item in month_items:
+                    summaries.apply(summary, item)
+            self._save_summary(summary)
+        return count
+
+    def take(self, ids: Set[int]) -> List[dict]:
+        """Remove the tasks with the given IDs, rewriting only the partitions that held them"""
+        taken: List[dict] = []
+        for path in self.partitions():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                items = [json.loads(line) for line in f if line.strip()]
+            keep = [item for item in items if item.get("id") not in ids]
+            if len(keep) == len(items):
+                continue
+            taken.extend(item for item in items if item.get("id") in ids)
+            if keep:
+                tmp = path.with_name(path.name + ".tmp")
+                with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                    for item in keep:
+                        f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                tmp.replace(path)
+            else:
+                path.unlink()
+        summary = self._load_summary()
+        if taken and summary is not None:
+            for item in taken:
+                summaries.apply(summary, item, sign=-1)
+            self._save_summary(summary)
+        return taken
+
+    def clear(self) -> int:
+        """Delete every partition and the summary, return the number of tasks removed"""
+        count = sum(1 for _ in self.iter_raw())
+        for path in self.partitions():
+            path.unlink()
+        if self.summary_path.exists():
+            self.summary_path.unlink()
+        return count
+
+    def _load_summary(self):
+        try:
+            summary = json.loads(self.summary_path.read_text())
+        except (OSError, ValueError):
+            return None
+        return summary if summaries.is_current(summary) else None
+
+    def _save_summary(self, summary: dict):
+        self.summary_path.write_text(json.dumps(summary))
+
+    def summary(self) -> dict:
+        """Tag counts over all partitions, kept in summary.json and rebuilt if missing"""
+        summary = self._load_summary()
+        if summary is None:
+            summary = summaries.build(self.iter_raw())
+            if self.archive_dir.exists():
+                self._save_summary(summary)
+        return summary
+
+    def iter_raw(self, months: Optional[Set[str]] = None) -> Iterator[dict]:
+        """Lazily yield serialized tasks from all (or the given) partitions, one partition open at a time"""
+        for path in self.partitions():
+            if months is not None and path.name[:-len(PARTITION_SUFFIX)] not in months:
+                continue
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def iter_tasks(self, months: Optional[Set[str]] = None) -> Iterator[Task]:
+        """Lazily yield archived tasks"""
+        for item in self.iter_raw(months):
+            yield Task.from_dict(item)
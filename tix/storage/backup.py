@@ -4,6 +4,8 @@ from datetime import datetime
 import shutil
 import json
 
+from tix.storage.archive import TaskArchive
+
 BACKUPS_DIRNAME = "backups"
 
 def _backups_dir_for(data_path: Path) -> Path:
@@ -16,7 +18,7 @@ def _backups_dir_for(data_path: Path) -> Path:
 
 def create_backup(data_path: Path, filename: str = None) -> Path:
     """
-    Create a timestamped backup of the given data file.
+    Create a timestamped backup of the given data file and its archive directory.
     - data_path: Path to the tasks data file (e.g. ~/.tix/tasks.json)
     - filename: optional base name provided by user (without extension)
     Returns: Path to the created backup file.
@@ -38,6 +40,16 @@ def create_backup(data_path: Path, filename: str = None) -> Path:
     backup_path = backups_dir / backup_name
     # copy the file (binary-safe)
     shutil.copy2(str(data_path), str(backup_path))
+    # archived tasks go beside the copy (backup_<ts>.archive/), an empty directory if there are none;
+    # a backup taken in the same second replaces the earlier one, archive included
+    archive_dir = TaskArchive(data_path).archive_dir
+    backup_archive = TaskArchive(backup_path).archive_dir
+    if backup_archive.exists():
+        shutil.rmtree(str(backup_archive))
+    if archive_dir.exists():
+        shutil.copytree(str(archive_dir), str(backup_archive))
+    else:
+        backup_archive.mkdir()
     return backup_path
 
 def list_backups(data_path: Path):
@@ -52,7 +64,7 @@ def list_backups(data_path: Path):
 
 def restore_from_backup(backup_file: str, data_path: Path, require_confirm: bool = True):
     """
-    Restore the data file from a backup.
+    Restore the data file, and the archive directory if the backup has one, from a backup.
     - backup_file: either an absolute path to a backup, or the filename located in backups dir.
     - data_path: the tasks data file path to overwrite.
     - require_confirm: if True, will raise RuntimeError if confirmation wasn't provided (the CLI handles prompt)
@@ -71,7 +83,7 @@ def restore_from_backup(backup_file: str, data_path: Path, require_confirm: bool
             src = candidate
         else:
             # try best-effort: if backup_file looks like name without ext, search for matching prefix
-            matches = [p for p in backups_dir.iterdir() if p.name.startswith(backup_file)]
+            matches = [p for p in backups_dir.iterdir() if p.is_file() and p.name.startswith(backup_file)]
             if matches:
                 matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
                 src = matches[0]
@@ -82,4 +94,11 @@ def restore_from_backup(backup_file: str, data_path: Path, require_confirm: bool
     # ensure destination dir exists
     data_path.parent.mkdir(parents=True, exist_ok=True)
     shutil.copy2(str(src), str(data_path))
+    # backups made before archives were included have no archive directory; keep the current one
+    backup_archive = TaskArchive(src).archive_dir
+    if backup_archive.is_dir():
+        archive_dir = TaskArchive(data_path).archive_dir
+        if archive_dir.exists():
+            shutil.rmtree(str(archive_dir))
+        shutil.copytree(str(backup_archive), str(archive_dir))
     return data_path
@@ -0,0 +1,531 @@
+import errno
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+CHUNK_SIZE = 1 << 20
+# copies are I/O bound: enough threads to keep the disk busy, bounded for huge directories
+INGEST_WORKERS = 8
+# ioctl request number of Linux FICLONE (copy-on-write clone on btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 of a file, read in fixed-size chunks so memory use does not grow with its size"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def _reflink(src, dst) -> bool:
+    try:
+        import fcntl
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_file_range(src, dst, size: int) -> bool:
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None:
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = copy_range(src.fileno(), dst.fileno(), size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied == 0 and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+            return False
+        raise
+    return True
+
+
+def clone_file(src_path: Path, dst_path: Path) -> bool:
+    """Reflink src to a new file at dst; False, leaving nothing behind, where unsupported"""
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        cloned = _reflink(src, dst)
+    if not cloned:
+        os.unlink(dst_path)
+    return cloned
+
+
+def copy_file(src_path: Path, dst_path: Path) -> str:
+    """
+    Copy a file without passing its bytes through Python where the platform allows it:
+    a reflink, then copy_file_range, then a chunked copy. Returns the method used.
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        if _reflink(src, dst):
+            return "reflink"
+        if _copy_file_range(src, dst, os.fstat(src.fileno()).st_size):
+            return "copy_file_range"
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        return "copy"
+
+
+class Source(NamedTuple):
+    """A file to attach: where it is, its path inside the task's attachment directory,
+    and the top-level entry (the file itself or the directory it came from) recorded on the task"""
+    path: Path
+    name: str
+    root: str
+
+
+class IngestError(Exception):
+    """Raised when a file could not be copied into the blob store; nothing was kept"""
+
+
+class NameClashError(Exception):
+    """Raised when different files would be attached under the same name"""
+
+    def __init__(self, names: List[str]):
+        super().__init__(", ".join(names))
+        self.names = names
+
+
+def _glob_root(pattern: str) -> Path:
+    """The directory a glob pattern starts from: its leading components without wildcards"""
+    parts = []
+    for part in Path(pattern).parts[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return Path(*parts).resolve() if parts else Path.cwd()
+
+
+def expand_sources(patterns: Iterable[str]) -> Tuple[List[Source], List[str]]:
+    """
+    Expand files, directories (recursively) and glob patterns into files to attach.
+    A file is named by its path below the glob's root (just its name for a plain path),
+    a directory's files by their path below its parent. Returns the sources and the
+    patterns that matched nothing; raises NameClashError if different files get one name.
+    """
+    sources: Dict[str, Source] = {}
+    clashes = []
+    missing = []
+
+    def add(path: Path, name: str):
+        known = sources.setdefault(name, Source(path, name, name.split("/", 1)[0]))
+        if known.path != path and name not in clashes:
+            clashes.append(name)
+
+    for pattern in patterns:
+        expanded = os.path.expanduser(pattern)
+        is_glob = glob.has_magic(expanded)
+        matches = glob.glob(expanded, recursive=True) if is_glob else [expanded]
+        root = _glob_root(expanded) if is_glob else None
+        found = False
+        for match in matches:
+            path = Path(match).resolve()
+            if not path.is_file() and not path.is_dir():
+                continue
+            found = True
+            try:
+                base = path.relative_to(root).as_posix() if root else path.name
+            except ValueError:  # a symlink or .. led outside the root
+                base = path.name
+            if path.is_file():
+                add(path, base)
+                continue
+            for dirpath, _, filenames in os.walk(path):
+                for filename in filenames:
+                    file = Path(dirpath) / filename
+                    add(file, f"{base}/{file.relative_to(path).as_posix()}")
+        if not found:
+            missing.append(pattern)
+    if clashes:
+        raise NameClashError(clashes)
+    return list(sources.values()), missing
+
+
+def iter_files(paths: Iterable[str]) -> Iterable[str]:
+    """Files under attachment entries, which are files or directories; missing entries are yielded as-is"""
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        yield entry.path
+        except NotADirectoryError:
+            yield path
+        except FileNotFoundError:
+            yield path
+
+
+class BlobStore:
+    """
+    Content-addressed store for attachment files. Each distinct content is kept once
+    under blobs/<sha[:2]>/<sha>. A task's attachment path is a reflink of its blob where
+    the filesystem supports one (a writable file sharing the blob's data), otherwise a
+    hard link to the read-only blob that unshare() turns into a private copy before it is
+    edited. refs.json maps attachment paths to blob hashes, and a blob is deleted when
+    its last attachment path is released.
+    meta.json caches each attachment's size, mtime and hash for verification.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.refs_path = root / "refs.json"
+        self.meta_path = root / "meta.json"
+        self._refs: Optional[Dict[str, str]] = None
+        self._meta: Optional[Dict[str, dict]] = None
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def refs(self) -> Dict[str, str]:
+        if self._refs is None:
+            try:
+                self._refs = json.loads(self.refs_path.read_text())
+            except (OSError, ValueError):
+                self._refs = {}
+            self._counts = {}
+            for digest in self._refs.values():
+                self._counts[digest] = self._counts.get(digest, 0) + 1
+        return self._refs
+
+    @property
+    def meta(self) -> Dict[str, dict]:
+        if self._meta is None:
+            try:
+                self._meta = json.loads(self.meta_path.read_text())
+            except (OSError, ValueError):
+                self._meta = {}
+        return self._meta
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        for path, data in ((self.refs_path, self._refs), (self.meta_path, self._meta)):
+            if data is None:
+                continue
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=0, sort_keys=True))
+            os.replace(tmp, path)
+
+    def record(self, path: Path, digest: str):
+        """Cache an attachment's size, mtime and hash"""
+        st = os.stat(path)
+        self.meta[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def refcount(self, digest: str) -> int:
+        self.refs  # loading the refs also counts them
+        return self._counts.get(digest, 0)
+
+    def ingest(self, src: Path) -> str:
+        """Add a file's content to the store unless it is already there, return its hash"""
+        digest, _ = self._ingest(src)
+        return digest
+
+    def _ingest(self, src: Path) -> Tuple[str, bool]:
+        digest = hash_file(src)
+        blob = self.blob_path(digest)
+        if blob.exists():
+            return digest, False
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        # unique per thread, so concurrent ingests of the same content cannot collide
+        tmp = blob.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            copy_file(src, tmp)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, blob)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return digest, True
+
+    def ingest_many(self, paths: Sequence[Path], workers: int = INGEST_WORKERS,
+                    advance: Callable[[int], None] = None) -> Dict[Path, str]:
+        """
+        Ingest files with a bounded thread pool, return their hashes by path. advance is
+        called with each finished file's size. If any file fails, the blobs this call
+        created are removed again and IngestError is raised.
+        """
+        digests: Dict[Path, str] = {}
+        created: List[str] = []
+
+        def work(path: Path):
+            digest, new = self._ingest(path)
+            with self._lock:
+                digests[path] = digest
+                if new:
+                    created.append(digest)
+            if advance:
+                advance(path.stat().st_size)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(work, path): path for path in paths}
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = next((f for f in done if f.exception() is not None), None)
+            if failed is not None:
+                for future in pending:
+                    future.cancel()
+        if failed is not None:
+            # the pool has drained: nothing links to the new blobs yet
+            for digest in created:
+                if not self.refcount(digest):
+                    try:
+                        self.blob_path(digest).unlink()
+                    except FileNotFoundError:
+                        pass
+            raise IngestError(f"{futures[failed]}: {failed.exception()}") from failed.exception()
+        return digests
+
+    def link(self, digest: str, dest: Path) -> Optional[str]:
+        """
+        Make dest refer to a stored blob, replacing whatever dest referred to. Returns how:
+        'reflink', 'hardlink', or 'copy' where the filesystem allows neither and the content
+        is stored twice; None if dest already referred to the blob.
+        """
+        if self.refs.get(str(dest)) == digest and dest.exists():
+            return None
+        self.release(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        blob = self.blob_path(digest)
+        if clone_file(blob, dest):
+            method = "reflink"
+        else:
+            try:
+                os.link(blob, dest)
+                method = "hardlink"
+            except OSError:
+                copy_file(blob, dest)
+                method = "copy"
+        self.refs[str(dest)] = digest
+        self._counts[digest] = self._counts.get(digest, 0) + 1
+        self.record(dest, digest)
+        return method
+
+    def unshare(self, dest: Path) -> bool:
+        """
+        Replace an attachment that is a hard link to its blob with a private writable copy,
+        so editing it cannot change the blob other tasks share. False if it was not shared.
+        """
+        digest = self.refs.get(str(dest))
+        if digest is None or not _same_file(dest, self.blob_path(digest)):
+            return False
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        try:
+            copy_file(self.blob_path(digest), tmp)
+            os.replace(tmp, dest)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self.record(dest, digest)
+        return True
+
+    def attach(self, src: Path, dest: Path) -> str:
+        """
+        Store src and make dest refer to its blob, replacing whatever dest referred to.
+        Returns the blob hash. Call save() afterwards to persist the reference counts.
+        """
+        digest = self.ingest(src)
+        self.link(digest, dest)
+        return digest
+
+    def release(self, dest: Path) -> bool:
+        """Remove an attachment path and free its blob if nothing else refers to it"""
+        digest = self.refs.pop(str(dest), None)
+        self.meta.pop(str(dest), None)
+        try:
+            dest.unlink()
+        except FileNotFoundError:
+            pass
+        if digest is None:
+            return False
+        self._counts[digest] -= 1
+        if not self._counts[digest]:
+            del self._counts[digest]
+            try:
+                self.blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+        return True
+
+    def verify(self, paths: Iterable[str], force: bool = False,
+               workers: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Check attachment files against their recorded hashes, return (path, status) pairs.
+        Files whose size and mtime match the cache are 'unchanged' without being read
+        (unless force); the rest are re-hashed across a process pool and reported 'ok',
+        'changed' or, if nothing was recorded yet, 'new' (their hash is recorded now).
+        Missing files are 'missing'. Call save() afterwards to keep the refreshed cache.
+        """
+        results: List[Tuple[str, str]] = []
+        to_hash: List[Tuple[str, os.stat_result]] = []
+        for path in iter_files(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                results.append((path, "missing"))
+                continue
+            cached = self.meta.get(path)
+            if (not force and cached and cached["size"] == st.st_size
+                    and cached["mtime_ns"] == st.st_mtime_ns):
+                results.append((path, "unchanged"))
+            else:
+                to_hash.append((path, st))
+        if to_hash:
+            # hashing is CPU bound per file: one process per core keeps the disk busy
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                digests = pool.map(hash_file, [p for p, _ in to_hash], chunksize=max(1, len(to_hash) // 256))
+                for (path, st), digest in zip(to_hash, digests):
+                    expected = (self.meta.get(path) or {}).get("sha256") or self.refs.get(path)
+                    if expected is None:
+                        status = "new"
+                    elif expected == digest:
+                        status = "ok"
+                    else:
+                        results.append((path, "changed"))
+                        continue
+                    self.meta[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+                    results.append((path, status))
+        return results
+
+
+@dataclass
+class GcResult:
+    """What a garbage collection found (and removed, unless it was a dry run)"""
+    files: int = 0
+    bytes: int = 0
+    blobs: int = 0
+    dirs: int = 0
+    dry_run: bool = False
+
+
+def _is_live(path: str, live: Set[str], root: str) -> bool:
+    """A file is live if it or a directory above it (below root) is a task's attachment entry"""
+    while len(path) > len(root):
+        if path in live:
+            return True
+        path = os.path.dirname(path)
+    return False
+
+
+def _same_file(a, b) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def collect_garbage(attachments_dir: Path, blobs: BlobStore, live: Iterable[str],
+                    dry_run: bool = False) -> GcResult:
+    """
+    Remove attachment files no task refers to, then blobs nothing links to any more
+    and directories left empty. `live` is every attachment entry of every task.
+    bytes counts space actually freed: an attachment that is not a hard link to its blob
+    frees its own size, a hard link frees nothing while its blob is still shared.
+    """
+    live = set(live)
+    root = str(attachments_dir)
+    result = GcResult(dry_run=dry_run)
+    released: Dict[str, int] = {}
+
+    def drop(path: str, size: int):
+        digest = blobs.refs.get(path)
+        if digest is None:
+            # a plain copy from before the blob store
+            result.bytes += size
+            if not dry_run:
+                os.unlink(path)
+            return
+        if size and not _same_file(path, blobs.blob_path(digest)):
+            result.bytes += size
+        released[digest] = released.get(digest, 0) + 1
+        # a real run releases as it goes, so the count already excludes earlier releases
+        remaining = blobs.refcount(digest) - (released[digest] if dry_run else 1)
+        if remaining == 0:
+            # the last reference: the blob itself goes away
+            result.bytes += blobs.blob_path(digest).stat().st_size
+        if not dry_run:
+            blobs.release(Path(path))
+
+    dirs: List[str] = []
+    kept: Set[str] = set()
+
+    def keep(path: str):
+        # directories holding something live survive, up to the root
+        while len(path) > len(root) and path not in kept:
+            kept.add(path)
+            path = os.path.dirname(path)
+
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+                if entry.path in live:
+                    keep(entry.path)
+                stack.append(entry.path)
+            elif _is_live(entry.path, live, root):
+                keep(os.path.dirname(entry.path))
+            else:
+                result.files += 1
+                drop(entry.path, entry.stat(follow_symlinks=False).st_size)
+
+    # references to attachment files that were deleted by hand
+    for path in [p for p in blobs.refs if not os.path.lexists(p)]:
+        drop(path, 0)
+
+    # blobs nothing refers to, e.g. left behind by an interrupted attach
+    if blobs.root.is_dir():
+        referenced = set(blobs.refs.values())
+        if dry_run:
+            referenced = {d for d in referenced if released.get(d, 0) < blobs.refcount(d)}
+        for shard in os.scandir(blobs.root):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for blob in os.scandir(shard.path):
+                # dot files are copies still in progress
+                if blob.name.startswith(".") or blob.name in referenced or (dry_run and blob.name in released):
+                    continue
+                result.blobs += 1
+                result.bytes += blob.stat().st_size
+                if not dry_run:
+                    os.unlink(blob.path)
+
+    # deepest first, so parents emptied by their children are removed too
+    for path in sorted(dirs, key=len, reverse=True):
+        if path in kept:
+            continue
+        result.dirs += 1
+        if not dry_run:
+            try:
+                os.rmdir(path)
+            except OSError:
+                result.dirs -= 1
+    if not dry_run:
+        blobs.save()
+    return result
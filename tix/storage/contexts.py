@@ -0,0 +1,141 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tix.models import Task
+from tix.storage import summary as summaries
+from tix.storage.json_storage import GLOBAL_CONTEXT, TaskStorage, store_paths
+from tix.storage.query import Query, Term, compile_query, compile_terms
+
+
+def merge_key(task: Task):
+    """Order of merged results: active first, then by ID, then by context"""
+    return (task.completed, task.id, getattr(task, "context", ""))
+
+
+def _open(name: str, path: str) -> TaskStorage:
+    return TaskStorage(Path(path), context=name)
+
+
+# workers run in other processes: they take and return plain data
+
+def _load(name: str, path: str, include_archived: bool, active_only: bool) -> List[dict]:
+    items = _open(name, path).iter_raw(include_archived)
+    return [item for item in items if not (active_only and item.get("completed"))]
+
+
+def _query(name: str, path: str, source: str, terms: List[Term], include_archived: bool) -> List[dict]:
+    return [t.to_dict() for t in _open(name, path).query(compile_terms(terms, source), include_archived)]
+
+
+def _fuzzy(name: str, path: str, query: str, limit: Optional[int], include_completed: bool) -> List[Tuple[float, dict]]:
+    return [(score, t.to_dict()) for score, t in
+            _open(name, path).fuzzy_search(query, limit, include_completed, scored=True)]
+
+
+def _summary(name: str, path: str, include_archived: bool) -> dict:
+    return _open(name, path).summary(include_archived)
+
+
+class ContextSet:
+    """
+    Read-only view over several contexts with the read API of TaskStorage that listing,
+    search, stats and tags use. Each context file is loaded and filtered in its own
+    process and the per-context results are merged in sorted order; every returned
+    task carries the name of its context in `task.context`.
+    """
+
+    def __init__(self, paths: Dict[str, Path], workers: Optional[int] = None, global_path: Optional[Path] = None):
+        self.paths = paths
+        self.workers = workers or min(len(paths), os.cpu_count() or 1) or 1
+        # the global store, for summaries that count global tasks in every selection
+        self.global_path = global_path
+
+    @classmethod
+    def select(cls, names: Optional[Sequence[str]] = None, base_dir: Path = None) -> "ContextSet":
+        """Every context with a store, or the named ones; raises KeyError for unknown names"""
+        available = store_paths(base_dir)
+        global_path = available.get(GLOBAL_CONTEXT)
+        if not names:
+            return cls(available, global_path=global_path)
+        missing = [n for n in names if n not in available]
+        if missing:
+            raise KeyError(", ".join(missing))
+        return cls({n: available[n] for n in dict.fromkeys(names)}, global_path=global_path)
+
+    def _map(self, func: Callable, *args) -> Iterator[Tuple[str, object]]:
+        """Run func(name, path, *args) for every context, in parallel when there are several"""
+        names = list(self.paths)
+        if len(names) <= 1 or self.workers <= 1:
+            for name in names:
+                yield name, func(name, str(self.paths[name]), *args)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(func, name, str(self.paths[name]), *args) for name in names]
+            for name, future in zip(names, futures):
+                yield name, future.result()
+
+    @staticmethod
+    def _tasks(name: str, items: Iterable[dict]) -> List[Task]:
+        tasks = []
+        for item in items:
+            task = Task.from_dict(item)
+            task.context = name
+            tasks.append(task)
+        return tasks
+
+    def _merged(self, results: Iterable[Tuple[str, List[dict]]]) -> List[Task]:
+        runs = [sorted(self._tasks(name, items), key=merge_key) for name, items in results]
+        return list(heapq.merge(*runs, key=merge_key))
+
+    def load_tasks(self, include_archived: bool = False) -> List[Task]:
+        return self._merged(self._map(_load, include_archived, False))
+
+    def iter_tasks(self, include_archived: bool = False) -> Iterator[Task]:
+        return iter(self.load_tasks(include_archived))
+
+    def get_active_tasks(self) -> List[Task]:
+        return self._merged(self._map(_load, False, True))
+
+    def query(self, query, include_archived: bool = False) -> List[Task]:
+        if not isinstance(query, Query):
+            query = compile_query(query)
+        # compiled match functions cannot be pickled: ship the terms and compile per process
+        return self._merged(self._map(_query, query.source, query.terms, include_archived))
+
+    def fuzzy_search(self, query: str, limit: Optional[int] = 20, include_completed: bool = False) -> List[Task]:
+        """Each context ranks its own top matches; the best overall are kept"""
+        scored = []
+        for name, results in self._map(_fuzzy, query, limit, include_completed):
+            for score, item in results:
+                task, = self._tasks(name, [item])
+                scored.append((score, task))
+        scored.sort(key=lambda x: (-x[0], merge_key(x[1])))
+        return [task for _, task in (scored if limit is None else scored[:limit])]
+
+    def summary(self, include_archived: bool = False, include_global: bool = False) -> dict:
+        """
+        Global tasks are counted once: as the 'global' context when it is selected, or
+        added with include_global when it is not
+        """
+        merged = summaries.merge(*(s for _, s in self._map(_summary, include_archived)))
+        if include_global and self.global_path and GLOBAL_CONTEXT not in self.paths:
+            merged = summaries.merge(merged, _summary(GLOBAL_CONTEXT, str(self.global_path), include_archived))
+        return merged
+
+
+def context_counts(base_dir: Path = None) -> Dict[str, dict]:
+    """
+    Per-context task counts read from each store's header summary and its archive
+    summary, without parsing task lists
+    """
+    counts = {}
+    for name, path in store_paths(base_dir).items():
+        storage = _open(name, str(path))
+        header = storage.read_header().get("summary")
+        status = (header if summaries.is_current(header) else storage.summary())["status"]
+        archived = storage.archive.summary()["status"]["total"] if storage.archive.exists() else 0
+        counts[name] = dict(status, archived=archived)
+    return counts
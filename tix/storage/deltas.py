@@ -0,0 +1,90 @@
+import json
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# derived files are written with "version", "rev" and "stamp" first, so the store state
+# they reflect can be read from the start of the file without parsing the rest
+SNAPSHOT_STATE_RE = re.compile(rb'"rev":(\d+),"stamp":(?:"(\w*)"|null)')
+
+# a store state: its revision counter and the random stamp of the write that produced it.
+# The counter alone can repeat (a restored backup counts up again); the stamp cannot.
+State = Tuple[int, Optional[str]]
+
+
+def log_path(path: Path) -> Path:
+    return path.with_name(path.name + ".log")
+
+
+def snapshot_state(path: Path) -> Optional[State]:
+    """Store state a derived file was saved at, None if it is missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(256)
+    except OSError:
+        return None
+    m = SNAPSHOT_STATE_RE.search(head)
+    if not m:
+        return None
+    return int(m.group(1)), None if m.group(2) is None else m.group(2).decode()
+
+
+def record(path: Path, old: State, new: State, removed: List[dict], added: List[dict]):
+    """
+    Append one store write (old -> new state) to the log of the derived file at path.
+    Nothing is logged if the file does not exist, or if it is behind the store and has no
+    log, so a log always continues from its snapshot up to the latest logged write.
+    """
+    if not path.exists():
+        return
+    log = log_path(path)
+    if not log.exists() and snapshot_state(path) != tuple(old):
+        return
+    entry = {"from": old[0], "from_stamp": old[1], "rev": new[0], "stamp": new[1],
+             "removed": removed, "added": added}
+    with open(log, "a") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def discard(path: Path):
+    """Drop the log of a derived file, after a snapshot or a write that was not logged"""
+    try:
+        log_path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def replay(derived, path: Path) -> bool:
+    """
+    Apply the logged writes after derived.rev to a loaded derived file (anything with
+    rev, stamp, add(item) and remove(item)). Returns False if the log does not continue
+    from its exact state or ends in a torn line; rev and stamp then tell how far it got.
+    """
+    try:
+        f = open(log_path(path))
+    except FileNotFoundError:
+        return True
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                return False
+            if derived.rev is not None and entry["rev"] <= derived.rev:
+                continue  # already in the snapshot
+            if (entry["from"], entry.get("from_stamp")) != (derived.rev, derived.stamp):
+                return False
+            for item in entry["removed"]:
+                derived.remove(item)
+            for item in entry["added"]:
+                derived.add(item)
+            derived.rev, derived.stamp = entry["rev"], entry.get("stamp")
+    return True
+
+
+def needs_compaction(path: Path) -> bool:
+    """True once the log has grown past a quarter of its snapshot"""
+    try:
+        return log_path(path).stat().st_size * 4 > path.stat().st_size
+    except OSError:
+        return False
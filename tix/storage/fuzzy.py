@@ -0,0 +1,119 @@
+import heapq
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from tix.models import to_epoch
+from tix.storage.index import TextIndex, tokenize
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+PRIORITY_BOOST = {"high": 1.25, "medium": 1.0, "low": 0.9}
+RECENCY_BOOST = 0.25       # extra weight for a task created right now
+RECENCY_HALF_LIFE = 30.0   # days
+MAX_BOOST = max(PRIORITY_BOOST.values()) * (1 + RECENCY_BOOST)
+
+
+def edit_distance(a: str, b: str, max_dist: int) -> int:
+    """
+    Edit distance counting adjacent transpositions as one edit (optimal string
+    alignment), giving up with max_dist + 1 once it is exceeded
+    """
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    before = None
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], before[j - 2] + 1)
+        if min(cur) > max_dist:
+            return max_dist + 1
+        before, prev = prev, cur
+    return prev[-1]
+
+
+def max_typos(term: str) -> int:
+    return 0 if len(term) < 3 else (1 if len(term) < 7 else 2)
+
+
+def expand(index: TextIndex, term: str) -> Dict[str, float]:
+    """Vocabulary terms matching a query term within its typo budget, with a similarity weight"""
+    budget = max_typos(term)
+    matches: Dict[str, float] = {}
+    if term in index.tokens:
+        matches[term] = 1.0
+    for tok in index.similar_terms(term):
+        if tok == term:
+            continue
+        if tok.startswith(term) and len(term) >= 3:
+            matches[tok] = max(matches.get(tok, 0.0), 0.8)
+            continue
+        dist = edit_distance(term, tok, budget)
+        if dist <= budget:
+            matches[tok] = max(matches.get(tok, 0.0), 1.0 - dist / (len(term) + 1))
+    return matches
+
+
+def bm25_scores(index: TextIndex, query: str) -> Dict[int, float]:
+    """
+    BM25 score per task for a typo-tolerant query. Each query term contributes
+    its best-matching vocabulary term, weighted by similarity.
+    """
+    n_docs = max(len(index.lengths), 1)
+    avg_len = (sum(index.lengths.values()) / n_docs) or 1.0
+    scores: Dict[int, float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        best: Dict[int, float] = {}
+        for tok, weight in expand(index, term).items():
+            postings = index.tokens.get(tok, ())
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for task_id in postings:
+                length = index.lengths.get(task_id, avg_len)
+                s = weight * idf * (K1 + 1) / (1 + K1 * (1 - B + B * length / avg_len))
+                if s > best.get(task_id, 0.0):
+                    best[task_id] = s
+        for task_id, s in best.items():
+            scores[task_id] = scores.get(task_id, 0.0) + s
+    return scores
+
+
+def boost(item: dict, now: float) -> float:
+    """Multiplier for priority and recency of a serialized task; now is epoch seconds"""
+    factor = PRIORITY_BOOST.get(item.get("priority"), 1.0)
+    created = to_epoch(item.get("created_at"))
+    if created is None:
+        return factor
+    age_days = max((now - created) / 86400, 0.0)
+    return factor * (1 + RECENCY_BOOST * 0.5 ** (age_days / RECENCY_HALF_LIFE))
+
+
+def rank(index: TextIndex, items: Dict[int, dict], query: str, limit: Optional[int] = 20,
+         now: datetime = None) -> List[Tuple[float, dict]]:
+    """
+    Return up to limit (score, item) pairs, best first.
+    Candidates are visited in order of their BM25 score and scanning stops once
+    no remaining candidate can beat the current top results even at maximum boost.
+    """
+    if limit is not None and limit <= 0:
+        return []
+    now = (now or datetime.now()).timestamp()
+    base = bm25_scores(index, query)
+    ordered = sorted(((s, i) for i, s in base.items() if i in items), reverse=True)
+    if limit is None:
+        limit = len(ordered)
+    top: List[Tuple[float, int]] = []
+    for s, task_id in ordered:
+        if len(top) >= limit and s * MAX_BOOST <= top[0][0]:
+            break
+        score = s * boost(items[task_id], now)
+        if len(top) < limit:
+            heapq.heappush(top, (score, -task_id))
+        elif score > top[0][0]:
+            heapq.heapreplace(top, (score, -task_id))
+    return [(score, items[-neg_id]) for score, neg_id in sorted(top, reverse=True)]
@@ -34,6 +34,16 @@ class HistoryManager:
         data["redo"] = [] 
         self._write_data(data)
 
+    def record_many(self, operations: List[dict]):
+        """Record several operations, oldest first, with a single read and write"""
+        if not operations:
+            return
+        data = self._read_data()
+        data["undo"].extend(operations)
+        del data["undo"][:-self.limit]
+        data["redo"] = []
+        self._write_data(data)
+
     def pop_undo(self):
         """Pop the latest operation form uno stack and push to redo stack"""
         data = self._read_data()
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from tix.storage import deltas
+
+TOKEN_RE = re.compile(r"\w+")
+INDEX_VERSION = 2
+
+
+def tokenize(text: str):
+    """Lower-cased word tokens of a text"""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Set of lower-cased character trigrams of a text"""
+    text = (text or "").lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def item_tokens(item: dict):
+    """Tokens of a serialized task: words of its text plus its tags"""
+    return tokenize(item.get("text", "")) + [t.lower() for t in item.get("tags") or []]
+
+
+class TextIndex:
+    """
+    Persisted inverted index over tasks: word and tag tokens and text trigrams
+    mapped to task IDs, plus token counts per task for ranking.
+    `rev` and `stamp` record the store state the index reflects. Writes to the store are
+    appended to a delta log (see tix.storage.deltas) that load() replays, so a write
+    never rewrites the whole index; save() writes a snapshot and drops the log.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rev = None
+        self.stamp: Optional[str] = None
+        self.tokens: Dict[str, Set[int]] = {}
+        self.trigrams: Dict[str, Set[int]] = {}
+        self.lengths: Dict[int, int] = {}
+        self._term_grams: Optional[Dict[str, Set[str]]] = None
+
+    def load(self) -> bool:
+        """Load the index and its logged writes, return False if missing, unreadable or torn"""
+        try:
+            raw = json.loads(self.path.read_text())
+            if raw.get("version") != INDEX_VERSION:
+                return False
+            self.rev, self.stamp = raw["rev"], raw.get("stamp")
+            self.tokens = {k: set(v) for k, v in raw["tokens"].items()}
+            self.trigrams = {k: set(v) for k, v in raw["trigrams"].items()}
+            self.lengths = {int(k): v for k, v in raw["lengths"].items()}
+            self._term_grams = None
+            return deltas.replay(self, self.path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "rev": self.rev,
+            "stamp": self.stamp,
+            "tokens": {k: sorted(v) for k, v in self.tokens.items()},
+            "trigrams": {k: sorted(v) for k, v in self.trigrams.items()},
+            "lengths": self.lengths,
+        }
+        # a crash mid-write must not leave a truncated file behind
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        deltas.discard(self.path)
+
+    def rebuild(self, items: Iterable[dict], rev, stamp: Optional[str] = None):
+        """Rebuild postings from serialized tasks"""
+        self.tokens, self.trigrams, self.lengths = {}, {}, {}
+        for item in items:
+            self.add(item)
+        self.rev, self.stamp = rev, stamp
+
+    def add(self, item: dict):
+        """Add postings for a serialized task"""
+        task_id, text = item["id"], item.get("text", "")
+        toks = item_tokens(item)
+        self.lengths[task_id] = len(toks)
+        for tok in set(toks):
+            self.tokens.setdefault(tok, set()).add(task_id)
+        for tri in trigrams(text):
+            self.trigrams.setdefault(tri, set()).add(task_id)
+        self._term_grams = None
+
+    def remove(self, item: dict):
+        """Remove postings for a serialized task, dropping empty posting lists"""
+        task_id, text = item["id"], item.get("text", "")
+        self.lengths.pop(task_id, None)
+        for tok in set(item_tokens(item)):
+            self._discard(self.tokens, tok, task_id)
+        for tri in trigrams(text):
+            self._discard(self.trigrams, tri, task_id)
+        self._term_grams = None
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], key: str, task_id: int):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del postings[key]
+
+    def candidates(self, query: str) -> Optional[Set[int]]:
+        """
+        IDs of tasks whose text may contain query as a substring.
+        Results are a superset of true matches and must be verified; None means
+        the query is too short to narrow down and every task is a candidate.
+        """
+        query = (query or "").lower()
+        if len(query) >= 3:
+            result = None
+            # rarest trigrams first so the intersection shrinks quickly
+            for tri in sorted(trigrams(query), key=lambda t: len(self.trigrams.get(t, ()))):
+                ids = self.trigrams.get(tri)
+                if not ids:
+                    return set()
+                result = set(ids) if result is None else result & ids
+                if not result:
+                    break
+            return result
+        if query.strip() and TOKEN_RE.fullmatch(query.strip()):
+            prefix = query.strip()
+            found: Set[int] = set()
+            for tok, ids in self.tokens.items():
+                if prefix in tok:
+                    found |= ids
+            return found
+        return None
+
+    def similar_terms(self, term: str) -> Dict[str, int]:
+        """
+        Vocabulary terms sharing at least one padded trigram with term, with the
+        number of shared trigrams. The gram map is derived from the vocabulary on first use.
+        """
+        if self._term_grams is None:
+            self._term_grams = {}
+            for tok in self.tokens:
+                for gram in trigrams(f"  {tok} "):
+                    self._term_grams.setdefault(gram, set()).add(tok)
+        found: Dict[str, int] = {}
+        for gram in trigrams(f"  {term.lower()} "):
+            for tok in self._term_grams.get(gram, ()):
+                found[tok] = found.get(tok, 0) + 1
+        return found
@@ -1,15 +1,89 @@
 import json
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
-from tix.models import Task
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from tix.models import Task, to_epoch
+from tix.storage.archive import TaskArchive
+from tix.storage.blobs import BlobStore
+from tix.storage import deltas
 from tix.storage.history import HistoryManager 
+from tix.storage.index import TextIndex
+from tix.storage.query import Query, compile_query, plan
+from tix.storage.views import MaterializedViews
+from tix.storage import summary as summaries
+
+# version 2 stores created_at/completed_at as integer epoch seconds instead of ISO strings
+SCHEMA_VERSION = 2
+
+# with indent=2 the top-level "tasks" key always starts a line with exactly two spaces
+HEADER_END = b'\n  "tasks": '
+
+# files next to a store that are derived from it rather than being stores themselves
+DERIVED_SUFFIXES = (".index.json", ".views.json")
+
+# tasks shared by every context live in their own store, ~/.tix/global.json
+GLOBAL_CONTEXT = "global"
+
+# parsed stores by path, reused while the file's mtime and size are unchanged
+_parsed: Dict[Path, tuple] = {}
+
+
+class ChangeResult(NamedTuple):
+    """Outcome of TaskStorage.apply_changes"""
+    renumbered: Dict[int, int]  # {old_id: new_id} of added tasks whose ID was taken
+    conflicts: Dict[int, Optional[dict]]  # updates not written: the stored task by ID, None if deleted
+    base_rev: int  # revision of the store the changes were applied to
+    rev: int  # revision after the write
+
+
+def read_cached(path: Path) -> Optional[dict]:
+    """
+    Parsed content of a store file, parsed again only after the file changed
+    (by mtime and size); None if it does not exist. Callers must not modify the result.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _parsed.get(path)
+    if hit is None or hit[0] != stamp:
+        hit = _parsed[path] = (stamp, json.loads(path.read_text()))
+    return hit[1]
+
+
+def store_paths(base_dir: Path = None) -> Dict[str, Path]:
+    """
+    Store file of every context that has one: default, then ~/.tix/contexts/<name>.json
+    by name, then the global store
+    """
+    base_dir = base_dir or Path.home() / ".tix"
+    paths = {}
+    if (base_dir / "tasks.json").exists():
+        paths["default"] = base_dir / "tasks.json"
+    contexts_dir = base_dir / "contexts"
+    if contexts_dir.is_dir():
+        for path in sorted(contexts_dir.glob("*.json")):
+            if not path.name.endswith(DERIVED_SUFFIXES) and path.stem != GLOBAL_CONTEXT:
+                paths[path.stem] = path
+    if (base_dir / "global.json").exists():
+        paths[GLOBAL_CONTEXT] = base_dir / "global.json"
+    return paths
 
 
 class TaskStorage:
     """JSON-based storage for tasks with context support"""
 
-    def __init__(self, storage_path: Path = None, context: str = None, history: HistoryManager = None):
-        """Initialize storage with default or custom path and context"""
+    def __init__(self, storage_path: Path = None, context: str = None, history: HistoryManager = None,
+                 global_path: Path = None):
+        """
+        Initialize storage with default or custom path and context.
+        global_path is the store of tasks shared by all contexts; it defaults to
+        ~/.tix/global.json only when the store path is not given explicitly.
+        """
         self.context = context or self._get_active_context()
         
         # Use context-specific storage path
@@ -21,9 +95,16 @@ class TaskStorage:
                 self.storage_path = base_dir / "tasks.json"
             else:
                 self.storage_path = base_dir / "contexts" / f"{self.context}.json"
+            if global_path is None:
+                global_path = base_dir / "global.json"
+        self.global_path = None if self.context == GLOBAL_CONTEXT else global_path
+        self._global_store = None
         
+        self.index_path = self.storage_path.with_name(f"{self.storage_path.stem}.index.json")
+        self.views_path = self.storage_path.with_name(f"{self.storage_path.stem}.views.json")
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
         self._ensure_file()
+        self.archive = TaskArchive(self.storage_path)
 
         self.history = history or HistoryManager()
 
@@ -37,10 +118,35 @@ class TaskStorage:
             pass
         return "default"
 
+    @property
+    def global_store(self) -> Optional["TaskStorage"]:
+        """The shared store for global tasks, opened on first use; None if this store has none"""
+        if self.global_path is None:
+            return None
+        if self._global_store is None:
+            self._global_store = TaskStorage(self.global_path, context=GLOBAL_CONTEXT, history=self.history)
+        return self._global_store
+
+    def global_tasks(self, include_completed: bool = True) -> List[Task]:
+        """
+        Global tasks, labelled with task.context = 'global'. The global file is parsed
+        again only after it changed since it was last read in this process.
+        """
+        data = read_cached(self.global_path) if self.global_path else None
+        if not data:
+            return []
+        tasks = []
+        for item in data.get("tasks", []):
+            if include_completed or not item.get("completed"):
+                task = Task.from_dict(item)
+                task.context = GLOBAL_CONTEXT
+                tasks.append(task)
+        return tasks
+
     def _ensure_file(self):
         """Ensure storage file exists"""
         if not self.storage_path.exists():
-            self._write_data({"next_id": 1, "tasks": []})
+            self._write_data({"schema": SCHEMA_VERSION, "next_id": 1, "tasks": []})
 
     def _read_data(self) -> dict:
         """Read raw data from storage, ensuring backward compatibility"""
@@ -61,27 +167,228 @@ class TaskStorage:
                     max_id = max(max_id, t["id"])
                     upgraded.append(t)
 
-                upgraded_data = {"next_id": max_id + 1, "tasks": upgraded}
+                upgraded_data = self._migrate({"next_id": max_id + 1, "tasks": upgraded})
                 self._write_data(upgraded_data)
                 return upgraded_data
 
             # new format (dict with tasks + next_id)
             if isinstance(raw, dict) and "tasks" in raw and "next_id" in raw:
+                if raw.get("schema") != SCHEMA_VERSION:
+                    raw = self._migrate(raw)
+                    self._write_data(raw)
                 return raw
 
         except (json.JSONDecodeError, FileNotFoundError):
             pass
 
         # fallback if corrupt or missing
-        return {"next_id": 1, "tasks": []}
+        return {"schema": SCHEMA_VERSION, "next_id": 1, "tasks": []}
 
-    def _write_data(self, data: dict):
-        self.storage_path.write_text(json.dumps(data, indent=2))
+    @staticmethod
+    def _migrate(data: dict) -> dict:
+        """Convert ISO timestamps to epoch seconds, once per store"""
+        for item in data["tasks"]:
+            for key in ("created_at", "completed_at"):
+                if key in item:
+                    item[key] = to_epoch(item[key])
+        data["schema"] = SCHEMA_VERSION
+        return data
 
-    def load_tasks(self) -> List[Task]:
-        """Load all tasks from storage"""
+    def _write_data(self, data: dict, removed: List[dict] = None, added: List[dict] = None):
+        """
+        Write data and keep derived state in step with it.
+        Callers that know which serialized tasks a write removed and added pass them so the
+        header summary and text index are updated incrementally; otherwise the summary is
+        rebuilt and the index and materialized views are left for a lazy rebuild.
+        Incremental writes reach the index and views as appended delta log entries.
+        """
+        # every write bumps the revision and draws a new random stamp, so derived files (like the
+        # text index) can tell which exact store state they reflect: a restored backup or an
+        # older copy of the file can repeat a revision, but not its stamp
+        old = (data.get("rev", 0), data.get("stamp"))
+        data["rev"] = old[0] + 1
+        data["stamp"] = secrets.token_hex(8)
+        incremental = removed is not None and added is not None
+        if incremental and summaries.is_current(data.get("summary")):
+            for item in removed:
+                summaries.apply(data["summary"], item, -1)
+            for item in added:
+                summaries.apply(data["summary"], item, 1)
+        else:
+            data["summary"] = summaries.build(data["tasks"])
+        # header fields first and tasks last, so read_header() can stop before the task list
+        ordered = {k: v for k, v in data.items() if k != "tasks"}
+        ordered["tasks"] = data["tasks"]
+        # write a sibling file and rename it over the store, so readers never see a partial write
+        tmp = self.storage_path.with_name(self.storage_path.name + ".tmp")
+        tmp.write_text(json.dumps(ordered, indent=2))
+        os.replace(tmp, self.storage_path)
+        if incremental:
+            new = (data["rev"], data["stamp"])
+            self._update_index(old, new, removed, added)
+            self._update_views(old, new, removed, added)
+        else:
+            # the derived files fall behind the store and are rebuilt when next used
+            deltas.discard(self.index_path)
+            deltas.discard(self.views_path)
+
+    def read_header(self) -> dict:
+        """Read the store-level fields (next_id, rev, summary) without parsing the task list"""
+        try:
+            with open(self.storage_path, "rb") as f:
+                buf = b""
+                while True:
+                    chunk = f.read(1 << 16)
+                    if not chunk:
+                        break
+                    buf += chunk
+                    pos = buf.find(HEADER_END)
+                    if pos != -1:
+                        return json.loads(buf[:pos].rstrip().rstrip(b",") + b"}")
+        except (OSError, ValueError):
+            pass
+        # legacy or compact files: fall back to a full parse
         data = self._read_data()
-        return [Task.from_dict(item) for item in data["tasks"]]
+        return {k: v for k, v in data.items() if k != "tasks"}
+
+    def summary(self, include_archived: bool = False, include_global: bool = False) -> dict:
+        """Tag and untagged counts from the store header, upgrading old stores on first use"""
+        summary = self.read_header().get("summary")
+        if not summaries.is_current(summary):
+            data = self._read_data()
+            self._write_data(data)
+            summary = data["summary"]
+        if include_archived and self.archive.exists():
+            summary = summaries.merge(summary, self.archive.summary())
+        if include_global and self.global_path and self.global_path.exists():
+            summary = summaries.merge(summary, self.global_store.summary(include_archived))
+        return summary
+
+    def text_index(self, data: dict = None) -> TextIndex:
+        """Return the text index, rebuilding it if it is missing or reflects another store state"""
+        data = data or self._read_data()
+        index = TextIndex(self.index_path)
+        if not index.load() or (index.rev, index.stamp) != (data.get("rev"), data.get("stamp")):
+            index.rebuild(data["tasks"], data.get("rev"), data.get("stamp"))
+            index.save()
+        elif deltas.needs_compaction(self.index_path):
+            index.save()
+        return index
+
+    def _update_index(self, old: deltas.State, new: deltas.State, removed: List[dict] = (), added: List[dict] = ()):
+        """Log a write for the text index; it is applied when the index is next loaded"""
+        deltas.record(self.index_path, old, new, list(removed), list(added))
+
+    def _update_views(self, old: deltas.State, new: deltas.State, removed: List[dict] = (), added: List[dict] = ()):
+        """Log a write for the materialized views; it is applied when they are next loaded"""
+        deltas.record(self.views_path, old, new, list(removed), list(added))
+
+    def _views(self, data: dict = None) -> MaterializedViews:
+        """Return the materialized views, refilling them if they reflect another store state"""
+        views = MaterializedViews(self.views_path)
+        header = data if data else self.read_header()
+        if not views.load() or (views.rev, views.stamp) != (header.get("rev"), header.get("stamp")):
+            data = data or self._read_data()
+            views.rebuild(data["tasks"], data.get("rev"), data.get("stamp"))
+            views.save()
+        elif deltas.needs_compaction(self.views_path):
+            views.save()
+        return views
+
+    def materialize(self, name: str, query: str):
+        """
+        Keep the tasks matching query as view `name`, updated on every add, update
+        and delete. Raises QueryError for invalid or clock-dependent queries.
+        """
+        data = self._read_data()
+        views = self._views(data)
+        views.define(name, query, data["tasks"])
+        views.save()
+
+    def drop_view(self, name: str) -> bool:
+        """Stop maintaining a materialized view, return True if it existed"""
+        if not self.views_path.exists():
+            return False
+        views = MaterializedViews(self.views_path)
+        if not views.load() or not views.drop(name):
+            return False
+        views.save()
+        return True
+
+    def view(self, name: str, query: str, include_archived: bool = False) -> List[Task]:
+        """
+        Tasks of a materialized view without scanning the store; the view is created
+        on first use (e.g. in another context). Archived tasks are not part of views:
+        with include_archived the archive partitions the query can match are scanned.
+        """
+        views = self._views()
+        rows = views.get(name, query)
+        if rows is None:
+            data = self._read_data()
+            views.define(name, query, data["tasks"])
+            views.save()
+            rows = views.get(name)
+        tasks = [Task.from_dict(item) for item in rows]
+        if include_archived and self.archive.exists():
+            q = compile_query(query)
+            months = plan(q, months=self.archive.months()).months
+            if months != set():
+                tasks.extend(q.filter(self.archive.iter_tasks(months)))
+        return tasks
+
+    def find_text(self, query: str, include_archived: bool = False) -> List[Task]:
+        """Tasks whose text contains query (case-insensitive), narrowed down with the text index"""
+        data = self._read_data()
+        candidates = self.text_index(data).candidates(query)
+        q = query.lower()
+        items = data["tasks"] if candidates is None else (i for i in data["tasks"] if i["id"] in candidates)
+        results = [Task.from_dict(i) for i in items if q in i.get("text", "").lower()]
+        if include_archived:
+            results.extend(t for t in self.archive.iter_tasks() if q in t.text.lower())
+        return results
+
+    def query(self, query, include_archived: bool = False) -> List[Task]:
+        """
+        Tasks matching a query (a Query or query string), planned against the text
+        index, the header summary and the archive partitions before scanning
+        """
+        if not isinstance(query, Query):
+            query = compile_query(query)
+        data = self._read_data()
+        summary = data.get("summary") or {}
+        p = plan(query, index=lambda: self.text_index(data), hot_size=len(data["tasks"]),
+                 hot_completed=summary.get("status", {}).get("completed"),
+                 months=self.archive.months() if include_archived else ())
+        results = []
+        if p.scan_hot:
+            items = data["tasks"]
+            if p.candidates is not None:
+                items = (i for i in items if i["id"] in p.candidates)
+            results.extend(query.filter(map(Task.from_dict, items)))
+        if include_archived and p.months != set():
+            results.extend(query.filter(self.archive.iter_tasks(p.months)))
+        return results
+
+    def load_tasks(self, include_archived: bool = False) -> List[Task]:
+        """Load all tasks from storage, optionally including archived completed tasks"""
+        data = self._read_data()
+        tasks = [Task.from_dict(item) for item in data["tasks"]]
+        if include_archived:
+            tasks.extend(self.archive.iter_tasks())
+        return tasks
+
+    def iter_tasks(self, include_archived: bool = False) -> Iterator[Task]:
+        """Yield tasks one at a time instead of building a full list; archives are read last and lazily"""
+        for item in self._read_data()["tasks"]:
+            yield Task.from_dict(item)
+        if include_archived:
+            yield from self.archive.iter_tasks()
+
+    def iter_raw(self, include_archived: bool = False) -> Iterator[dict]:
+        """Yield serialized tasks without building Task objects, for bulk analysis"""
+        yield from self._read_data()["tasks"]
+        if include_archived:
+            yield from self.archive.iter_raw()
 
     def save_tasks(self, tasks: List[Task]):
         """Save all tasks to storage"""
@@ -89,14 +396,34 @@ class TaskStorage:
         data["tasks"] = [task.to_dict() for task in tasks]
         self._write_data(data)
 
+    def fuzzy_search(self, query: str, limit: Optional[int] = 20, include_completed: bool = False,
+                     scored: bool = False) -> List[Task]:
+        """
+        Typo-tolerant search over text and tags, ranked by relevance, priority and recency.
+        With scored=True (score, task) pairs are returned, e.g. to merge rankings of several stores.
+        """
+        from tix.storage.fuzzy import rank
+
+        data = self._read_data()
+        index = self.text_index(data)
+        items = {i["id"]: i for i in data["tasks"] if include_completed or not i.get("completed")}
+        ranked = rank(index, items, query, limit)
+        if scored:
+            return [(score, Task.from_dict(item)) for score, item in ranked]
+        return [Task.from_dict(item) for _, item in ranked]
+
     def add_task(self, text: str, priority: str = 'medium', tags: List[str] = None, due:str=None, is_global: bool = False, record_history: bool = True) -> Task:
-        """Add a new task and return it"""
+        """Add a new task and return it; global tasks are written to the global store only"""
+        if is_global and self.global_store is not None:
+            task = self.global_store.add_task(text, priority, tags, due, record_history=record_history)
+            task.context = GLOBAL_CONTEXT
+            return task
         data = self._read_data()
         new_id = data["next_id"]
         new_task = Task(id=new_id, text=text, priority=priority, tags=tags or [])
         data["tasks"].append(new_task.to_dict())
         data["next_id"] = new_id + 1
-        self._write_data(data)
+        self._write_data(data, removed=[], added=[data["tasks"][-1]])
 
         if record_history:
             self.history.record({
@@ -105,22 +432,26 @@ class TaskStorage:
             })
         return new_task
 
-    def get_task(self, task_id: int) -> Optional[Task]:
-        """Get a specific task by ID"""
+    def get_task(self, task_id: int, include_archived: bool = False) -> Optional[Task]:
+        """Get a specific task by ID, optionally looking in the archive if it is not in the store"""
         tasks = self.load_tasks()
         for task in tasks:
             if task.id == task_id:
                 return task
+        if include_archived:
+            for task in self.archive.iter_tasks():
+                if task.id == task_id:
+                    return task
         return None
 
     def update_task(self, task: Task, record_history: bool = True):
         """Update an existing task"""
-        tasks = self.load_tasks()
-        for i, t in enumerate(tasks):
-            if t.id == task.id:
-                old_task = t
-                tasks[i] = task
-                self.save_tasks(tasks)
+        data = self._read_data()
+        for i, item in enumerate(data["tasks"]):
+            if item["id"] == task.id:
+                old_task = Task.from_dict(item)
+                data["tasks"][i] = task.to_dict()
+                self._write_data(data, removed=[item], added=[data["tasks"][i]])
 
                 if record_history:
                     self.history.record({
@@ -132,12 +463,12 @@ class TaskStorage:
 
     def delete_task(self, task_id: int, record_history: bool = True) -> bool:
         """Delete a task by ID, return True if deleted"""
-        tasks = self.load_tasks()
-        original_count = len(tasks)
-        new_tasks = [t for t in tasks if t.id != task_id]
-        if len(new_tasks) < original_count:
-            old_task = next(t for t in tasks if t.id ==task_id)
-            self.save_tasks(new_tasks)
+        data = self._read_data()
+        removed = [item for item in data["tasks"] if item["id"] == task_id]
+        if removed:
+            old_task = Task.from_dict(removed[0])
+            data["tasks"] = [item for item in data["tasks"] if item["id"] != task_id]
+            self._write_data(data, removed=removed, added=[])
 
             if record_history:
                 self.history.record({
@@ -147,14 +478,167 @@ class TaskStorage:
             return True
         return False
 
+    def update_tasks(self, tasks: List[Task], record_history: bool = True) -> int:
+        """Update several tasks with a single read and write, return number updated"""
+        data = self._read_data()
+        updates = {t.id: t for t in tasks}
+        before, after = [], []
+        for i, item in enumerate(data["tasks"]):
+            task = updates.get(item["id"])
+            if task is not None:
+                before.append(item)
+                data["tasks"][i] = task.to_dict()
+                after.append(data["tasks"][i])
+        if not after:
+            return 0
+        self._write_data(data, removed=before, added=after)
+
+        if record_history:
+            self.history.record({
+                "op": "update_many",
+                "before": before,
+                "after": after
+            })
+        return len(after)
+
+    def apply_changes(self, added: List[Task], updated: List[Task], record_history: bool = True,
+                      expected: Dict[int, dict] = None) -> ChangeResult:
+        """
+        Add tasks that already carry IDs and update others with a single read and write.
+        An added task whose ID was taken in the meantime gets a new ID (see ChangeResult).
+        Updates of tasks no longer in the store are dropped. expected holds the serialized
+        state the caller last read for updated tasks: an update whose stored task has
+        changed since, or was deleted, is not written and is returned as a conflict.
+        """
+        data = self._read_data()
+        base_rev = data.get("rev", 0)
+        expected = expected or {}
+        updates = {t.id: t for t in updated}
+        taken = set()
+        before, after = [], []
+        conflicts = {}
+        for i, item in enumerate(data["tasks"]):
+            taken.add(item["id"])
+            task = updates.get(item["id"])
+            if task is None:
+                continue
+            base = expected.get(task.id)
+            if base is not None and Task.from_dict(item).to_dict() != base:
+                conflicts[task.id] = item
+                continue
+            before.append(item)
+            data["tasks"][i] = task.to_dict()
+            after.append(data["tasks"][i])
+        conflicts.update((i, None) for i in expected if i in updates and i not in taken)
+        # IDs that are free keep their number; taken ones move past every requested ID,
+        # so a new ID never equals one the caller still uses for another task
+        next_id = max([data["next_id"]] + [t.id + 1 for t in added])
+        renumbered = {}
+        new_items = []
+        for task in added:
+            item = task.to_dict()
+            if item["id"] in taken:
+                while next_id in taken:
+                    next_id += 1
+                item["id"] = renumbered[task.id] = next_id
+                next_id += 1
+            taken.add(item["id"])
+            data["tasks"].append(item)
+            new_items.append(item)
+        data["next_id"] = next_id
+        if not after and not new_items:
+            return ChangeResult(renumbered, conflicts, base_rev, base_rev)
+        self._write_data(data, removed=before, added=after + new_items)
+
+        if record_history:
+            ops = [{"op": "add", "after": item} for item in new_items]
+            if after:
+                ops.append({"op": "update_many", "before": before, "after": after})
+            self.history.record_many(ops)
+        return ChangeResult(renumbered, conflicts, base_rev, data["rev"])
+
+    def delete_tasks(self, task_ids: List[int], record_history: bool = True) -> List[Task]:
+        """Delete several tasks with a single read and write, return the deleted tasks"""
+        data = self._read_data()
+        ids = set(task_ids)
+        removed = [item for item in data["tasks"] if item["id"] in ids]
+        if not removed:
+            return []
+        data["tasks"] = [item for item in data["tasks"] if item["id"] not in ids]
+        self._write_data(data, removed=removed, added=[])
+
+        if record_history:
+            self.history.record({
+                "op": "delete_many",
+                "before": removed
+            })
+        return [Task.from_dict(item) for item in removed]
+
     def get_active_tasks(self) -> List[Task]:
         """Get all incomplete tasks"""
         return [t for t in self.load_tasks() if not t.completed]
 
-    def get_completed_tasks(self) -> List[Task]:
+    def get_completed_tasks(self, include_archived: bool = False) -> List[Task]:
         """Get all completed tasks"""
-        return [t for t in self.load_tasks() if t.completed]
+        return [t for t in self.load_tasks(include_archived) if t.completed]
+
+    def archive_completed(self, older_than_days: int, now: datetime = None) -> int:
+        """Move tasks completed more than older_than_days ago into the compressed archive"""
+        cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).timestamp()
+        data = self._read_data()
+        keep, cold = [], []
+        for item in data["tasks"]:
+            completed_at = item.get("completed_at")
+            old = item.get("completed") and completed_at is not None and completed_at < cutoff
+            (cold if old else keep).append(item)
+        if not cold:
+            return 0
+        # write the archive first so a crash can only duplicate tasks, never lose them
+        self.archive.append(cold)
+        data["tasks"] = keep
+        self._write_data(data, removed=cold, added=[])
+        return len(cold)
+
+    def unarchive(self, task_id: int) -> Optional[Task]:
+        """Move an archived task back into the store so it can be changed, None if not archived"""
+        item = next((i for i in self.archive.iter_raw() if i.get("id") == task_id), None)
+        if item is None or self.get_task(task_id):
+            return None
+        data = self._read_data()
+        data["tasks"].append(item)
+        data["tasks"].sort(key=lambda i: i["id"])
+        # write the store first so a crash can only duplicate the task, never lose it
+        self._write_data(data, removed=[], added=[item])
+        self.archive.take({task_id})
+        return Task.from_dict(item)
+
+    def maybe_archive(self, older_than_days: int, interval_hours: int = 24) -> int:
+        """Run archive_completed at most once per interval, tracked by a marker file's mtime"""
+        if older_than_days is None or older_than_days <= 0:
+            return 0
+        marker = self.archive.archive_dir / ".last_run"
+        try:
+            if time.time() - marker.stat().st_mtime < interval_hours * 3600:
+                return 0
+        except OSError:
+            pass
+        moved = self.archive_completed(older_than_days)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+        return moved
     
+    def get_attachments_root(self) -> Path:
+        """Directory holding the attachment directories of every store"""
+        return Path.home() / ".tix" / "attachments"
+
     def get_attachment_dir(self, task_id: int) -> Path:
-        """Return the path where attachments for a task should be stored"""
-        return Path.home() / ".tix" / "attachments" / str(task_id)
+        """
+        Return the path where attachments for a task should be stored. IDs repeat across
+        stores (every context and the global store count from 1), so the directory is
+        keyed by the store's context as well; attachments recorded before keep their paths.
+        """
+        return self.get_attachments_root() / self.context / str(task_id)
+
+    def get_blob_store(self) -> BlobStore:
+        """Return the content-addressed store that attachment files are linked from"""
+        return BlobStore(Path.home() / ".tix" / "blobs")
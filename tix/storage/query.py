@@ -0,0 +1,393 @@
+import re
+import shlex
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from tix.models import Task
+from tix.storage.index import TextIndex
+
+PRIORITY_ALIASES = {
+    "l": "low", "low": "low",
+    "m": "medium", "med": "medium", "medium": "medium",
+    "h": "high", "hi": "high", "high": "high",
+}
+
+STATUS_ALIASES = {
+    "active": False, "open": False, "todo": False, "false": False, "no": False,
+    "done": True, "completed": True, "complete": True, "true": True, "yes": True,
+}
+
+KEYS = {
+    "p": "priority", "priority": "priority",
+    "t": "tag", "tag": "tag", "tags": "tag",
+    "s": "status", "status": "status", "done": "status",
+    "text": "text", "task": "text",
+    "id": "id",
+    "created": "created",
+    "completed": "completed",
+}
+
+TERM_RE = re.compile(r"^(?P<neg>!)?(?P<key>[A-Za-z_]+)(?P<op>>=|<=|:|=|>|<)(?P<value>.*)$", re.S)
+RELATIVE_RE = re.compile(r"^(\d+)([dw])$")
+
+# an ID term is only turned into a candidate set when its ranges are at most this wide
+MAX_ID_CANDIDATES = 100_000
+
+
+class QueryError(ValueError):
+    """Raised for malformed queries"""
+
+
+ID_SPEC_FORMS = "use an ID like 3, a range like 3-7 or a list like 1,4"
+
+
+def parse_id_spec(spec: str) -> List[Tuple[int, int]]:
+    """
+    Parse an ID selector such as '7', '100-250' or '1,3,10-12' into inclusive ranges.
+    Raises ValueError naming the bad part on malformed input.
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                lo, hi = part.split("-", 1)
+                lo, hi = int(lo), int(hi)
+            else:
+                lo = hi = int(part)
+        except ValueError:
+            raise ValueError(f"invalid ID '{part}' ({ID_SPEC_FORMS})") from None
+        if lo > hi:
+            raise ValueError(f"invalid ID range '{part}' (write the lower ID first)")
+        ranges.append((lo, hi))
+    if not ranges:
+        raise ValueError(f"invalid ID selector '{spec}' ({ID_SPEC_FORMS})")
+    return ranges
+
+
+@dataclass
+class Term:
+    """
+    One condition of a query.
+    - priority: values are priority names (any)
+    - status: values is (completed_bool,)
+    - tag: values are tags; mode 'any' or 'all'
+    - text: values is (lower-cased substring,)
+    - id: values are inclusive (lo, hi) ranges
+    - created/completed: values is ((lo, hi),) epoch bounds, hi exclusive, None for open
+    `relative` marks date terms resolved against the current time (today, 7d, ...).
+    """
+    kind: str
+    values: tuple
+    mode: str = "any"
+    negate: bool = False
+    relative: bool = False
+
+
+def _date_range(value: str, now: datetime) -> Tuple[int, int, bool]:
+    """Epoch [lo, hi) covered by a date value, and whether it is relative (Nd/Nw ago)"""
+    v = value.lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if v in ("today", "yesterday"):
+        start = today - timedelta(days=1 if v == "yesterday" else 0)
+        return int(start.timestamp()), int((start + timedelta(days=1)).timestamp()), False
+    m = RELATIVE_RE.match(v)
+    if m:
+        days = int(m.group(1)) * (7 if m.group(2) == "w" else 1)
+        point = int((now - timedelta(days=days)).timestamp())
+        return point, point + 1, True
+    for fmt, step in (("%Y-%m-%d", "day"), ("%Y-%m", "month"), ("%Y", "year")):
+        try:
+            start = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if step == "day":
+            end = start + timedelta(days=1)
+        elif step == "month":
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+        else:
+            end = start.replace(year=start.year + 1)
+        return int(start.timestamp()), int(end.timestamp()), False
+    raise QueryError(f"invalid date '{value}' (use YYYY[-MM[-DD]], today, yesterday or Nd/Nw)")
+
+
+def _bounds(op: str, lo: int, hi: int, relative: bool, now: datetime) -> Tuple[Optional[int], Optional[int]]:
+    if op in (":", "="):
+        # created:7d means "within the last 7 days"
+        return (lo, int(now.timestamp()) + 1) if relative else (lo, hi)
+    if op == ">":
+        return hi, None
+    if op == ">=":
+        return lo, None
+    if op == "<":
+        return None, lo
+    return None, hi  # <=
+
+
+def _is_word(raw: str) -> bool:
+    """A bare word of text: no known key (so 'TODO:' and URLs are text) and no leading !"""
+    m = TERM_RE.match(raw)
+    return not raw.startswith("!") and not (m and m.group("key").lower() in KEYS)
+
+
+def _parse_term(raw: str, now: datetime) -> Term:
+    m = TERM_RE.match(raw)
+    if not m or m.group("key").lower() not in KEYS:
+        # unknown keys are not selectors: 'TODO: fix' or 'http://host' is searched as text
+        negate = raw.startswith("!") and len(raw) > 1
+        return Term("text", ((raw[1:] if negate else raw).lower(),), negate=negate)
+    kind, op, value = KEYS[m.group("key").lower()], m.group("op"), m.group("value").strip()
+    negate = bool(m.group("neg"))
+    if not value:
+        raise QueryError(f"missing value for '{m.group('key')}'")
+    if kind not in ("id", "created", "completed") and op not in (":", "="):
+        raise QueryError(f"'{m.group('key')}' does not support '{op}'")
+    if kind == "priority":
+        names = []
+        for v in value.lower().split(","):
+            if v not in PRIORITY_ALIASES:
+                raise QueryError(f"unknown priority '{v}'")
+            names.append(PRIORITY_ALIASES[v])
+        return Term(kind, tuple(names), negate=negate)
+    if kind == "status":
+        if value.lower() not in STATUS_ALIASES:
+            raise QueryError(f"unknown status '{value}'")
+        return Term(kind, (STATUS_ALIASES[value.lower()],), negate=negate)
+    if kind == "tag":
+        mode = "all" if "+" in value else "any"
+        if value.startswith("[") and value.endswith("]"):
+            value = value[1:-1]
+        tags = tuple(t.strip() for t in re.split(r"[,+]", value) if t.strip())
+        if not tags:
+            raise QueryError("missing tag")
+        return Term(kind, tags, mode=mode, negate=negate)
+    if kind == "text":
+        return Term(kind, (value.lower(),), negate=negate)
+    if kind == "id":
+        try:
+            if op in (":", "="):
+                return Term(kind, tuple(parse_id_spec(value)), negate=negate)
+            n = int(value)
+        except ValueError as e:
+            raise QueryError(str(e) if "ID" in str(e) else f"invalid ID '{value}'")
+        lo, hi = {">": (n + 1, None), ">=": (n, None), "<": (None, n - 1), "<=": (None, n)}[op]
+        return Term(kind, ((lo, hi),), negate=negate)
+    lo, hi, relative = _date_range(value, now)
+    return Term(kind, (_bounds(op, lo, hi, relative, now),), negate=negate,
+                relative=relative or value.lower() in ("today", "yesterday"))
+
+
+def _tokens(source: str) -> List[str]:
+    try:
+        return shlex.split(source)
+    except ValueError:
+        # unbalanced quotes, e.g. while typing in the TUI
+        return source.split()
+
+
+def _expression(term: Term, n: int, env: Dict[str, object], tags: str = "t.tags") -> str:
+    if term.kind == "priority":
+        env[f"P{n}"] = frozenset(term.values)
+        expr = f"t.priority in P{n}"
+    elif term.kind == "status":
+        expr = "t.completed" if term.values[0] else "not t.completed"
+    elif term.kind == "tag":
+        env[f"T{n}"] = frozenset(term.values)
+        expr = f"T{n}.issubset({tags})" if term.mode == "all" else f"not T{n}.isdisjoint({tags})"
+    elif term.kind == "text":
+        env[f"S{n}"] = term.values[0]
+        expr = f"S{n} in text"
+    elif term.kind == "id":
+        parts = []
+        for i, (lo, hi) in enumerate(term.values):
+            env[f"L{n}_{i}"], env[f"H{n}_{i}"] = lo, hi
+            checks = ([f"L{n}_{i} <= t.id"] if lo is not None else []) + ([f"t.id <= H{n}_{i}"] if hi is not None else [])
+            parts.append(" and ".join(checks) or "True")
+        expr = " or ".join(f"({p})" for p in parts)
+    else:
+        attr = "t.created_at" if term.kind == "created" else "t.completed_at"
+        (lo, hi), = term.values
+        env[f"L{n}"], env[f"H{n}"] = lo, hi
+        checks = [f"{attr} is not None"]
+        if lo is not None:
+            checks.append(f"L{n} <= {attr}")
+        if hi is not None:
+            checks.append(f"{attr} < H{n}")
+        expr = " and ".join(checks)
+    return f"not ({expr})" if term.negate else f"({expr})"
+
+
+@dataclass
+class Query:
+    """
+    A compiled query: its terms (all must hold) and a single generated match function.
+    `match_prepared(t, text, tags)` is the same test for callers that keep each task's
+    lower-cased text and tag set precomputed.
+    """
+    source: str
+    terms: List[Term]
+    match: Callable[[Task], bool] = field(repr=False)
+    match_prepared: Callable[[Task, str, frozenset], bool] = field(repr=False, default=None)
+
+    @property
+    def text_terms(self) -> List[str]:
+        return [t.values[0] for t in self.terms if t.kind == "text" and not t.negate]
+
+    @property
+    def time_dependent(self) -> bool:
+        """True if the result can change with the clock alone, e.g. created:7d"""
+        return any(t.relative for t in self.terms)
+
+    def without_text(self) -> "Query":
+        """The same query minus its positive text terms, e.g. to filter fuzzy matches"""
+        return compile_terms([t for t in self.terms if t.kind != "text" or t.negate], self.source)
+
+    def filter(self, tasks: Iterable[Task]) -> Iterator[Task]:
+        return (t for t in tasks if self.match(t))
+
+    def narrows(self, other: "Query") -> bool:
+        """
+        True if every task matching this query also matches `other`, judged term by term:
+        each term of `other` must appear here unchanged, or be a positive text term whose
+        substring is contained in one of ours (typing 'dep' -> 'deploy')
+        """
+        def implied(term: Term) -> bool:
+            if term in self.terms:
+                return True
+            if term.kind != "text" or term.negate:
+                return False
+            return any(t.kind == "text" and not t.negate and term.values[0] in t.values[0] for t in self.terms)
+        return all(implied(term) for term in other.terms)
+
+
+def compile_terms(terms: List[Term], source: str = "") -> Query:
+    """Generate one function evaluating all terms, cheapest checks first"""
+    order = {"status": 0, "priority": 1, "id": 2, "created": 3, "completed": 3, "tag": 4, "text": 5}
+    terms = sorted(terms, key=lambda t: order[t.kind])
+    env: Dict[str, object] = {}
+    exprs = [_expression(term, n, env) for n, term in enumerate(terms)]
+    prepared = [_expression(term, n, env, tags="tags") for n, term in enumerate(terms)]
+    lines = ["def match(t):"]
+    if any(t.kind == "text" for t in terms):
+        lines.append("    text = (t.text or '').lower()")
+    lines.append(f"    return {' and '.join(exprs) or 'True'}")
+    lines.append("def match_prepared(t, text, tags):")
+    lines.append(f"    return {' and '.join(prepared) or 'True'}")
+    exec(compile("\n".join(lines), "<tix query>", "exec"), env)
+    return Query(source, terms, env["match"], env["match_prepared"])
+
+
+def compile_query(source: str, extra: Sequence[Term] = (), strict: bool = True,
+                  now: datetime = None) -> Query:
+    """
+    Compile a query such as 'p:high tag:work+urgent created>2025-01 !s:done deploy'.
+    Terms are ANDed; consecutive bare words form one phrase matched as a substring of the
+    task text, as does a token with an unknown key such as 'TODO:'. Keys: priority/p, tag/t
+    (a,b = any, a+b = all), status/s, text, id (ranges, > and <), created and completed
+    (YYYY[-MM[-DD]], today, yesterday, Nd/Nw with : > >= < <=). A leading ! negates a term.
+    With strict=False malformed terms are skipped instead of raising QueryError.
+    """
+    now = now or datetime.now()
+    terms = list(extra)
+    words: List[str] = []
+
+    def phrase():
+        if words:
+            terms.append(Term("text", (" ".join(words).lower(),)))
+            words.clear()
+
+    for raw in _tokens(source or ""):
+        if _is_word(raw):
+            words.append(raw)
+            continue
+        phrase()
+        try:
+            terms.append(_parse_term(raw, now))
+        except QueryError:
+            if strict:
+                raise
+    phrase()
+    return compile_terms(terms, source)
+
+
+@dataclass
+class Plan:
+    """How to evaluate a query against the store"""
+    candidates: Optional[Set[int]] = None   # hot-store task IDs to check, None = all
+    scan_hot: bool = True
+    months: Optional[Set[str]] = None       # archive partitions to read, None = all
+    steps: List[str] = field(default_factory=list)
+
+
+def _month_span(lo: Optional[int], hi: Optional[int], months: Sequence[str]) -> Set[str]:
+    keep = set()
+    lo_key = time.strftime("%Y-%m", time.localtime(lo)) if lo is not None else None
+    hi_key = time.strftime("%Y-%m", time.localtime(hi - 1)) if hi is not None else None
+    for month in months:
+        if month == "undated" or ((lo_key is None or month >= lo_key) and (hi_key is None or month <= hi_key)):
+            keep.add(month)
+    return keep
+
+
+def plan(query: Query, index: Union[TextIndex, Callable[[], TextIndex], None] = None,
+         hot_size: Optional[int] = None, hot_completed: Optional[int] = None,
+         months: Sequence[str] = ()) -> Plan:
+    """
+    Choose the most selective index for a query's positive terms:
+    tag postings, text trigrams or ID ranges narrow the hot store to candidate IDs;
+    status and completion dates prune the hot store and archive partitions.
+    Candidates are a superset: every task must still pass query.match.
+    """
+    result = Plan()
+    positive = [t for t in query.terms if not t.negate]
+
+    for term in positive:
+        if term.kind == "status" and term.values[0] is False:
+            result.months = set()
+            result.steps.append("status:active skips the archive")
+        elif term.kind in ("status", "completed"):
+            if hot_completed == 0:
+                result.scan_hot = False
+                result.steps.append("store has no completed tasks")
+        if term.kind == "completed" and result.months is None:
+            (lo, hi), = term.values
+            result.months = _month_span(lo, hi, months)
+            result.steps.append(f"archive months {sorted(result.months)}")
+    if not result.scan_hot:
+        return result
+
+    options: List[Tuple[int, str, Callable[[], Set[int]]]] = []
+    for term in positive:
+        if term.kind == "id":
+            widths = [None if lo is None or hi is None else hi - lo + 1 for lo, hi in term.values]
+            if None not in widths and sum(widths) <= MAX_ID_CANDIDATES:
+                ids = {i for lo, hi in term.values for i in range(lo, hi + 1)}
+                options.append((len(ids), "id ranges", lambda ids=ids: ids))
+    needs_index = any(t.kind in ("tag", "text") for t in positive)
+    if needs_index and index is not None:
+        idx = index() if callable(index) else index
+        for term in positive:
+            if term.kind == "tag":
+                postings = [idx.tokens.get(tag.lower(), set()) for tag in term.values]
+                if term.mode == "all":
+                    options.append((min(len(p) for p in postings), f"tag index {'+'.join(term.values)}",
+                                    lambda p=postings: set.intersection(*map(set, p))))
+                else:
+                    options.append((sum(len(p) for p in postings), f"tag index {','.join(term.values)}",
+                                    lambda p=postings: set().union(*p)))
+            elif term.kind == "text":
+                ids = idx.candidates(term.values[0])
+                if ids is not None:
+                    options.append((len(ids), f"text index '{term.values[0]}'", lambda ids=ids: ids))
+    if options:
+        size, name, build = min(options, key=lambda o: o[0])
+        if hot_size is None or size < hot_size:
+            result.candidates = build()
+            result.steps.append(f"{name}: {len(result.candidates)} candidate(s)")
+            return result
+    result.steps.append("full scan")
+    return result
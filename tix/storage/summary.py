@@ -0,0 +1,141 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tix.models import local_day, to_epoch
+
+SUMMARY_VERSION = 3
+
+# lead times are kept in a log-bucketed sketch: each bucket covers values within
+# SKETCH_ACCURACY relative error, so quantiles need a few hundred buckets at most
+SKETCH_ACCURACY = 0.02
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+
+def _counter() -> Dict[str, int]:
+    return {"total": 0, "active": 0, "completed": 0}
+
+
+def empty_summary() -> dict:
+    """Aggregate counters kept in the store header"""
+    return {
+        "version": SUMMARY_VERSION,
+        "status": _counter(),
+        "priority": {},
+        "tags": {},
+        "untagged": _counter(),
+        "completed_by_day": {},
+        "lead_time": {},
+    }
+
+
+def _bump(counter: Dict[str, int], completed: bool, sign: int):
+    counter["total"] += sign
+    counter["completed" if completed else "active"] += sign
+
+
+def completion_day(item: dict) -> Optional[str]:
+    """ISO date (YYYY-MM-DD) a serialized task was completed on, None if unknown"""
+    if not item.get("completed"):
+        return None
+    ts = item.get("completed_at")
+    if type(ts) is not int:
+        # legacy ISO values (e.g. in old archive partitions)
+        ts = to_epoch(ts)
+        if ts is None:
+            return None
+    return local_day(ts)
+
+
+def lead_time_seconds(item: dict) -> Optional[float]:
+    """Seconds from creation to completion of a serialized task, None if unknown"""
+    if not item.get("completed"):
+        return None
+    completed, created = item.get("completed_at"), item.get("created_at")
+    if type(completed) is not int or type(created) is not int:
+        completed, created = to_epoch(completed), to_epoch(created)
+        if completed is None or created is None:
+            return None
+    return float(completed - created) if completed > created else 0.0
+
+
+def sketch_bucket(value: float) -> str:
+    """Sketch bucket for a non-negative value (string keys so the sketch survives JSON)"""
+    return str(math.ceil(math.log(max(value, 1.0), SKETCH_GAMMA)))
+
+
+def sketch_quantile(buckets: Dict[str, int], q: float) -> Optional[float]:
+    """Approximate q-quantile (0..1) of the values counted in a sketch"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for key in sorted(buckets, key=int):
+        seen += buckets[key]
+        if seen > rank:
+            return 2 * SKETCH_GAMMA ** int(key) / (SKETCH_GAMMA + 1)
+    return None
+
+
+def _count(counts: Dict[str, int], key: str, sign: int):
+    counts[key] = counts.get(key, 0) + sign
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def apply(summary: dict, item: dict, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one serialized task's contribution"""
+    completed = bool(item.get("completed"))
+    _bump(summary["status"], completed, sign)
+    level = item.get("priority", "medium")
+    priority = summary["priority"].setdefault(level, _counter())
+    _bump(priority, completed, sign)
+    if priority["total"] <= 0:
+        del summary["priority"][level]
+    tags = item.get("tags") or []
+    if not tags:
+        _bump(summary["untagged"], completed, sign)
+    for tag in dict.fromkeys(tags):
+        counter = summary["tags"].setdefault(tag, _counter())
+        _bump(counter, completed, sign)
+        if counter["total"] <= 0:
+            del summary["tags"][tag]
+    day = completion_day(item)
+    if day:
+        _count(summary["completed_by_day"], day, sign)
+    lead = lead_time_seconds(item)
+    if lead is not None:
+        _count(summary["lead_time"], sketch_bucket(lead), sign)
+
+
+def build(items: Iterable[dict]) -> dict:
+    """Compute a summary from scratch"""
+    summary = empty_summary()
+    for item in items:
+        apply(summary, item)
+    return summary
+
+
+def is_current(summary) -> bool:
+    return isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION
+
+
+def _add(target: dict, source: dict):
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _add(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+def merge(*summaries: dict) -> dict:
+    """Combine summaries of disjoint task sets (e.g. the store and its archive)"""
+    result = empty_summary()
+    for summary in summaries:
+        _add(result, {k: v for k, v in summary.items() if k != "version"})
+    return result
+
+
+def tag_counts(summary: dict) -> List[Tuple[str, int]]:
+    """(tag, total) pairs, most used first and alphabetical among ties"""
+    return sorted(((tag, c["total"]) for tag, c in summary["tags"].items()), key=lambda x: (-x[1], x[0]))
@@ -0,0 +1,112 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from tix.models import Task
+from tix.storage import deltas
+from tix.storage.query import QueryError, compile_query
+
+VIEWS_VERSION = 1
+
+
+class MaterializedViews:
+    """
+    Persisted results of materialized saved filters: for each view its query source
+    and the serialized tasks currently matching it, keyed by ID.
+    Like the text index, `rev` and `stamp` record the store state the views reflect and
+    writes are replayed from a delta log on load.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rev = None
+        self.stamp: Optional[str] = None
+        self.views: Dict[str, dict] = {}
+        self._matchers: Dict[str, Callable[[Task], bool]] = {}
+
+    def load(self) -> bool:
+        """Load the views and their logged writes, return False if missing, unreadable or torn"""
+        try:
+            raw = json.loads(self.path.read_text())
+            if raw.get("version") != VIEWS_VERSION:
+                return False
+            self.rev, self.stamp = raw["rev"], raw.get("stamp")
+            self.views = {
+                name: {"query": view["query"], "tasks": {item["id"]: item for item in view["tasks"]}}
+                for name, view in raw["views"].items()
+            }
+            self._matchers = {}
+            return deltas.replay(self, self.path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def save(self):
+        data = {
+            "version": VIEWS_VERSION,
+            "rev": self.rev,
+            "stamp": self.stamp,
+            "views": {
+                name: {"query": view["query"], "tasks": [view["tasks"][i] for i in sorted(view["tasks"])]}
+                for name, view in self.views.items()
+            },
+        }
+        # a crash mid-write must not leave a truncated file behind
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        deltas.discard(self.path)
+
+    def _matcher(self, name: str) -> Callable[[Task], bool]:
+        match = self._matchers.get(name)
+        if match is None:
+            match = self._matchers[name] = compile_query(self.views[name]["query"]).match
+        return match
+
+    @staticmethod
+    def check(query: str):
+        """Raise QueryError unless query can be maintained incrementally"""
+        if compile_query(query).time_dependent:
+            raise QueryError("relative dates (today, 7d, ...) change with the clock and cannot be materialized")
+
+    def define(self, name: str, query: str, items: Iterable[dict]):
+        """Create or replace a view and fill it from serialized tasks"""
+        self.check(query)
+        self.views[name] = {"query": query, "tasks": {}}
+        self._matchers.pop(name, None)
+        match = self._matcher(name)
+        rows = self.views[name]["tasks"]
+        for item in items:
+            if match(Task.from_dict(item)):
+                rows[item["id"]] = item
+
+    def drop(self, name: str) -> bool:
+        self._matchers.pop(name, None)
+        return self.views.pop(name, None) is not None
+
+    def rebuild(self, items: List[dict], rev, stamp: Optional[str] = None):
+        """Refill every view from serialized tasks"""
+        for name, view in list(self.views.items()):
+            self.define(name, view["query"], items)
+        self.rev, self.stamp = rev, stamp
+
+    def remove(self, item: dict):
+        """Drop a serialized task from every view"""
+        for view in self.views.values():
+            view["tasks"].pop(item["id"], None)
+
+    def add(self, item: dict):
+        """Add a serialized task to the views it matches"""
+        if not self.views:
+            return
+        task = Task.from_dict(item)
+        for name, view in self.views.items():
+            if self._matcher(name)(task):
+                view["tasks"][item["id"]] = item
+
+    def get(self, name: str, query: Optional[str] = None) -> Optional[List[dict]]:
+        """Rows of a view by ID, None if it is not defined (or defined for another query)"""
+        view = self.views.get(name)
+        if view is None or (query is not None and view["query"] != query):
+            return None
+        return [view["tasks"][i] for i in sorted(view["tasks"])]
@@ -1,16 +1,49 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from textual.app import App, ComposeResult
 from textual.screen import ModalScreen
-from textual.widgets import Header, Footer, Input, DataTable, Static
+from textual.widgets import Header, Footer, Input, Static
 from textual.reactive import reactive
 from textual import events
 from textual.containers import Container
 
-from tix.storage.json_storage import TaskStorage
+from tix.storage.fuzzy import rank
+from tix.storage.index import TextIndex
+from tix.storage.json_storage import ChangeResult, TaskStorage
+from tix.storage.query import Query, compile_query, plan
 from tix.models import Task  # type: ignore
+from tix.tui.model import Batch, TaskModel, WriteBehind
+from tix.tui.table import TaskTable, list_order
+from tix.tui.watch import StoreWatcher
+
+# seconds of quiet after an edit before pending changes are handed to the writer
+FLUSH_DELAY = 0.5
+# seconds of quiet in the search box before the query runs
+SEARCH_DELAY = 0.15
+# seconds between checks of the store file when it cannot be watched with inotify
+WATCH_INTERVAL = 1.0
+
+
+class SerializedTasks(Mapping):
+    """Tasks by ID, serialized only when looked up (fuzzy ranking touches few of them)"""
+
+    def __init__(self, tasks: Dict[int, Task]):
+        self._tasks = tasks
+
+    def __getitem__(self, task_id: int) -> dict:
+        return self._tasks[task_id].to_dict()
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._tasks
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._tasks)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
 
 
 class Tix(App):
@@ -29,103 +62,260 @@ class Tix(App):
 
     query_text: reactive[str] = reactive("")
 
-    def __init__(self, show_all: bool = False) -> None:
+    def __init__(self, show_all: bool = False, storage: Optional[TaskStorage] = None) -> None:
         super().__init__()
-        self._storage = TaskStorage()
+        self._storage = storage or TaskStorage()
         self._show_all = show_all
-        self._all_tasks: List[Task] = []
+        self._model = TaskModel(self._storage)
+        self._writer = WriteBehind(self._storage, self._on_saved, self._on_save_error)
+        self._watcher = StoreWatcher(self._storage.storage_path, self._check_external, WATCH_INTERVAL)
+        # set when the store may hold changes by others that could not be merged yet
+        self._resync = False
+        self._flush_timer = None
+        self._closing = False
+        self._search_timer = None
+        self._loading = True
+        # tasks added before the initial load finished, added once it has
+        self._queued_adds: List[str] = []
+        # the last query and its matches, narrowed further while the query is extended
+        self._last_search: Optional[Tuple[Query, List[Task]]] = None
+        self._index: Optional[TextIndex] = None
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         with Container(id="body"):
-            yield Static("tix interactive - arrows navigate, a add, d done, e edit, / search, q quit", id="help")
+            yield Static("tix interactive - arrows navigate, a add, d done, e edit, / search (~ for fuzzy), q quit", id="help")
             yield Input(placeholder="search...", id="search")
-            table = DataTable(id="table")
-            table.add_columns("ID", "✔", "priority", "task", "tags")
-            yield table
+            yield TaskTable(id="table")
         yield Static("a add | d done | e edit | / search | q quit", id="footer_help")
+        yield Static("", id="status")
 
     def on_mount(self) -> None:
-        self._refresh()
         self.query_one("#search", Input).display = False
-        self.query_one(DataTable).focus()
+        self.query_one(TaskTable).focus()
+        self._show_status()
+        # the screen is up at once; rows appear when the store is parsed
+        self.run_worker(self._load_initial, name="load", thread=True)
+        self.run_worker(self._writer.run, name="writer", thread=True)
+
+    def _load_initial(self) -> None:
+        tasks = self._load_tasks()
+        self.call_from_thread(self._loaded, TaskTable.sort_rows(tasks))
+
+    def _loaded(self, presorted) -> None:
+        self._loading = False
+        if self.query_text:
+            self._search(self.query_text)
+        else:
+            self.query_one(TaskTable).set_rows((), presorted=presorted)
+        queued, self._queued_adds = self._queued_adds, []
+        for text in queued:
+            self._handle_add(text)
+        self._show_status()
+        # from now on changes made by other processes are merged as they happen
+        self.run_worker(self._watcher.run, name="watcher", thread=True)
+
+    def on_unmount(self) -> None:
+        # write whatever is pending before the app goes away; the widgets are gone by now
+        self._closing = True
+        self._watcher.stop()
+        self._writer.submit(self._model.take())
+        self._writer.close()
+
+    @property
+    def _tasks(self) -> Dict[int, Task]:
+        return self._model.tasks
 
     def _load_tasks(self) -> List[Task]:
-        return self._storage.load_tasks()
+        return self._model.load()
+
+    @property
+    def _in_sync(self) -> bool:
+        """True when the file holds every change made here"""
+        return not self._model.dirty and not self._writer.busy
+
+    def _changed(self, task: Task) -> None:
+        """A task was edited in the model: show it now and write it shortly"""
+        self._model.changed(task)
+        self._last_search = None
+        self._sync(task)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # rapid edits keep pushing the write back, so they are coalesced into one
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+        self._flush_timer = self.set_timer(FLUSH_DELAY, self._flush)
+        self._show_status()
+
+    def _flush(self) -> None:
+        """Hand pending changes to the writer thread"""
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+            self._flush_timer = None
+        self._writer.submit(self._model.take())
+        self._show_status()
+
+    # writer callbacks run on the writer thread
+    def _on_saved(self, result: ChangeResult) -> None:
+        if not self._closing:
+            self.call_from_thread(self._saved, result)
 
-    def _refresh(self) -> None:
-        self._all_tasks = self._load_tasks()
-        table = self.query_one(DataTable)
-        table.clear()
-        for t in sorted(self._all_tasks, key=lambda x: (x.completed, x.id)):
-            status = "✔" if t.completed else "○"
-            tags = ", ".join(t.tags) if t.tags else ""
-            table.add_row(str(t.id), status, t.priority, t.text, tags, key=t.id)
+    def _on_save_error(self, error: Exception, batch: Batch) -> None:
+        if self._closing:
+            self.log.error(f"saving failed on exit: {error}")
+        else:
+            self.call_from_thread(self._save_failed, error, batch)
+
+    def _saved(self, result: ChangeResult) -> None:
+        """
+        Our own write changed the file. If the store was at the revision the model knew,
+        the model is in step with the new revision; otherwise the write also kept changes
+        by others, which are merged next.
+        """
+        if self._model.renumber(result.renumbered):
+            self._last_search = None
+            self._search(self.query_text)
+        if result.conflicts:
+            # edits of tasks another process changed first were not written: show their version
+            self._merge([Task.from_dict(item) for item in result.conflicts.values() if item],
+                        [i for i, item in result.conflicts.items() if item is None], force=True)
+            ids = ", ".join(f"#{i}" for i in sorted(result.conflicts))
+            self.notify(f"{ids} changed elsewhere; kept that version instead of your edit",
+                        severity="warning")
+        if result.base_rev == self._model.rev:
+            self._model.rev = result.rev
+        else:
+            self._resync = True
+        if self._resync and not self._writer.busy:
+            self._resync = False
+            self._watcher.poke()
+        self._index = None
+        self._show_status()
+
+    def _save_failed(self, error: Exception, batch: Batch) -> None:
+        self._model.restore(batch)
+        self.notify(f"saving failed: {error}", severity="error")
+        self._show_status()
+
+    def _show_status(self) -> None:
+        if self._loading:
+            status = "loading…"
+        elif self._model.dirty:
+            status = f"● {self._model.dirty} unsaved"
+        elif self._writer.busy:
+            status = "saving…"
+        else:
+            status = ""
+        self.query_one("#status", Static).update(status)
+
+    # changes by other processes
+
+    def _check_external(self) -> None:
+        """Runs on the watcher thread: diff the store with the model if another process wrote it"""
+        if self._closing:
+            return
+        rev = self._storage.read_header().get("rev", 0)
+        if rev == self._model.rev:
+            return
+        changed, removed = self._model.diff(self._storage.iter_raw())
+        if not self._closing:
+            self.call_from_thread(self._apply_external, rev, changed, removed)
+
+    def _apply_external(self, rev: int, changed: List[Task], removed: List[int]) -> None:
+        if self._model.rev is not None and rev <= self._model.rev:
+            return  # already merged, or written by us
+        if self._writer.busy:
+            # the store is about to be rewritten; look again once our write is done
+            self._resync = True
+            return
+        if self._merge(changed, removed):
+            self._model.rev = rev
+        else:
+            # tasks with unsaved edits keep them for now; their write checks for conflicts
+            self._resync = True
+
+    def _merge(self, changed: List[Task], removed: List[int], force: bool = False) -> bool:
+        """
+        Show stored versions of tasks in place of the model's, updating only their rows.
+        Tasks with pending edits are left alone unless forced; returns False if any were.
+        """
+        table = self.query_one(TaskTable)
+        complete = True
+        shown = False
+        for task in changed:
+            if self._model.pending(task.id) and not force:
+                complete = False
+                continue
+            self._model.replace(task)
+            table.update_task(task)
+            shown = True
+        for task_id in removed:
+            if self._model.pending(task_id) and not force:
+                complete = False
+                continue
+            task = self._model.remove(task_id)
+            if task is not None:
+                table.remove_task(task)
+                shown = True
+        if shown:
+            self._index = None
+            self._last_search = None
+            if self.query_text:
+                # rows were added for every changed task; the query decides which stay
+                self._search(self.query_text)
+        return complete
+
+    def _show(self, tasks: Iterable[Task], order=list_order) -> None:
+        """Make the table show exactly these tasks; only the lines in view are rendered"""
+        self.query_one(TaskTable).set_rows(tasks, order)
+
+    def _sync(self, task: Task) -> None:
+        """Show the current state of one task, adding its row or moving it to its new place"""
+        self.query_one(TaskTable).update_task(task)
+
+    def _cursor_task(self) -> Optional[Task]:
+        return self.query_one(TaskTable).cursor_task
 
     def action_add_task(self) -> None:
         self.push_screen(PromptModal("add task:"), self._handle_add)
 
     def _handle_add(self, value: Optional[str]) -> None:
-        if value:
-            self._storage.add_task(value, "medium", [])
-            self._refresh()
+        if not value:
+            return
+        if self._loading:
+            self._queued_adds.append(value)
+            self.notify("still loading; the task is added once the list is ready")
+            return
+        self._changed(self._model.add(value, "medium", []))
 
     def action_toggle_done(self) -> None:
-        table = self.query_one(DataTable)
-        if table.cursor_row is None or table.row_count == 0:
-            return
-        try:
-            row_key = table.get_row_key(table.cursor_row)
-            task_id = int(row_key)
-        except Exception:
-            # fallback: derive id from first cell when key isn't available
-            try:
-                cells = table.get_row_at(table.cursor_row)
-                task_id = int(str(cells[0]))
-            except Exception:
-                return
-        task = self._storage.get_task(task_id)
+        task = self._cursor_task()
         if not task:
             return
+        self._model.snapshot(task)
         if task.completed:
             task.completed = False
             task.completed_at = None
         else:
             task.mark_done()
-        self._storage.update_task(task)
-        self._refresh()
+        self._changed(task)
 
     def action_edit_task(self) -> None:
-        table = self.query_one(DataTable)
-        if table.cursor_row is None or table.row_count == 0:
-            return
-        try:
-            row_key = table.get_row_key(table.cursor_row)
-            task_id = int(row_key)
-        except Exception:
-            # fallback: derive id from first cell when key isn't available
-            try:
-                cells = table.get_row_at(table.cursor_row)
-                task_id = int(str(cells[0]))
-            except Exception:
-                return
-        task = self._storage.get_task(task_id)
+        task = self._cursor_task()
         if not task:
             return
         # if the cursor is on the priority column, cycle priority; if on the tags column, edit tags; otherwise edit text
-        try:
-            col = table.cursor_column
-        except Exception:
-            col = 3
+        col = self.query_one(TaskTable).cursor_column
         if col == 2:
             cycle = ["low", "medium", "high"]
             try:
                 idx = cycle.index(task.priority)
             except ValueError:
                 idx = 0
+            self._model.snapshot(task)
             task.priority = cycle[(idx + 1) % len(cycle)]
-            self._storage.update_task(task)
-            self._refresh()
+            self._changed(task)
         elif col == 4:
             existing = ", ".join(task.tags)
             self.push_screen(PromptModal("edit tags (comma-separated):", default=existing), lambda v: self._handle_edit_tags(task.id, v))
@@ -135,22 +325,22 @@ class Tix(App):
     def _handle_edit(self, task_id: int, value: Optional[str]) -> None:
         if value is None:
             return
-        task = self._storage.get_task(task_id)
+        task = self._tasks.get(task_id)
         if not task:
             return
+        self._model.snapshot(task)
         task.text = value
-        self._storage.update_task(task)
-        self._refresh()
+        self._changed(task)
 
     def _handle_edit_tags(self, task_id: int, value: Optional[str]) -> None:
-        task = self._storage.get_task(task_id)
+        task = self._tasks.get(task_id)
         if not task:
             return
+        self._model.snapshot(task)
         if value is not None:
             tags = [t.strip() for t in value.split(",") if t.strip()]
             task.tags = tags
-        self._storage.update_task(task)
-        self._refresh()
+        self._changed(task)
 
     def action_search_tasks(self) -> None:
         search = self.query_one("#search", Input)
@@ -161,81 +351,51 @@ class Tix(App):
         if message.input.id != "search":
             return
         self.query_text = message.value
-        table = self.query_one(DataTable)
-        table.clear()
-        filters, free_text = self._parse_search(self.query_text)
-        for t in self._all_tasks:
-            if self._task_matches(t, filters, free_text):
-                status = "✔" if t.completed else "○"
-                tags = ", ".join(t.tags) if t.tags else ""
-                table.add_row(str(t.id), status, t.priority, t.text, tags, key=t.id)
-
-    def _parse_search(self, query: str):
-        # supports key:value tokens for columns (except id), plus free-text
-        # keys: p/priority, tags, text/task, status/s
-        filters = {"priority": None, "tags": None, "text": None, "status": None}
-        free_parts = []
-        for raw in query.split():
-            if ":" in raw:
-                key, value = raw.split(":", 1)
-                key = key.strip().lower()
-                value = value.strip()
-                if key in ("p", "priority"):
-                    v = value.lower()
-                    # support short forms: l/m/h
-                    if v in ("l", "low"):
-                        v = "low"
-                    elif v in ("m", "med", "medium"):
-                        v = "medium"
-                    elif v in ("h", "hi", "high"):
-                        v = "high"
-                    if v in ("low", "medium", "high"):
-                        filters["priority"] = v
-                elif key in ("t", "tags"):
-                    # accept array form like [a,b]
-                    vals = value
-                    if vals.startswith("[") and vals.endswith("]"):
-                        vals = vals[1:-1]
-                    tag_list = [x.strip() for x in vals.split(",") if x.strip()]
-                    filters["tags"] = tag_list
-                elif key in ("text", "task"):
-                    filters["text"] = value
-                elif key in ("status", "s", "done"):
-                    v = value.lower()
-                    if v in ("done", "completed", "true", "yes"):
-                        filters["status"] = True
-                    elif v in ("active", "open", "false", "no"):
-                        filters["status"] = False
-            else:
-                free_parts.append(raw)
-        free_text = " ".join(free_parts).strip()
-        return filters, free_text
-
-    def _task_matches(self, task: Task, filters, free_text: str) -> bool:
-        # priority
-        p = filters.get("priority")
-        if p and task.priority != p:
-            return False
-        # status
-        status = filters.get("status")
-        if status is True and not task.completed:
-            return False
-        if status is False and task.completed:
-            return False
-        # tags: match if ANY of the specified tags is present
-        tags = filters.get("tags")
-        if tags:
-            task_tags = set(task.tags or [])
-            if not any(tag in task_tags for tag in tags):
-                return False
-        # text explicit
-        text_filter = filters.get("text")
-        if text_filter and text_filter.lower() not in (task.text or "").lower():
-            return False
-        # free text fallback matches task text too
-        if free_text and free_text.lower() not in (task.text or "").lower():
-            return False
-        return True
+        # typing restarts the delay, so a burst of keystrokes runs one search
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._search_timer = self.set_timer(SEARCH_DELAY, lambda: self._search(self.query_text))
+
+    def _search(self, text: str) -> None:
+        if not text:
+            self._last_search = None
+            self._show(self._tasks.values())
+            return
+        if text.startswith("~"):
+            # ~query: typo-tolerant ranked search sharing the store's text index
+            self._last_search = None
+            ranked = rank(self._text_index(), SerializedTasks(self._tasks), text[1:], limit=200)
+            positions = {item["id"]: i for i, (_, item) in enumerate(ranked)}
+            self._show([self._tasks[i] for i in positions], lambda t: positions[t.id])
+            return
+        # same query language as `tix search`; incomplete terms are ignored while typing
+        query = compile_query(text, strict=False)
+        last = self._last_search
+        if last is not None and query.narrows(last[0]):
+            # the query was extended: only the previous matches can still match
+            pool = last[1]
+        else:
+            pool = self._candidates(query)
+        key = self._model.search_key
+        matches = [t for t in pool if query.match_prepared(t, *key(t))]
+        self._last_search = (query, matches)
+        self._show(matches)
+
+    def _text_index(self) -> TextIndex:
+        if self._index is None:
+            self._index = self._storage.text_index()
+        return self._index
+
+    def _candidates(self, query: Query) -> List[Task]:
+        # the planner narrows the loaded tasks with the text/tag index; matches are still verified.
+        # the index is built from the file, so it is only used while the file holds every change
+        tasks = list(self._tasks.values())
+        if not self._in_sync:
+            return tasks
+        ids = plan(query, index=self._text_index, hot_size=len(tasks)).candidates
+        if ids is None:
+            return tasks
+        return [t for t in tasks if t.id in ids]
 
     def on_key(self, event: events.Key) -> None:
         # esc closes search and resets list
@@ -244,15 +404,11 @@ class Tix(App):
             if search.display:
                 search.value = ""
                 search.display = False
-                self._refresh()
-
-    # ensure clicking any cell selects the corresponding row for actions like 'd' and 'e'
-    def on_data_table_cell_selected(self, event: DataTable.CellSelected) -> None:  # type: ignore[attr-defined]
-        table = self.query_one(DataTable)
-        try:
-            table.cursor_coordinate = (event.coordinate.row, event.coordinate.column)
-        except Exception:
-            pass
+                self.query_text = ""
+                if self._search_timer is not None:
+                    self._search_timer.stop()
+                self._show(self._tasks.values())
+                self.query_one(TaskTable).focus()
 
 
 class PromptModal(ModalScreen[Optional[str]]):
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tix.models import Task
+from tix.storage.json_storage import ChangeResult, TaskStorage
+
+# a batch of changes to persist: serialized added and updated tasks, and the stored
+# state the updates were based on, by ID
+Batch = Tuple[Dict[int, dict], Dict[int, dict], Dict[int, dict]]
+
+
+class TaskModel:
+    """
+    The tasks of one store held in memory by the TUI. Edits change the tasks in place
+    and are recorded as pending; `take()` hands them over for writing as a snapshot,
+    so later edits never race with a write in progress. `search_key()` keeps each
+    task's lower-cased text and tag set for Query.match_prepared.
+
+    `rev` is the store revision the model is in step with. Before a task is modified,
+    `snapshot()` keeps its stored state, so the write can tell whether another process
+    changed the task in the meantime.
+    """
+
+    def __init__(self, storage: TaskStorage):
+        self.storage = storage
+        self.tasks: Dict[int, Task] = {}
+        self.next_id = 1
+        self.rev: Optional[int] = None
+        self._added: Dict[int, Task] = {}
+        self._updated: Dict[int, Task] = {}
+        self._base: Dict[int, dict] = {}
+        self._keys: Dict[int, Tuple[str, frozenset]] = {}
+
+    def load(self) -> List[Task]:
+        """Replace the model with the store's current tasks, dropping pending changes"""
+        # the header is read first: if the file changes in between, rev is older than the
+        # tasks and the next check only finds nothing to merge
+        header = self.storage.read_header()
+        tasks = self.storage.load_tasks()
+        self.tasks = {t.id: t for t in tasks}
+        self.next_id = max(header.get("next_id", 1), max(self.tasks, default=0) + 1)
+        self.rev = header.get("rev", 0)
+        self._added.clear()
+        self._updated.clear()
+        self._base.clear()
+        self._keys.clear()
+        return tasks
+
+    def search_key(self, task: Task) -> Tuple[str, frozenset]:
+        key = self._keys.get(task.id)
+        if key is None:
+            key = self._keys[task.id] = ((task.text or "").lower(), frozenset(task.tags))
+        return key
+
+    @property
+    def dirty(self) -> int:
+        """Number of tasks with changes not yet handed over for writing"""
+        return len(self._added) + len(self._updated)
+
+    def add(self, text: str, priority: str = "medium", tags: List[str] = None) -> Task:
+        task = Task(id=self.next_id, text=text, priority=priority, tags=tags or [])
+        self.next_id += 1
+        self.tasks[task.id] = task
+        self._added[task.id] = task
+        return task
+
+    def pending(self, task_id: int) -> bool:
+        """True if the task has changes not yet handed over for writing"""
+        return task_id in self._added or task_id in self._updated
+
+    def snapshot(self, task: Task):
+        """Remember the stored state of a task that is about to be modified in place"""
+        if task.id not in self._added and task.id not in self._base:
+            self._base[task.id] = task.to_dict()
+
+    def changed(self, task: Task):
+        """Record that a task was modified in place"""
+        self._keys.pop(task.id, None)
+        if task.id not in self._added:
+            self._updated[task.id] = task
+
+    def take(self) -> Batch:
+        """Serialize and clear the pending changes"""
+        batch = ({i: t.to_dict() for i, t in self._added.items()},
+                 {i: t.to_dict() for i, t in self._updated.items()},
+                 {i: self._base.pop(i) for i in self._updated if i in self._base})
+        self._added.clear()
+        self._updated.clear()
+        return batch
+
+    def restore(self, batch: Batch):
+        """Mark the tasks of a batch that failed to write as pending again"""
+        added, updated, base = batch
+        for task_id in added:
+            if task_id in self.tasks:
+                self._added[task_id] = self.tasks[task_id]
+        for task_id in updated:
+            if task_id in self.tasks and task_id not in self._added:
+                self._updated[task_id] = self.tasks[task_id]
+                if task_id in base:
+                    self._base[task_id] = base[task_id]
+
+    def replace(self, task: Task):
+        """Take the stored version of a task, dropping changes made to it here"""
+        self._discard(task.id)
+        self.tasks[task.id] = task
+        self.next_id = max(self.next_id, task.id + 1)
+
+    def remove(self, task_id: int) -> Optional[Task]:
+        """Drop a task deleted from the store, with any changes made to it here"""
+        self._discard(task_id)
+        return self.tasks.pop(task_id, None)
+
+    def _discard(self, task_id: int):
+        for pending in (self._added, self._updated, self._base, self._keys):
+            pending.pop(task_id, None)
+
+    def diff(self, items: Iterable[dict]) -> Tuple[List[Task], List[int]]:
+        """
+        Compare serialized stored tasks with the model: the stored tasks that are new or
+        differ, and the IDs of tasks no longer stored. Only reads the model, so it can run
+        off the UI thread; whether a difference is applied is decided on the UI thread.
+        """
+        changed, seen = [], set()
+        for item in items:
+            task = Task.from_dict(item)
+            seen.add(task.id)
+            if self.tasks.get(task.id) != task:
+                changed.append(task)
+        removed = [i for i in list(self.tasks) if i not in seen]
+        return changed, removed
+
+    def renumber(self, mapping: Dict[int, int]) -> List[Task]:
+        """Apply IDs reassigned by the store to added tasks, return the renumbered tasks"""
+        moved = [self.tasks.pop(old) for old in mapping if old in self.tasks]
+        for task in moved:
+            self._keys.pop(task.id, None)
+            task.id = mapping[task.id]
+            self.tasks[task.id] = task
+        if moved:
+            self.next_id = max(self.next_id, max(self.tasks) + 1)
+        return moved
+
+
+def merge(batch: Batch, later: Batch) -> Batch:
+    """
+    Coalesce two batches: the later state of a task wins, an update of an added task stays
+    an add, and an update stays based on the stored state the earlier batch saw
+    """
+    added, updated, base = batch
+    for task_id, item in later[0].items():
+        added[task_id] = item
+    for task_id, item in later[1].items():
+        if task_id in added:
+            added[task_id] = item
+        else:
+            updated[task_id] = item
+    for task_id, item in later[2].items():
+        base.setdefault(task_id, item)
+    return added, updated, base
+
+
+def renumbered(batch: Batch, mapping: Dict[int, int]) -> Batch:
+    """The batch with tasks moved to the IDs the store reassigned"""
+    if not mapping:
+        return batch
+
+    def move(items):
+        return {mapping.get(i, i): dict(item, id=mapping.get(i, i)) for i, item in items.items()}
+    return move(batch[0]), move(batch[1]), batch[2]
+
+
+class WriteBehind:
+    """
+    Persists batches of model changes on a worker thread, one write at a time. Batches
+    submitted while a write runs are merged into the next write. `on_saved` receives the
+    store's ChangeResult (reassigned IDs and conflicting updates that were not written),
+    `on_error` the exception and the batch that was not written. Batches queued before
+    the UI learnt of reassigned IDs are moved to the new IDs.
+    """
+
+    def __init__(self, storage: TaskStorage, on_saved: Callable[[ChangeResult], None],
+                 on_error: Callable[[Exception, Batch], None]):
+        self.storage = storage
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self._queue: "queue.Queue[Optional[Batch]]" = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._moved: Dict[int, int] = {}
+        self._stopped = threading.Event()
+
+    @property
+    def busy(self) -> bool:
+        """True while submitted batches have not been written yet"""
+        return self._pending > 0
+
+    def submit(self, batch: Batch):
+        if batch[0] or batch[1]:
+            with self._lock:
+                self._pending += 1
+            self._queue.put(batch)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the writer once everything submitted so far is written and wait for it;
+        returns False if it is still writing after timeout seconds
+        """
+        self._queue.put(None)
+        return self._stopped.wait(timeout)
+
+    def _drain(self, batch: Batch) -> Tuple[Batch, int, bool]:
+        """Merge every batch already queued into this one"""
+        count, closed = 1, False
+        while True:
+            try:
+                later = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, count, closed
+            if later is None:
+                closed = True
+            else:
+                batch = merge(batch, later)
+                count += 1
+
+    def run(self):
+        """Writer loop, run in a worker thread"""
+        try:
+            self._run()
+        finally:
+            self._stopped.set()
+
+    def _run(self):
+        closed = False
+        while not closed:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            batch, count, closed = self._drain(batch)
+            added, updated, base = batch = renumbered(batch, self._moved)
+            try:
+                result = self.storage.apply_changes([Task.from_dict(d) for d in added.values()],
+                                                    [Task.from_dict(d) for d in updated.values()],
+                                                    expected=base)
+                error = None
+            except Exception as e:
+                error = e
+            with self._lock:
+                self._pending -= count
+            if error is None:
+                self._moved.update(result.renumbered)
+                self.on_saved(result)
+            else:
+                self.on_error(error, batch)
+            # once the UI has applied the new IDs, nothing queued refers to the old ones
+            if self._queue.empty():
+                self._moved.clear()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable, ClassVar, Iterable, List, Optional, Tuple
+
+from rich.segment import Segment
+from rich.style import Style
+from textual import events
+from textual.binding import Binding
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from tix.models import Task  # type: ignore
+
+# (label, width) of the columns; the task column (width None) takes the remaining space
+COLUMNS = (("ID", 0), ("✔", 1), ("priority", 8), ("task", None), ("tags", 24))
+MIN_TEXT_WIDTH = 10
+
+
+def task_cells(t: Task) -> tuple:
+    status = "✔" if t.completed else "○"
+    tags = ", ".join(t.tags) if t.tags else ""
+    return str(t.id), status, t.priority, t.text, tags
+
+
+def list_order(t: Task):
+    """Row order outside of ranked search: active first, then by ID"""
+    return t.completed, t.id
+
+
+def _fit(text: str, width: int) -> str:
+    if len(text) > width:
+        return text[:max(width - 1, 0)] + "…"
+    return text.ljust(width)
+
+
+class TaskTable(ScrollView, can_focus=True):
+    """
+    Table of tasks that only renders the lines in view. Rows are tasks kept in display
+    order together with their sort keys, so a changed task is moved with a bisect
+    instead of re-sorting; a line is rendered from its task when it scrolls into view,
+    and recently rendered lines are cached. The header is the first line and stays put.
+    """
+
+    COMPONENT_CLASSES: ClassVar[set] = {"tasktable--header", "tasktable--cursor"}
+
+    DEFAULT_CSS = """
+    TaskTable { height: 1fr; }
+    TaskTable > .tasktable--header { text-style: bold; background: $panel; }
+    TaskTable > .tasktable--cursor { background: $accent; color: $text; }
+    """
+
+    BINDINGS = [
+        Binding("up", "cursor(-1, 0)", "up", show=False),
+        Binding("down", "cursor(1, 0)", "down", show=False),
+        Binding("left", "cursor(0, -1)", "left", show=False),
+        Binding("right", "cursor(0, 1)", "right", show=False),
+        Binding("pageup", "page(-1)", "page up", show=False),
+        Binding("pagedown", "page(1)", "page down", show=False),
+        Binding("home", "jump(0)", "first", show=False),
+        Binding("end", "jump(-1)", "last", show=False),
+    ]
+
+    def __init__(self, *, id: Optional[str] = None) -> None:
+        super().__init__(id=id)
+        self.rows: List[Task] = []
+        self._keys: list = []
+        self._order: Callable[[Task], object] = list_order
+        self.cursor_row = 0
+        self.cursor_column = 3
+        self._id_width = 2
+        self._lines: LRUCache[Tuple[int, int, int], Strip] = LRUCache(1024)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def cursor_task(self) -> Optional[Task]:
+        return self.rows[self.cursor_row] if 0 <= self.cursor_row < len(self.rows) else None
+
+    def get_row_at(self, row: int) -> tuple:
+        return task_cells(self.rows[row])
+
+    # --- rows ---
+
+    @staticmethod
+    def sort_rows(tasks: Iterable[Task], order: Callable[[Task], object] = list_order) -> Tuple[list, List[Task]]:
+        """Sort keys and tasks in display order; safe to call off the UI thread"""
+        keyed = sorted(((order(t), t) for t in tasks), key=lambda kt: kt[0])
+        return [k for k, _ in keyed], [t for _, t in keyed]
+
+    def set_rows(self, tasks: Iterable[Task], order: Callable[[Task], object] = list_order,
+                 presorted: Optional[Tuple[list, List[Task]]] = None) -> None:
+        """Show these tasks in this order (presorted: the result of sort_rows for them)"""
+        self._order = order
+        self._keys, self.rows = presorted or self.sort_rows(tasks, order)
+        self._id_width = max(2, len(str(max((t.id for t in self.rows), default=0))))
+        self.cursor_row = min(self.cursor_row, max(len(self.rows) - 1, 0))
+        self._changed()
+
+    def _find(self, task: Task) -> int:
+        """Row of a task by ID, -1 if it is not shown"""
+        if self._order is list_order:
+            # the row is either where the task's key says, or where it was before completion toggled
+            for completed in (task.completed, not task.completed):
+                i = bisect_left(self._keys, (completed, task.id))
+                if i < len(self.rows) and self.rows[i].id == task.id:
+                    return i
+            return -1
+        return next((i for i, t in enumerate(self.rows) if t.id == task.id), -1)
+
+    def update_task(self, task: Task) -> None:
+        """Show the current state of one task, adding its row or moving it to its new place"""
+        i = self._find(task)
+        key = self._order(task)
+        if i != -1:
+            if self._keys[i] == key:
+                self.rows[i] = task
+                self._changed()
+                return
+            del self.rows[i], self._keys[i]
+        j = bisect_left(self._keys, key)
+        self.rows.insert(j, task)
+        self._keys.insert(j, key)
+        self._id_width = max(self._id_width, len(str(task.id)))
+        self._changed()
+
+    def remove_task(self, task: Task) -> None:
+        i = self._find(task)
+        if i == -1:
+            return
+        del self.rows[i], self._keys[i]
+        self.cursor_row = min(self.cursor_row, max(len(self.rows) - 1, 0))
+        self._changed()
+
+    def _changed(self) -> None:
+        self._lines.clear()
+        self.virtual_size = Size(self._line_width(self.size.width), len(self.rows) + 1)
+        self.refresh()
+
+    # --- rendering ---
+
+    def _widths(self, width: int) -> List[int]:
+        fixed = sum(w for _, w in COLUMNS if w) + self._id_width + len(COLUMNS) - 1
+        text = max(width - fixed, MIN_TEXT_WIDTH)
+        return [self._id_width if w == 0 else (text if w is None else w) for _, w in COLUMNS]
+
+    def _line_width(self, width: int) -> int:
+        widths = self._widths(width)
+        return sum(widths) + len(widths) - 1
+
+    def _render_cells(self, cells: Iterable[str], style: Style, cursor: Optional[int], width: int) -> Strip:
+        cursor_style = self.get_component_rich_style("tasktable--cursor")
+        segments = []
+        for n, (cell, w) in enumerate(zip(cells, self._widths(width))):
+            if n:
+                segments.append(Segment(" ", style))
+            segments.append(Segment(_fit(cell, w), cursor_style if n == cursor else style))
+        return Strip(segments)
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        base = self.rich_style
+        if y == 0:
+            header = base + self.get_component_rich_style("tasktable--header")
+            strip = self._render_cells((label for label, _ in COLUMNS), header, None, width)
+            return strip.crop_extend(scroll_x, scroll_x + width, header)
+        row = scroll_y + y - 1
+        if row >= len(self.rows):
+            return Strip.blank(width, base)
+        task = self.rows[row]
+        cursor = self.cursor_column if row == self.cursor_row and self.has_focus else None
+        key = (task.id, -1 if cursor is None else cursor, width)
+        strip = self._lines.get(key)
+        if strip is None:
+            strip = self._lines[key] = self._render_cells(task_cells(task), base, cursor, width)
+        return strip.crop_extend(scroll_x, scroll_x + width, base).apply_offsets(scroll_x, row)
+
+    def on_resize(self, event: events.Resize) -> None:
+        self._changed()
+
+    def on_focus(self) -> None:
+        self.refresh()
+
+    def on_blur(self) -> None:
+        self.refresh()
+
+    # --- cursor ---
+
+    def move_cursor(self, row: Optional[int] = None, column: Optional[int] = None) -> None:
+        if row is not None:
+            self.cursor_row = max(0, min(row, len(self.rows) - 1))
+        if column is not None:
+            self.cursor_column = max(0, min(column, len(COLUMNS) - 1))
+        # keep the cursor in view below the header
+        visible = max(self.size.height - 1, 1)
+        if self.cursor_row < self.scroll_y:
+            self.scroll_to(y=self.cursor_row, animate=False)
+        elif self.cursor_row >= self.scroll_y + visible:
+            self.scroll_to(y=self.cursor_row - visible + 1, animate=False)
+        self.refresh()
+
+    def action_cursor(self, rows: int, columns: int) -> None:
+        self.move_cursor(self.cursor_row + rows, self.cursor_column + columns)
+
+    def action_page(self, direction: int) -> None:
+        self.move_cursor(self.cursor_row + direction * max(self.size.height - 2, 1))
+
+    def action_jump(self, row: int) -> None:
+        self.move_cursor(row if row >= 0 else len(self.rows) - 1)
+
+    def on_click(self, event: events.Click) -> None:
+        if event.y == 0:
+            return
+        x = event.x + round(self.scroll_x)
+        column, edge = 0, 0
+        for n, w in enumerate(self._widths(self.size.width)):
+            edge += w + 1
+            if x < edge:
+                column = n
+                break
+        self.move_cursor(round(self.scroll_y) + event.y - 1, column)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+# inotify events on the store's directory that can mean the store file changed
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """mtime and size of a file, None if it does not exist"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _libc():
+    """The C library if it provides inotify (Linux), else None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class StoreWatcher:
+    """
+    Calls `on_change` from the thread running `run()` whenever the store file's mtime or
+    size changes. Stores are written by renaming a new file over the old one, so the
+    directory is watched rather than the file: with inotify where the C library has it,
+    otherwise by polling every `interval` seconds. With inotify the file is also checked
+    every `interval` seconds, and `poke()` asks for a call right away.
+    """
+
+    def __init__(self, path: Path, on_change: Callable[[], None], interval: float = 1.0):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.mode: Optional[str] = None  # "inotify" or "polling" once running
+        self._wake = threading.Event()
+        self._poked = False
+        self._stopped = False
+        self._pipe: Optional[Tuple[int, int]] = None
+
+    def poke(self):
+        self._poked = True
+        self._signal()
+
+    def stop(self):
+        self._stopped = True
+        self._signal()
+
+    def _signal(self):
+        self._wake.set()
+        if self._pipe is not None:
+            try:
+                os.write(self._pipe[1], b"x")
+            except OSError:
+                pass
+
+    def _open_inotify(self) -> Optional[int]:
+        libc = _libc()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(self.path.parent), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _wait(self, fd: Optional[int]):
+        """Block until something in the directory changed, poke() or stop(), or interval passed"""
+        if fd is None:
+            self._wake.wait(self.interval)
+        else:
+            ready, _, _ = select.select([fd, self._pipe[0]], [], [], self.interval)
+            # the events themselves are not needed: the file's stamp tells whether it changed
+            for r in ready:
+                try:
+                    while os.read(r, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+        self._wake.clear()
+
+    def run(self):
+        """Watch loop, run in a worker thread until stop()"""
+        fd = self._open_inotify()
+        if fd is not None:
+            self._pipe = os.pipe()
+            for end in self._pipe:
+                os.set_blocking(end, False)
+        self.mode = "polling" if fd is None else "inotify"
+        # the first check always reports, covering changes made before the watch began
+        stamp = None
+        try:
+            while not self._stopped:
+                current = file_stamp(self.path)
+                if current != stamp or self._poked:
+                    stamp, self._poked = current, False
+                    self.on_change()
+                if not self._stopped:
+                    self._wait(fd)
+        finally:
+            if fd is not None:
+                os.close(fd)
+                pipe, self._pipe = self._pipe, None
+                for end in pipe:
+                    os.close(end)